@@ -0,0 +1,3 @@
+from os import path
+import sys
+sys.path.insert(0, path.abspath(path.join(path.dirname(__file__), '../src')))
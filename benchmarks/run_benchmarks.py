@@ -0,0 +1,237 @@
+"""
+Throughput benchmarks of the primer design pipeline, run offline on synthetic pre-targetons.
+
+    python -m benchmarks.run_benchmarks [--sizes 1 10 50] [--repeat 3] [--update_baselines]
+
+Each case is timed at several batch sizes (pre-targetons, or targetons for the slicer) and
+the best of --repeat runs is compared against benchmarks/baselines.json. The command exits
+with status 1 when a case is slower than its baseline by more than --tolerance.
+"""
+import argparse
+import io
+import json
+import logging
+import shutil
+import sys
+import timeit
+from contextlib import contextmanager, redirect_stdout
+from os import path
+from tempfile import TemporaryDirectory
+from typing import Callable, Dict, Iterator, List, Optional
+from unittest.mock import patch
+
+import primer3
+
+from primer.filter.duplicates_filter import DuplicatesFilter
+from primer.filter.filter_manager import FilterManager
+from primer.primer3 import Primer3
+from primer.primer3_prepare_config import prepare_p3_config
+from primer.primer_pair import build_primer_pairs
+from primer.primer_pair_table import PrimerPairTable
+from primer.ranker.ranker import Ranker
+from primer.write_primer_output import write_primer_output
+from slicer.slicer import Slicer
+from utils.file_system import parse_json
+
+from benchmarks.synthetic import SLICE_LENGTH, synthetic_slices, write_synthetic_genome
+
+ROOT_DIR = path.abspath(path.join(path.dirname(__file__), '..'))
+BASELINES_PATH = path.join(path.dirname(__file__), 'baselines.json')
+DESIGNER_CONFIG_PATH = path.join(ROOT_DIR, 'config/default_designer.config.json')
+PRIMER3_CONFIG_PATH = path.join(ROOT_DIR, 'config/default_primer3.config.json')
+
+DEFAULT_SIZES = [1, 10, 50]
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.5
+PRIMER_TYPE = 'LibAmp'
+
+
+class BenchmarkData:
+    """Inputs of every case at one batch size, each built from the output of the previous stage."""
+
+    def __init__(self, number_slices: int, designer_config: dict, p3_config: dict):
+        self.stringency_vector = designer_config['stringency_vector']
+        self.designer_config = designer_config
+        self.p3_config = p3_config
+
+        self.slices = synthetic_slices(number_slices)
+        self.designs = [
+            [(stringency, primer3.bindings.design_primers(slice_data.p3_input, prepare_p3_config(p3_config, stringency)))
+             for stringency in self.stringency_vector]
+            for slice_data in self.slices
+        ]
+        self.primer_pairs = self.build_primer_pairs()
+        self.table = PrimerPairTable.from_primer_pairs(self.primer_pairs)
+        self.filtered_table = FilterManager({'duplicates': True}).filter_table(self.table)
+        self.ranked_table = Ranker(designer_config['ranking']).rank_table(self.filtered_table)
+
+    def build_primer_pairs(self) -> list:
+        primer_pairs = []
+        for slice_data, designs in zip(self.slices, self.designs):
+            for stringency, design in designs:
+                primer_pairs.extend(build_primer_pairs(design, slice_data, stringency))
+
+        return primer_pairs
+
+
+def bench_slicer(data: BenchmarkData, workdir: str) -> Callable[[], object]:
+    # One targeton per pre-targeton of the batch size, each tiled into many pre-targetons
+    bed_path, fasta_path = write_synthetic_genome(workdir, len(data.slices))
+    params = {'bed': bed_path, 'fasta': fasta_path, '1b': False,
+              'flank_5': 50, 'flank_3': 50, 'length': 210, 'offset': 5}
+
+    return lambda: list(Slicer().get_slices(params))
+
+
+def bench_primer3(data: BenchmarkData, workdir: str) -> Callable[[], object]:
+    def run():
+        p3 = Primer3(data.stringency_vector, data.p3_config)
+        return [p3.get_primers(slice_data) for slice_data in data.slices]
+
+    return run
+
+
+def bench_build_primer_pairs(data: BenchmarkData, workdir: str) -> Callable[[], object]:
+    return data.build_primer_pairs
+
+
+def bench_duplicates_filter(data: BenchmarkData, workdir: str) -> Callable[[], object]:
+    return lambda: DuplicatesFilter().keep_mask(data.table)
+
+
+def bench_ranker(data: BenchmarkData, workdir: str) -> Callable[[], object]:
+    ranker = Ranker(data.designer_config['ranking'])
+    return lambda: ranker.rank(PRIMER_TYPE, data.filtered_table)
+
+
+def bench_write_primer_output(data: BenchmarkData, workdir: str) -> Callable[[], object]:
+    return lambda: write_primer_output(data.ranked_table, data.designer_config['csv_column_order'],
+                                       existing_dir=workdir, primer_type=PRIMER_TYPE)
+
+
+# Case name -> function preparing the timed call for a batch
+CASES: Dict[str, Callable[[BenchmarkData, str], Callable[[], object]]] = {
+    'Slicer.get_slices': bench_slicer,
+    'Primer3.get_primers': bench_primer3,
+    'build_primer_pairs': bench_build_primer_pairs,
+    'DuplicatesFilter': bench_duplicates_filter,
+    'Ranker.rank': bench_ranker,
+    'write_primer_output': bench_write_primer_output,
+}
+
+# Cases relying on a system tool rather than a Python package
+REQUIRED_TOOLS = {'Slicer.get_slices': 'bedtools'}
+
+
+@contextmanager
+def offline_services() -> Iterator[None]:
+    """HAP1 variant and Ensembl lookups answered locally, so benchmarks never wait on the network."""
+    def get_seqs(regions, base_url=None):
+        return {region: 'N' for region in regions}
+
+    with patch('utils.get_data.hap1.contain_variant', return_value=False), \
+            patch('primer.surrounding_region.get_seqs_from_ensembl_by_regions', side_effect=get_seqs):
+        yield
+
+
+def time_case(run: Callable[[], object], repeat: int) -> float:
+    """Seconds per call, fastest of repeat runs; quick cases are called in a loop so each run lasts 0.2 s."""
+    timer = timeit.Timer(run)
+    number, _ = timer.autorange()
+
+    return min(timer.repeat(repeat, number)) / number
+
+
+def run_benchmarks(sizes: List[int], repeat: int, cases: Optional[List[str]] = None) -> Dict[str, Dict[str, float]]:
+    designer_config = parse_json(DESIGNER_CONFIG_PATH)
+    # Masking needs the kmer lists, which are not part of the repository
+    p3_config = {key: value for key, value in parse_json(PRIMER3_CONFIG_PATH).items() if 'MASK' not in key}
+    p3_config['PRIMER_MASK_TEMPLATE'] = 0
+    p3_config['SEQUENCE_INCLUDED_REGION'] = [0, SLICE_LENGTH]
+
+    cases_to_run = []
+    for name in cases or CASES:
+        tool = REQUIRED_TOOLS.get(name)
+        if tool and shutil.which(tool) is None:
+            print(f'{name}: skipped, {tool} is not installed', file=sys.stderr)
+        else:
+            cases_to_run.append(name)
+
+    results: Dict[str, Dict[str, float]] = {}
+    for size in sizes:
+        data = BenchmarkData(size, designer_config, p3_config)
+
+        for name in cases_to_run:
+            with TemporaryDirectory() as workdir:
+                results.setdefault(name, {})[str(size)] = time_case(CASES[name](data, workdir), repeat)
+
+    return results
+
+
+def compare_to_baselines(
+        results: Dict[str, Dict[str, float]],
+        baselines: Dict[str, Dict[str, float]],
+        tolerance: float
+) -> List[str]:
+    regressions = []
+    for name, timings in results.items():
+        for size, seconds in timings.items():
+            baseline = baselines.get(name, {}).get(size)
+            if baseline is None:
+                status = 'no baseline'
+            else:
+                ratio = seconds / baseline
+                status = f'{ratio:.2f}x baseline'
+                if ratio > 1 + tolerance:
+                    status += ' REGRESSION'
+                    regressions.append(f'{name} [{size}]')
+
+            print(f'{name:<22} {size:>6} {seconds * 1000:>12.3f} ms  {status}')
+
+    return regressions
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Primer Designer benchmarks')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='Batch sizes, in pre-targetons (default 1 10 50)')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help='Runs of each case, the fastest one is kept (default 3)')
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), help='Cases to run (default all)')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Slowdown over the baseline reported as a regression (default 0.5, i.e. 50%%)')
+    parser.add_argument('--baselines', default=BASELINES_PATH, help='Baselines JSON file')
+    parser.add_argument('--update_baselines', action='store_true',
+                        help='Store the timings of this run as the new baselines')
+
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str]) -> int:
+    args = parse_args(argv)
+
+    # Per pre-targeton logs and the Primer3 config echo would be timed with the stages
+    logging.disable(logging.INFO)
+    with offline_services(), redirect_stdout(io.StringIO()):
+        results = run_benchmarks(args.sizes, args.repeat, args.cases)
+
+    baselines = parse_json(args.baselines) if path.exists(args.baselines) else {}
+    regressions = compare_to_baselines(results, baselines, args.tolerance)
+
+    if args.update_baselines:
+        for name, timings in results.items():
+            baselines.setdefault(name, {}).update(timings)
+        with open(args.baselines, 'w') as baselines_file:
+            json.dump(baselines, baselines_file, indent=4, sort_keys=True)
+        print(f'Baselines saved: {args.baselines}')
+        return 0
+
+    if regressions:
+        print(f'Regressions: {", ".join(regressions)}')
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,77 @@
+import random
+from os import path
+from typing import List, Tuple
+
+from Bio import SeqIO
+
+from primer.slice_data import SliceData
+
+EXAMPLE_SLICE_FASTA = path.join(path.dirname(__file__), '../examples/test_example_slice.fa')
+
+SLICE_LENGTH = 210
+SLICE_OFFSET = 5
+CHROMOSOME = '1'
+CHROMOSOME_START = 42929593
+EXON_LENGTH = 150
+EXON_SPACING = 400
+
+
+def random_bases(length: int, rng: random.Random) -> str:
+    return ''.join(rng.choice('ACGT') for _ in range(length))
+
+
+def example_bases() -> str:
+    """Bases of the example pre-targeton shipped in examples/, used to seed the synthetic sequences."""
+    with open(EXAMPLE_SLICE_FASTA) as fasta:
+        return str(next(SeqIO.parse(fasta, 'fasta')).seq)
+
+
+def synthetic_slices(number_slices: int, seed: int = 0) -> List[SliceData]:
+    """
+    Pre-targetons tiled along a synthetic region the way the slicer tiles an exon: each one
+    is shifted by SLICE_OFFSET bases from the previous one, so neighbours share most of their
+    primers, as in real batches.
+    """
+    rng = random.Random(seed)
+    region_length = SLICE_LENGTH + SLICE_OFFSET * (number_slices - 1)
+
+    bases = example_bases()
+    region = (bases * (region_length // len(bases) + 1))[:region_length]
+    # Point mutations keep the example's composition while making each run of the region distinct
+    region = ''.join(rng.choice('ACGT') if rng.random() < 0.05 else base for base in region)
+
+    slices = []
+    for index in range(number_slices):
+        start = index * SLICE_OFFSET
+        slices.append(SliceData(
+            name=f'ENSE{seed:08d}_HG8_{index + 1}',
+            start=CHROMOSOME_START + start,
+            end=CHROMOSOME_START + start + SLICE_LENGTH,
+            strand='-' if index % 2 else '+',
+            chromosome=CHROMOSOME,
+            bases=region[start:start + SLICE_LENGTH],
+        ))
+
+    return slices
+
+
+def write_synthetic_genome(directory: str, number_exons: int, seed: int = 0) -> Tuple[str, str]:
+    """BED file of number_exons targetons and the FASTA of the chromosome they are on, for the slicer."""
+    rng = random.Random(seed)
+    chromosome_length = EXON_SPACING * (number_exons + 1)
+
+    fasta_path = path.join(directory, 'synthetic_genome.fa')
+    with open(fasta_path, 'w') as fasta:
+        fasta.write(f'>chr{CHROMOSOME}\n')
+        sequence = random_bases(chromosome_length, rng)
+        for start in range(0, chromosome_length, 60):
+            fasta.write(sequence[start:start + 60] + '\n')
+
+    bed_path = path.join(directory, 'synthetic_targetons.bed')
+    with open(bed_path, 'w') as bed:
+        for index in range(number_exons):
+            start = EXON_SPACING * (index + 1) - EXON_LENGTH // 2
+            strand = '-' if index % 2 else '+'
+            bed.write(f'chr{CHROMOSOME}\t{start}\t{start + EXON_LENGTH}\texon{index + 1}\t.\t{strand}\n')
+
+    return bed_path, fasta_path
@@ -1,19 +1,11 @@
 #!/usr/bin/env python3
+from __future__ import annotations
+
 import sys
-from os import path
+from os import path, makedirs
+from typing import TYPE_CHECKING, Optional
 
-from config.config import DesignerConfig
-from primer.filter.filter_manager import FilterManager
-from primer.slice_data import SliceData
 from utils.arguments_parser import ParsedInputArguments
-from utils.validate_files import validate_files, validate_fasta_format
-from utils.write_output_files import (
-    write_slicer_output,
-    write_targeton_csv,
-    write_scoring_output,
-    write_primer_design_output,
-)
-
 from designer.output_data_classes import (
     SlicerOutputData,
     PrimerOutputData,
@@ -21,15 +13,26 @@ from designer.output_data_classes import (
     PrimerDesignerOutputData,
     DesignOutputData,
 )
-from primer.write_primer_output import write_primer_output
-from slicer.slicer import Slicer
-from primer.primer3 import Primer3
-from primer_designer import PrimerDesigner
-from post_primer_pairs import post_primer_pairs
-from primer.ranker.ranker import Ranker
+
+from utils.instrumentation import instrumentation
+
+from custom_logger.custom_logger import CustomLogger
+
+# Commands import the subsystems they need when they run (pandas, Primer3, pybedtools, Flask,
+# the scoring tool...), so that short commands do not pay for loading all of them
+if TYPE_CHECKING:
+    from config.config import DesignerConfig
+    from primer.primer3_cache import Primer3Cache
+    from primer.surrounding_region import SurroundingRegionProvider
+    from primer_designer import PrimerDesigner
+    from utils.get_data.hap1_index import HAP1VariantIndex
 
 sys.path.append(path.abspath(path.join(path.dirname(__file__), '../sge-primer-scoring/src')))
-from scoring import Scoring
+
+# Initialize logger
+logger = CustomLogger(__name__)
+
+PRIMER_TYPE = 'LibAmp'
 
 
 def version_command():
@@ -41,7 +44,27 @@ def version_command():
 
 
 def slicer_command(args) -> SlicerOutputData:
+    instrumentation.reset()
+    with instrumentation.stage('slicer_command'):
+        slicer_result = _run_slicer_command(args)
+
+    _write_instrumentation_report(slicer_result.dir, args)
+
+    return slicer_result
+
+
+def _run_slicer_command(args) -> SlicerOutputData:
+    from slicer.native_slicer import NativeSlicer
+    from slicer.slicer import Slicer
+    from utils.validate_files import validate_files
+    from utils.write_output_files import write_slicer_output, write_native_slicer_output
+
     validate_files(bed=args['bed'], fasta=args['fasta'])
+
+    if args.get('slicer_engine') == 'native':
+        slices = NativeSlicer().iter_slices(args)
+        return write_native_slicer_output(args['dir'], slices)
+
     slicer = Slicer()
     slices = slicer.get_slices(args)
 
@@ -51,23 +74,50 @@ def slicer_command(args) -> SlicerOutputData:
 def primer_command(
         args: dict
 ) -> PrimerOutputData:
-    PRIMER_TYPE = 'LibAmp'
+    instrumentation.reset()
+    with instrumentation.stage('primer_command'):
+        primer_result = _run_primer_command(args)
+
+    _write_instrumentation_report(primer_result.dir, args)
+
+    return primer_result
+
+
+def _run_primer_command(
+        args: dict
+) -> PrimerOutputData:
+    from config.config import DesignerConfig
+    from primer.filter.filter_manager import FilterManager
+    from primer.primer3 import Primer3
+    from primer.primer_pair_table import PrimerPairTable
+    from primer.ranker.ranker import Ranker
+    from primer.slice_data import SliceData
+    from primer.write_primer_output import write_primer_output
+    from utils.validate_files import validate_fasta_format
+
     config = DesignerConfig(args)
 
     validate_fasta_format(config.fasta)
-    slice_data = SliceData.get_first_slice_data(config.fasta)
 
-    primers = Primer3(config.stringency_vector, config.primer3_params).get_primers(slice_data)
+    if args.get('batch'):
+        return primer_batch_command(config,
+                                    combine_output=args.get('combine_output', False),
+                                    workers=args.get('workers', 1))
+
+    slice_data = SliceData.get_first_slice_data(config.fasta, _create_surrounding_region_provider(config))
 
-    filters_response = FilterManager(config.filters).apply_filters(primers)
+    primers = (Primer3(config.stringency_vector, config.primer3_params,
+                       workers=args.get('workers', 1), cache=_create_primer3_cache(config),
+                       stringency_schedule=config.stringency_schedule)
+               .get_primers(slice_data))
 
-    ranked_primer_pairs_df = (Ranker(config.ranking)
-                              .rank(primer_type=PRIMER_TYPE, primer_pairs=filters_response.primer_pairs_to_keep))
+    filtered_primer_pairs = (FilterManager(config.filters, _load_hap1_variant_index(config))
+                             .filter_table(PrimerPairTable.from_primer_pairs(primers)))
+
+    ranked_primer_pairs = Ranker(config.ranking).rank_table(filtered_primer_pairs)
 
     primer_result = write_primer_output(
-        primer_pairs_df=ranked_primer_pairs_df,
-        primer_pairs=filters_response.primer_pairs_to_keep,
-        discarded_primer_pairs=filters_response.primer_pairs_to_discard,
+        ranked_primer_pairs=ranked_primer_pairs,
         prefix=config.prefix_output_dir,
         primer_type=PRIMER_TYPE,
         column_order=config.csv_column_order
@@ -76,12 +126,168 @@ def primer_command(
     return primer_result
 
 
+def primer_batch_command(
+        config: DesignerConfig,
+        combine_output: bool = False,
+        workers: int = 1
+) -> PrimerOutputData:
+    from primer.filter.filter_manager import FilterManager
+    from primer.primer3 import Primer3
+    from primer.primer_pair_table import PrimerPairTable
+    from primer.primer_registry import PrimerRegistry
+    from primer.ranker.ranker import Ranker
+    from primer.slice_data import SliceData
+    from primer.write_primer_output import write_primer_output
+    from utils.write_output_files import timestamped_dir
+
+    # Shared by all pre-targetons so that primers found again for overlapping slices are looked up once
+    primer_registry = PrimerRegistry()
+    primer3 = Primer3(config.stringency_vector, config.primer3_params,
+                      workers=workers, cache=_create_primer3_cache(config),
+                      stringency_schedule=config.stringency_schedule)
+    filter_manager = FilterManager(config.filters, _load_hap1_variant_index(config), primer_registry)
+    ranker = Ranker(config.ranking)
+
+    export_dir = timestamped_dir(config.prefix_output_dir)
+
+    slices_data = SliceData.get_slices_data(config.fasta, _create_surrounding_region_provider(config))
+    primer_pairs_tables = []
+
+    for slice_data, primers in primer3.get_primers_batch(slices_data):
+        primer_pairs = filter_manager.filter_table(PrimerPairTable.from_primer_pairs(primers))
+
+        if combine_output:
+            primer_pairs_tables.append(primer_pairs)
+        else:
+            targeton_dir = path.join(export_dir, slice_data.name)
+            makedirs(targeton_dir, exist_ok=True)
+
+            write_primer_output(
+                ranked_primer_pairs=ranker.rank_table(primer_pairs),
+                existing_dir=targeton_dir,
+                primer_type=PRIMER_TYPE,
+                column_order=config.csv_column_order
+            )
+
+    primer_registry.log_summary()
+
+    if not combine_output:
+        logger.info(f"Per-targeton primer files saved under: {export_dir}")
+        return PrimerOutputData(export_dir)
+
+    # Overlapping pre-targetons can yield identical pairs, which are only duplicates once combined
+    primer_pairs = filter_manager.filter_duplicates(PrimerPairTable.concat(primer_pairs_tables))
+
+    return write_primer_output(
+        ranked_primer_pairs=ranker.rank_table(primer_pairs),
+        existing_dir=export_dir,
+        primer_type=PRIMER_TYPE,
+        column_order=config.csv_column_order
+    )
+
+
+def serve_command(args: dict) -> None:
+    from config.config import DesignerConfig
+    from designer.design_service import DesignService, create_app
+    from primer.filter.filter_manager import FilterManager
+    from primer.primer3 import Primer3
+    from primer.ranker.ranker import Ranker
+
+    config = DesignerConfig(args)
+
+    primer3 = Primer3(config.stringency_vector, config.primer3_params,
+                      workers=args.get('workers', 1), cache=_create_primer3_cache(config),
+                      stringency_schedule=config.stringency_schedule)
+    service = DesignService(
+        primer3,
+        FilterManager(config.filters, _load_hap1_variant_index(config)),
+        Ranker(config.ranking),
+        config.csv_column_order,
+        _create_surrounding_region_provider(config),
+        primer_type=PRIMER_TYPE
+    )
+
+    primer3.warm_up()
+    try:
+        create_app(service).run(host=args.get('host'), port=args.get('port'))
+    finally:
+        primer3.shutdown()
+
+
+def _write_instrumentation_report(output_dir: str, args: dict) -> None:
+    report_path = instrumentation.write_report(output_dir, prometheus=args.get('prometheus_metrics', False))
+    logger.info(f"Instrumentation report saved: {report_path}")
+
+
+def _create_primer3_cache(config: DesignerConfig) -> Optional[Primer3Cache]:
+    if not config.p3_cache:
+        return None
+
+    from primer.primer3_cache import Primer3Cache
+
+    return Primer3Cache(config.p3_cache, config.p3_cache_max_mb)
+
+
+def _create_surrounding_region_provider(config: DesignerConfig) -> SurroundingRegionProvider:
+    from primer.surrounding_region import SurroundingRegionProvider
+    from utils.file_system import check_file_exists
+
+    # The reference is only opened, and indexed if needed, when a surrounding region is read
+    if config.reference:
+        check_file_exists(config.reference)
+
+    return SurroundingRegionProvider(ensembl_url=config.ensembl_url, cache_dir=config.surrounding_region_cache,
+                                     reference_fasta=config.reference)
+
+
+def _load_hap1_variant_index(config: DesignerConfig) -> Optional[HAP1VariantIndex]:
+    if not config.hap1_index:
+        return None
+
+    from utils.file_system import check_file_exists
+    from utils.get_data.hap1_index import HAP1VariantIndex
+
+    check_file_exists(config.hap1_index)
+    return HAP1VariantIndex(config.hap1_index)
+
+
+def build_hap1_index_command(vcf: str, index_path: str) -> str:
+    if not index_path:
+        raise ValueError('Path for the HAP1 variant index must be supplied with --hap1_index')
+
+    from utils.get_data.hap1_index import build_hap1_variant_index
+    from utils.validate_files import validate_files
+
+    validate_files(vcf=vcf)
+
+    return build_hap1_variant_index(vcf, index_path)
+
+
+def convert_kmer_lists_command(args: dict) -> list:
+    from config.config import DesignerConfig
+    from primer.kmer_mask import convert_kmer_lists
+
+    # Defaults to the kmer lists used for masking in the Primer3 config
+    kmer_dir = args.get('kmer_dir') or DesignerConfig(args).primer3_params.get('PRIMER_MASK_KMERLIST_PATH')
+    if not kmer_dir:
+        raise ValueError('Directory with the kmer lists must be supplied with --kmer_dir')
+
+    return convert_kmer_lists(kmer_dir)
+
+
 def collate_primer_designer_data_command(
     design_output_data : DesignOutputData,
-    primer_designer=PrimerDesigner(),
+    primer_designer: Optional[PrimerDesigner] = None,
     prefix='',
     existing_dir=''
 ) -> PrimerDesignerOutputData:
+    from primer_designer import PrimerDesigner
+    from utils.validate_files import validate_files
+    from utils.write_output_files import write_primer_design_output
+
+    if primer_designer is None:
+        primer_designer = PrimerDesigner()
+
     validate_files(p3_csv=design_output_data.p3_csv, score_tsv=design_output_data.scoring_tsv)
 
     primer_designer.from_design_output(design_output_data)
@@ -94,6 +300,9 @@ def collate_primer_designer_data_command(
 
 
 def scoring_command(ipcress_output, mismatch, output_tsv, targeton_csv=None) -> ScoringOutputData:
+    from scoring import Scoring
+    from utils.write_output_files import write_scoring_output
+
     scoring = Scoring(ipcress_output, mismatch, targeton_csv)
     scoring.add_scores_to_df()
 
@@ -116,51 +325,82 @@ def design_command(args) -> DesignOutputData:
 
 
 def post_primers(primer_json) -> None:
+    from post_primer_pairs import post_primer_pairs
+    from utils.validate_files import validate_files
+
     validate_files(primer_json=primer_json)
     post_primer_pairs(primer_json)
 
 
+def generate_targeton_csv_command(args) -> None:
+    from utils.write_output_files import write_targeton_csv
+
+    write_targeton_csv(args['primers'], args['bed'], args['dir'])
+
+
+def collate_primer_data_command(args) -> None:
+    design_output_data = DesignOutputData()
+    design_output_data.p3_csv = args['p3_csv']
+    design_output_data.scoring_tsv = args['score_tsv']
+    collate_primer_designer_data_command(design_output_data, prefix=args['dir'])
+
+
+# Command name -> function running it from the parsed arguments
+COMMANDS = {
+    'version': lambda args: version_command(),
+    'slicer': slicer_command,
+    'primer': lambda args: primer_command(args=args),
+    'collate_primer_data': collate_primer_data_command,
+    'generate_targeton_csv': generate_targeton_csv_command,
+    'scoring': lambda args: scoring_command(
+        args['ipcress_file'],
+        args['scoring_mismatch'],
+        args['output_tsv'],
+        args['targeton_csv'],
+    ),
+    'design': design_command,
+    'post_primers': lambda args: post_primers(args['primer_json']),
+    'build_hap1_index': lambda args: build_hap1_index_command(args['vcf'], args['hap1_index']),
+    'convert_kmer_lists': convert_kmer_lists_command,
+    'serve': serve_command,
+}
+
+
 def resolve_command(args):
-    command = args['command']
+    COMMANDS[args['command']](args)
 
-    if command == 'version':
-        version_command()
-    else:
-        if command == 'slicer':
-            slicer_command(args)
-
-        if command == 'primer':
-            primer_command(args=args)
-
-        if command == 'collate_primer_data':
-            design_output_data = DesignOutputData()
-            design_output_data.p3_csv = args['p3_csv']
-            design_output_data.scoring_tsv = args['score_tsv']
-            collate_primer_designer_data_command(design_output_data, prefix=args['dir'])
-
-        if command == 'generate_targeton_csv':
-            write_targeton_csv(args['primers'], args['bed'], args['dir'])
-
-        if command == 'scoring':
-            scoring_command(
-                args['ipcress_file'],
-                args['scoring_mismatch'],
-                args['output_tsv'],
-                args['targeton_csv'],
-            )
 
-        if command == 'design':
-            design_command(args)
+def profile_command(args) -> None:
+    import cProfile
+
+    from utils.file_system import FolderCreator
+    from utils.profiler import DEFAULT_TOP, write_profile
 
-        if command == 'post_primers':
-            post_primers(args['primer_json'])
+    # Primer3 worker processes are not profiled, use --workers 1 to see the time spent in Primer3
+    FolderCreator.dir = ''
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(resolve_command, args)
+    finally:
+        # Written next to the outputs of the command, or to a folder of its own if it has none,
+        # also when the command fails
+        output_dir = FolderCreator.get_dir()
+        if not output_dir:
+            FolderCreator.create_timestamped(args.get('dir') or 'td_output')
+            output_dir = FolderCreator.get_dir()
+
+        profile_paths = write_profile(profiler, output_dir, args.get('profile_top', DEFAULT_TOP))
+        logger.info(f"Profile saved: {', '.join(profile_paths)}")
 
 
 def main():
     parsed_input = ParsedInputArguments()
     args = parsed_input.get_args()
 
-    resolve_command(args)
+    if args.get('profile'):
+        profile_command(args)
+    else:
+        resolve_command(args)
 
 
 if __name__ == '__main__':
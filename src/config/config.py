@@ -1,3 +1,4 @@
+from config.defaults import DEFAULT_P3_CACHE_MAX_MB, ENSEMBL_URL, STRINGENCY_SCHEDULE_ALL
 from utils.file_system import parse_json
 
 from custom_logger.custom_logger import CustomLogger
@@ -22,12 +23,19 @@ class DesignerConfig:
             config["ranking"] = {}
 
         self.stringency_vector = config['stringency_vector']
+        self.stringency_schedule = config.get('stringency_schedule', STRINGENCY_SCHEDULE_ALL)
         self.csv_column_order = config['csv_column_order']
         self.filters = config['filters']
         self.ranking = config['ranking']
 
         self.prefix_output_dir = args.get('dir', None) or config.get('dir', None)
         self.fasta = args.get('fasta', None) or config.get('fasta', None)
+        self.hap1_index = args.get('hap1_index', None) or config.get('hap1_index', None)
+        self.p3_cache = args.get('p3_cache', None) or config.get('p3_cache', None)
+        self.p3_cache_max_mb = config.get('p3_cache_max_mb', DEFAULT_P3_CACHE_MAX_MB)
+        self.reference = args.get('reference', None) or config.get('reference', None)
+        self.ensembl_url = config.get('ensembl_url', ENSEMBL_URL)
+        self.surrounding_region_cache = config.get('surrounding_region_cache', None)
 
         primer3_params_path = (args.get('primer3_params', None) or config.get('primer3_params', None)
                                or 'config/default_primer3.config.json')
@@ -0,0 +1,13 @@
+# Defaults of the designer config. Kept apart from the modules using them, so that loading
+# the config does not import Primer3 and its dependencies.
+
+# Run Primer3 for every stringency, or stop once the more stringent runs returned enough pairs
+STRINGENCY_SCHEDULE_ALL = 'all'
+STRINGENCY_SCHEDULE_EARLY_EXIT = 'early_exit'
+STRINGENCY_SCHEDULES = (STRINGENCY_SCHEDULE_ALL, STRINGENCY_SCHEDULE_EARLY_EXIT)
+
+# Size limit of the on-disk cache of Primer3 results
+DEFAULT_P3_CACHE_MAX_MB = 512
+
+# Ensembl REST API serving the sequence surrounding pre-targetons
+ENSEMBL_URL = 'https://rest.ensembl.org'
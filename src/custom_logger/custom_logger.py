@@ -1,111 +1,164 @@
+import atexit
 import logging
+import multiprocessing
 import os
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Optional
 
+FILE_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
-class CustomLogger:
+# Set on the records logged through a CustomLogger, also when they come from a worker process
+_CONSOLE_RECORD = {'custom_logger': True}
+
+# Handlers shared by every CustomLogger of the process, set up by configure_logging
+_handlers: List[logging.Handler] = []
+_configure_lock = threading.Lock()
+_log_queue = None
+_log_listener: Optional[QueueListener] = None
 
+
+class LevelFormatter(logging.Formatter):
+    """
+        Console formatter choosing the format of each record from its level, so a single
+        handler can print every level without being reconfigured between calls.
     """
-            This the CustomLogger class to use in our scripts where we need to log the output on 
-            terminal and in log file. A log file is generated and placed at /logs/logs.log directory.
 
-            Here, default logger level is DEBUG. 
-            This means you can log INFO, WARNING, ERROR, and EXCEPTION.
+    FORMATS = {
+        logging.DEBUG: "DEBUG: %(message)s",
+        logging.INFO: "%(message)s",
+        logging.WARNING: "WARNING: %(message)s",
+        logging.ERROR: "%(asctime)s - ERROR - %(name)s - %(levelname)s - %(message)s",
+        logging.CRITICAL: "%(asctime)s - CRITICAL - %(name)s - %(levelname)s - %(message)s",
+    }
+    EXCEPTION_FORMAT = "%(asctime)s - EXCEPTION - %(name)s - %(levelname)s - %(message)s"
 
-            Example of use cases:
+    def __init__(self):
+        super().__init__()
+        self._formatters = {level: logging.Formatter(fmt) for level, fmt in self.FORMATS.items()}
+        self._exception_formatter = logging.Formatter(self.EXCEPTION_FORMAT)
 
-            from custom_logger.custom_logger import CustomLogger
+    def format(self, record: logging.LogRecord) -> str:
+        if record.levelno == logging.ERROR and record.exc_info:
+            return self._exception_formatter.format(record)
 
-            logger = CustomLogger(__name__)
-            
-            logger.info("Info")
-            logger.warn("Warning!")
-            logger.error("Error")
-            logger.exception("Exception")
-    """
+        return self._formatters.get(record.levelno, self._formatters[logging.INFO]).format(record)
 
-    def __init__(self, module_name):
-        self.module_name = module_name
+
+class _CustomLoggerFilter(logging.Filter):
+    # Only records of the designer modules are printed, other libraries only log to the file
+    def filter(self, record: logging.LogRecord) -> bool:
+        return getattr(record, 'custom_logger', False)
+
+
+def configure_logging() -> None:
+    """
+    Set up the log file and the console handler once per process. Records of every
+    module go to /logs/logs.log; records logged through a CustomLogger are also printed.
+    """
+    with _configure_lock:
+        if _handlers:
+            return
 
         # Get directory for logs
         log_directory = os.path.join(os.getcwd(), "logs/")
+        os.makedirs(log_directory, exist_ok=True)
 
-        # Ensure the log directory exists
-        if not os.path.exists(log_directory):
-            os.makedirs(log_directory)
-        log_file_path = os.path.join(log_directory, f"logs.log")
+        file_handler = logging.FileHandler(os.path.join(log_directory, "logs.log"), mode='a')
+        file_handler.setFormatter(logging.Formatter(FILE_FORMAT))
 
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(LevelFormatter())
+        console_handler.addFilter(_CustomLoggerFilter())
 
-        # Set up logging to file and format
-        logging.basicConfig(
-            filename=log_file_path, 
-            filemode='a', 
-            format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-            level=logging.DEBUG,
-            force=True,
-        )
+        _install_root_handlers([file_handler, console_handler])
 
-        self.handler = logging.StreamHandler()
-        self.handler.setLevel(logging.DEBUG)
 
-        # Create logger instance
+def worker_log_queue():
+    """
+    Queue for the log records of worker processes (see configure_worker_logging). Records
+    are written by a listener thread of this process, through the handlers of this process.
+    """
+    global _log_queue, _log_listener
 
-        self.logger = logging.getLogger(self.module_name)
+    configure_logging()
+    with _configure_lock:
+        if _log_listener is None:
+            _log_queue = multiprocessing.Queue(-1)
+            _log_listener = QueueListener(_log_queue, *_handlers, respect_handler_level=True)
+            _log_listener.start()
+            atexit.register(_log_listener.stop)
 
-        # Create custom formatters for different levels
+    return _log_queue
 
-        self.info_formatter = logging.Formatter("%(message)s")
-        self.debug_formatter = logging.Formatter("DEBUG: %(message)s")
-        self.warning_formatter = logging.Formatter("WARNING: %(message)s")
-        self.error_formatter = logging.Formatter("%(asctime)s - ERROR - %(name)s - %(levelname)s - %(message)s")
-        self.exception_formatter = logging.Formatter("%(asctime)s - EXCEPTION - %(name)s - %(levelname)s - %(message)s") 
-        self.critical_formatter = logging.Formatter("%(asctime)s - CRITICAL - %(name)s - %(levelname)s - %(message)s")
 
+def configure_worker_logging(log_queue) -> None:
+    """Initializer of worker processes: send every log record to the parent process."""
+    with _configure_lock:
+        _install_root_handlers([QueueHandler(log_queue)])
 
-        # Check if there no additional logger is being handled
-        
-        if not self.logger.handlers:
-            self.handler = logging.StreamHandler()
-            self.handler.setLevel(logging.DEBUG)
-            self.logger.addHandler(self.handler)
 
+def _install_root_handlers(handlers: List[logging.Handler]) -> None:
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+        handler.close()
 
+    for handler in handlers:
+        root_logger.addHandler(handler)
+    root_logger.setLevel(logging.DEBUG)
 
-    def setup_formatter(self, formatter) -> None:
-        """
-        
-            Function setup_formatter() will format logs according to log level and given log format.
+    _handlers[:] = handlers
 
-            This function takes one arguments formatter and returns None.  
-            For example: self.setup_logger(self.debug_formatter) -> None
 
-        """
-        self.handler.setFormatter(formatter)
+class CustomLogger:
+
+    """
+            This the CustomLogger class to use in our scripts where we need to log the output on
+            terminal and in log file. A log file is generated and placed at /logs/logs.log directory.
+
+            Here, default logger level is DEBUG.
+            This means you can log INFO, WARNING, ERROR, and EXCEPTION.
+
+            Logging is configured once per process by the first CustomLogger; each level is
+            formatted by LevelFormatter, so log calls are safe from any thread.
+
+            Example of use cases:
+
+            from custom_logger.custom_logger import CustomLogger
+
+            logger = CustomLogger(__name__)
+
+            logger.info("Info")
+            logger.warn("Warning!")
+            logger.error("Error")
+            logger.exception("Exception")
+    """
+
+    def __init__(self, module_name):
+        self.module_name = module_name
+
+        configure_logging()
+
+        # Create logger instance
+        self.logger = logging.getLogger(self.module_name)
 
-    
     # Customize and override log level methods
 
     def info(self, message: str) -> None:
-        self.setup_formatter(self.info_formatter)
-        self.logger.info(message)
-    
+        self.logger.info(message, extra=_CONSOLE_RECORD)
+
     def debug(self, message: str) -> None:
-        self.setup_formatter(self.debug_formatter)
-        self.logger.debug(message)
+        self.logger.debug(message, extra=_CONSOLE_RECORD)
 
     def warning(self, message: str) -> None:
-        self.setup_formatter(self.warning_formatter)
-        self.logger.warning(message)
-    
+        self.logger.warning(message, extra=_CONSOLE_RECORD)
+
     def error(self, message: str) -> None:
-        self.setup_formatter(self.error_formatter)
-        self.logger.error(message)
+        self.logger.error(message, extra=_CONSOLE_RECORD)
 
     def exception(self, message: str) -> None:
-        self.setup_formatter(self.exception_formatter)
-        self.logger.exception(message)
+        self.logger.exception(message, extra=_CONSOLE_RECORD)
 
     def critical(self, message: str) -> None:
-        self.setup_formatter(self.critical_formatter)
-        self.logger.critical(message)
-
-
+        self.logger.critical(message, extra=_CONSOLE_RECORD)
@@ -0,0 +1,111 @@
+import io
+import threading
+from typing import List, Optional
+
+from Bio import SeqIO
+from flask import Flask, jsonify, request
+
+from primer.filter.filter_manager import FilterManager
+from primer.primer3 import Primer3
+from primer.primer_pair_table import PrimerPairTable
+from primer.ranker.ranker import Ranker
+from primer.slice_data import SliceData
+from primer.surrounding_region import SurroundingRegionProvider
+from primer.write_primer_output import reorder_columns
+from utils.exceptions import Primer3Error
+
+from custom_logger.custom_logger import CustomLogger
+
+# Initialize logger
+logger = CustomLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 5000
+
+
+class DesignService:
+    """
+        Primer design pipeline kept warm between design jobs.
+
+        Configs, the kmer lists, the reference genome handle and the Primer3 worker pool are
+        set up once when the service starts; each job then only parses its pre-targetons and
+        runs Primer3, the filters and the ranking. Jobs run one at a time.
+    """
+
+    def __init__(
+            self,
+            primer3: Primer3,
+            filter_manager: FilterManager,
+            ranker: Ranker,
+            column_order: List[str],
+            surrounding_region_provider: Optional[SurroundingRegionProvider] = None,
+            primer_type: str = 'LibAmp'
+    ):
+        self.primer3 = primer3
+        self.filter_manager = filter_manager
+        self.ranker = ranker
+        self.column_order = column_order
+        self.surrounding_region_provider = surrounding_region_provider
+        self.primer_type = primer_type
+        self._lock = threading.Lock()
+
+    def design(self, fasta: str) -> dict:
+        """Ranked primers of every pre-targeton of a FASTA string, in the order of the FASTA records."""
+        slices = [SliceData.from_fasta_record(record, self.surrounding_region_provider)
+                  for record in SeqIO.parse(io.StringIO(fasta), 'fasta')]
+        if not slices:
+            raise ValueError('No pre-targeton found in the FASTA sequence')
+
+        with self._lock:
+            designed = [(slice_data, self._rank(primers))
+                        for slice_data, primers in self.primer3.get_primers_batch(slices)]
+
+        # Pre-targetons without primer pairs are skipped by Primer3
+        designed_slices = {id(slice_data) for slice_data, _ in designed}
+
+        return {
+            'pre_targetons': [{'name': slice_data.name, **result} for slice_data, result in designed],
+            'skipped': [slice_data.name for slice_data in slices if id(slice_data) not in designed_slices],
+        }
+
+    def _rank(self, primers: list) -> dict:
+        ranked_primer_pairs = self.ranker.rank_table(
+            self.filter_manager.filter_table(PrimerPairTable.from_primer_pairs(primers)))
+
+        primer_pairs = ranked_primer_pairs.kept()
+        primers_df = primer_pairs.to_primers_dataframe(self.primer_type)
+
+        # Same columns as the CSV files written by the primer command for this config
+        return {
+            'primers': reorder_columns(self.column_order, primers_df).to_dict(orient='records'),
+            'discarded_pairs': len(ranked_primer_pairs.discarded()),
+        }
+
+
+def create_app(service: DesignService) -> Flask:
+    app = Flask(__name__)
+    # Primers are returned in the configured column order
+    app.json.sort_keys = False
+
+    @app.get('/health')
+    def health():
+        return jsonify(status='ok')
+
+    @app.post('/design')
+    def design():
+        payload = request.get_json(silent=True) or {}
+        fasta = payload.get('fasta')
+        if not fasta:
+            return jsonify(error="Request body must be JSON with the pre-targetons in a 'fasta' field"), 400
+
+        try:
+            result = service.design(fasta)
+        except ValueError as err:
+            return jsonify(error=str(err)), 400
+        except (Primer3Error, OSError) as err:
+            logger.error(f"Primer3 failed for the design request: {err}")
+            return jsonify(error=f"Primer3 failed: {err}"), 500
+
+        return jsonify(result)
+
+    return app
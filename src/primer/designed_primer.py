@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 
 @dataclass
@@ -23,6 +23,11 @@ class DesignedPrimer:
     self_end_th: float
     hairpin_th: float
     end_stability: float
+    # Canonical identity of the primer: sequence plus genomic coordinates and strand
+    key: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.key = primer_key(self.sequence, self.primer_start, self.primer_end, self.strand)
 
     def __eq__(self, other):
         if isinstance(other, DesignedPrimer):
@@ -61,6 +66,10 @@ class DesignedPrimer:
         ))
 
 
+def primer_key(sequence: str, primer_start: int, primer_end: int, strand: str) -> str:
+    return f'{sequence}:{primer_start}-{primer_end}({strand})'
+
+
 def map_to_designed_primer(primer: dict):
     return DesignedPrimer(
         name=primer["primer"],
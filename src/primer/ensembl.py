@@ -1,14 +1,44 @@
 import time
+from typing import Dict, List
 
 import requests
 
+from config.defaults import ENSEMBL_URL
+from utils.instrumentation import instrumentation
+
+# Maximum number of regions accepted by a single POST /sequence/region request
+ENSEMBL_MAX_REGIONS = 50
+
 
 def get_seq_from_ensembl_by_coords(chromosome: str, start: int, end: int):
     url = 'https://rest.ensembl.org/sequence/region/human/' + chromosome + ':' + str(start) + '..' + str(end) + ':1'
     headers = {'Content-type': 'text/plain'}
     response = requests.get(url, headers=headers)
+    instrumentation.count('ensembl_requests')
     time.sleep(0.1)
     if response.status_code == requests.codes.ok:
         return response.text
     else:
         raise requests.exceptions.RequestException
+
+
+def get_seqs_from_ensembl_by_regions(regions: List[str], base_url: str = ENSEMBL_URL) -> Dict[str, str]:
+    """Fetch many 'chromosome:start..end:strand' regions with the batch endpoint, keyed by region."""
+    url = base_url.rstrip('/') + '/sequence/region/human'
+    headers = {'Content-type': 'application/json', 'Accept': 'application/json'}
+
+    sequences = {}
+    for index in range(0, len(regions), ENSEMBL_MAX_REGIONS):
+        if index:
+            time.sleep(0.1)
+
+        response = requests.post(url, headers=headers, json={'regions': regions[index:index + ENSEMBL_MAX_REGIONS]})
+        instrumentation.count('ensembl_requests')
+        if response.status_code != requests.codes.ok:
+            raise requests.exceptions.RequestException(
+                f'Ensembl request failed with status {response.status_code}: {response.text}')
+
+        for result in response.json():
+            sequences[result['query']] = result['seq']
+
+    return sequences
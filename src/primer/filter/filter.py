@@ -1,8 +1,12 @@
 from abc import ABC, abstractmethod
 from typing import List
 
+import numpy as np
+
 from primer.filter.filter_response import FilterResponse
 from primer.primer_pair import PrimerPair
+from primer.primer_pair_discarded import PrimerPairDiscarded
+from primer.primer_pair_table import PrimerPairTable
 
 
 class Filter(ABC):
@@ -11,5 +15,15 @@ class Filter(ABC):
     reason_discarded: str
 
     @abstractmethod
-    def apply(self, mbs: List[PrimerPair]) -> FilterResponse:
+    def keep_mask(self, primer_pairs: PrimerPairTable) -> np.ndarray:
+        """Boolean array with one value per row of the table, True for the pairs to keep."""
         pass
+
+    def apply(self, pairs: List[PrimerPair]) -> FilterResponse:
+        keep_mask = self.keep_mask(PrimerPairTable.from_primer_pairs(pairs))
+
+        pairs_to_keep = [pair for pair, keep in zip(pairs, keep_mask) if keep]
+        pairs_to_discard = [PrimerPairDiscarded(pair, self.reason_discarded)
+                            for pair, keep in zip(pairs, keep_mask) if not keep]
+
+        return FilterResponse(pairs_to_keep, pairs_to_discard)
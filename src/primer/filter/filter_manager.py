@@ -1,11 +1,19 @@
 import sys
-from typing import List
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
 
 from primer.filter.filter import Filter
 from primer.filter.hap1_variant_filter import HAP1VariantFilter
 from primer.filter.duplicates_filter import DuplicatesFilter
 from primer.filter.filter_response import FilterResponse
 from primer.primer_pair import PrimerPair
+from primer.primer_pair_discarded import PrimerPairDiscarded
+from primer.primer_pair_table import DISCARD_ORDER_COLUMN, DISCARD_REASON_COLUMN, PrimerPairTable
+from primer.primer_registry import PrimerRegistry
+from utils.get_data.hap1_index import HAP1VariantIndex
+from utils.instrumentation import instrumentation
 
 from custom_logger.custom_logger import CustomLogger
 
@@ -15,9 +23,14 @@ logger = CustomLogger(__name__)
 
 class FilterManager:
 
-    def __init__(self, apply_filters: dict):
+    def __init__(
+            self,
+            apply_filters: dict,
+            hap1_variant_index: Optional[HAP1VariantIndex] = None,
+            primer_registry: Optional[PrimerRegistry] = None
+    ):
 
-        self.filters: List[Filter] = [DuplicatesFilter(), HAP1VariantFilter()]
+        self.filters: List[Filter] = [DuplicatesFilter(), HAP1VariantFilter(hap1_variant_index, primer_registry)]
 
         self._filters_to_apply: List[Filter] = []
 
@@ -50,24 +63,75 @@ class FilterManager:
 
 
     def apply_filters(self, primer_pairs_data: List[PrimerPair]) -> FilterResponse:
+        filtered_pairs = self.filter_table(PrimerPairTable.from_primer_pairs(primer_pairs_data))
+        discarded_pairs = filtered_pairs.discarded().pairs
+
+        pairs_to_keep = [primer_pairs_data[row] for row in filtered_pairs.kept().pairs.index]
+        pairs_to_discard = [PrimerPairDiscarded(primer_pairs_data[row], reason)
+                            for row, reason in zip(discarded_pairs.index, discarded_pairs[DISCARD_REASON_COLUMN])]
 
-        pairs_to_keep = primer_pairs_data
-        pairs_to_discard = []
+        return FilterResponse(primer_pairs_to_keep=pairs_to_keep,
+                              primer_pairs_to_discard=pairs_to_discard)
 
-        for _filter in self._filters_to_apply:
+    def filter_table(self, primer_pairs: PrimerPairTable) -> PrimerPairTable:
+        """Run the filters over the whole table and set the discard_reason of every discarded pair."""
+        with instrumentation.stage('filters') as stage:
+            discard_reasons = np.full(len(primer_pairs), None, dtype=object)
+            discard_orders = np.full(len(primer_pairs), np.nan)
 
-            logger.info(f"Filter {_filter.key} is applied.")
+            for step, _filter in enumerate(self._filters_to_apply):
 
-            if _filter.key == "HAP1_variant":
-                logger.info("Requesting HAP1 variant Web service...")
+                logger.info(f"Filter {_filter.key} is applied.")
 
-            filter_response = _filter.apply(pairs_to_keep)
+                if _filter.key == "HAP1_variant":
+                    if _filter.variant_index is None:
+                        logger.info("Requesting HAP1 variant Web service...")
+                    else:
+                        logger.info("Using local HAP1 variant index...")
 
-            pairs_to_keep = filter_response.primer_pairs_to_keep
-            pairs_to_discard.extend(filter_response.primer_pairs_to_discard)
+                _apply_filter(_filter, primer_pairs, discard_reasons, discard_orders, step)
 
-        if not pairs_to_keep:
+            stage.pairs_in = len(primer_pairs)
+            stage.pairs_out = int(pd.isna(discard_reasons).sum())
+
+        if pd.isna(discard_reasons).sum() == 0:
             logger.warning("All primer pairs discarded during filtering.")
 
-        return FilterResponse(primer_pairs_to_keep=pairs_to_keep,
-                              primer_pairs_to_discard=pairs_to_discard)
+        return PrimerPairTable(primer_pairs.pairs.assign(**{DISCARD_REASON_COLUMN: discard_reasons,
+                                                            DISCARD_ORDER_COLUMN: discard_orders}))
+
+    def filter_duplicates(self, primer_pairs: PrimerPairTable) -> PrimerPairTable:
+        """
+            Discard duplicated pairs in a table of already filtered pairs, e.g. identical pairs
+            designed for overlapping pre-targetons of a batch.
+        """
+        duplicates_filters = [_filter for _filter in self._filters_to_apply if isinstance(_filter, DuplicatesFilter)]
+        if not duplicates_filters or primer_pairs.empty:
+            return primer_pairs
+
+        discard_reasons = primer_pairs.pairs[DISCARD_REASON_COLUMN].to_numpy(dtype=object, copy=True)
+        discard_orders = primer_pairs.pairs[DISCARD_ORDER_COLUMN].to_numpy(dtype=float, copy=True)
+        # Runs after every filter of the pre-targetons
+        _apply_filter(duplicates_filters[0], primer_pairs, discard_reasons, discard_orders,
+                      len(self._filters_to_apply))
+
+        return PrimerPairTable(primer_pairs.pairs.assign(**{DISCARD_REASON_COLUMN: discard_reasons,
+                                                            DISCARD_ORDER_COLUMN: discard_orders}))
+
+
+def _apply_filter(
+        _filter: Filter,
+        primer_pairs: PrimerPairTable,
+        discard_reasons: np.ndarray,
+        discard_orders: np.ndarray,
+        step: int
+) -> None:
+    # Each filter only sees the pairs kept by the previous ones
+    kept_rows = np.flatnonzero(pd.isna(discard_reasons))
+    with instrumentation.stage(f'filter.{_filter.key}') as stage:
+        keep_mask = _filter.keep_mask(PrimerPairTable(primer_pairs.pairs.iloc[kept_rows]))
+        stage.pairs_in = len(kept_rows)
+        stage.pairs_out = int(keep_mask.sum())
+
+    discard_reasons[kept_rows[~keep_mask]] = _filter.reason_discarded
+    discard_orders[kept_rows[~keep_mask]] = step
@@ -1,9 +1,12 @@
-from typing import List
+from typing import Optional
+
+import numpy as np
 
 from primer.filter.filter import Filter
-from primer.filter.filter_response import FilterResponse
-from primer.primer_pair import PrimerPair
-from primer.primer_pair_discarded import PrimerPairDiscarded
+from primer.primer_pair_table import DIRECTIONS, PrimerPairTable
+from primer.primer_registry import PrimerRegistry
+from utils.get_data.hap1 import contain_variants
+from utils.get_data.hap1_index import HAP1VariantIndex
 
 
 class HAP1VariantFilter(Filter):
@@ -11,14 +14,29 @@ class HAP1VariantFilter(Filter):
     value_type: type = bool
     reason_discarded: str = "contains background variants"
 
-    def apply(self, pairs: List[PrimerPair]) -> FilterResponse:
-        pairs_to_keep = []
-        pairs_to_discard = []
+    def __init__(self, variant_index: Optional[HAP1VariantIndex] = None, registry: Optional[PrimerRegistry] = None):
+        self.variant_index = variant_index
+        self.registry = registry
+
+    def keep_mask(self, primer_pairs: PrimerPairTable) -> np.ndarray:
+        pairs = primer_pairs.pairs
+        if pairs.empty:
+            return np.ones(0, dtype=bool)
+
+        # One column per primer of the pair, forward then reverse
+        chromosomes = np.repeat(pairs['chromosome'].to_numpy()[:, np.newaxis], 2, axis=1)
+        starts = np.column_stack([pairs[f'{direction}_primer_start'].to_numpy() for direction in DIRECTIONS])
+        ends = np.column_stack([pairs[f'{direction}_primer_end'].to_numpy() for direction in DIRECTIONS])
 
-        for pair in pairs:
-            if pair.contain_hap_one_variant:
-                pairs_to_discard.append(PrimerPairDiscarded(pair, HAP1VariantFilter.reason_discarded))
+        if self.variant_index is None:
+            intervals = list(zip(chromosomes.ravel().tolist(), starts.ravel().tolist(), ends.ravel().tolist()))
+            if self.registry is None:
+                intervals_with_variant = contain_variants(intervals)
             else:
-                pairs_to_keep.append(pair)
+                intervals_with_variant = self.registry.contain_variants(intervals, contain_variants)
+            has_variant = np.array([intervals_with_variant[interval] for interval in intervals], dtype=bool)
+        else:
+            # The local index answers the whole batch in one vectorised call, so results are not registered
+            has_variant = self.variant_index.contain_variants(chromosomes.ravel(), starts.ravel(), ends.ravel())
 
-        return FilterResponse(pairs_to_keep, pairs_to_discard)
+        return ~has_variant.reshape(-1, 2).any(axis=1)
@@ -0,0 +1,282 @@
+import os
+import struct
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from custom_logger.custom_logger import CustomLogger
+
+# Initialize logger
+logger = CustomLogger(__name__)
+
+# Primer3 default masking formula (libprimer3 masker.h): kmer list length -> coefficient
+KMER_LIST_COEFFICIENTS = {11: 0.1772, 16: 0.239}
+FORMULA_INTERCEPT = -4.336
+DEFAULT_KMER_LIST_PREFIX = 'homo_sapiens'
+
+# glistmaker list files: header, then sorted (2-bit packed kmer, count) records
+GLISTMAKER_MAGIC = ord('G') << 24 | ord('T') << 16 | ord('4') << 8 | ord('C')
+GLISTMAKER_HEADER_SIZE = 40
+GLISTMAKER_RECORD = np.dtype([('word', '<u8'), ('count', '<u4')])
+
+# Converted lists: the same kmers and counts as two aligned arrays, <list>.words.npy and <list>.counts.npy
+CONVERTED_SUFFIXES = ('.words.npy', '.counts.npy')
+CONVERSION_CHUNK_SIZE = 1 << 24
+
+# Failure rates closer than this to a stringency are not trusted to fall on the same side as in Primer3
+FAILURE_RATE_TOLERANCE = 1e-9
+
+# A -> 0, C -> 1, G -> 2, T/U -> 3, anything else breaks the kmer
+_NUCLEOTIDE_CODES = np.full(256, 4, dtype=np.uint64)
+for _nucleotides, _code in (('Aa', 0), ('Cc', 1), ('Gg', 2), ('TtUu', 3)):
+    for _nucleotide in _nucleotides:
+        _NUCLEOTIDE_CODES[ord(_nucleotide)] = _code
+
+
+class KmerList:
+    """
+        Frequencies of the kmers of one Primer3 kmer list file, memory-mapped rather than read.
+
+        Lists converted with convert_kmer_list are used when present next to the list file:
+        their kmers are contiguous, so they are searched in place with numpy.
+    """
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as list_file:
+            header = list_file.read(GLISTMAKER_HEADER_SIZE)
+
+        if len(header) < GLISTMAKER_HEADER_SIZE or struct.unpack_from('<I', header, 0)[0] != GLISTMAKER_MAGIC:
+            raise ValueError(f"Not a Primer3 kmer list file: '{path}'")
+
+        self.path = path
+        self.kmer_length = struct.unpack_from('<I', header, 12)[0]
+        words_in_list = struct.unpack_from('<I', header, 16)[0]
+        header_size = struct.unpack_from('<Q', header, 32)[0]
+
+        if not words_in_list:
+            raise ValueError(f"Kmer list file contains no kmers: '{path}'")
+
+        words_path, counts_path = converted_list_paths(path)
+        self.converted = os.path.exists(words_path) and os.path.exists(counts_path)
+        if self.converted:
+            self._words = np.load(words_path, mmap_mode='r')
+            self._counts = np.load(counts_path, mmap_mode='r')
+        else:
+            records = np.memmap(path, dtype=GLISTMAKER_RECORD, mode='r', offset=header_size,
+                                shape=(words_in_list,))
+            self._words = records['word']
+            self._counts = records['count']
+
+        if len(self._words) != words_in_list:
+            raise ValueError(f"Converted kmer list does not match '{path}', convert it again")
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def frequencies(self, words: np.ndarray) -> np.ndarray:
+        """
+        Frequency of each kmer or, when it is not listed, of its reverse complement.
+        Kmers missing from the list count once, as in Primer3.
+        """
+        frequencies = self._find(words)
+
+        missing = frequencies == 0
+        frequencies[missing] = self._find(reverse_complement(words[missing], self.kmer_length))
+
+        return np.maximum(frequencies, 1)
+
+    def _find(self, words: np.ndarray) -> np.ndarray:
+        size = len(self._words)
+        low = self._search(words)
+
+        index = np.minimum(low, size - 1)
+        found = (low < size) & (self._words[index] == words)
+        return np.where(found, self._counts[index], 0).astype(np.uint64)
+
+    def _search(self, words: np.ndarray) -> np.ndarray:
+        if self.converted:
+            return np.searchsorted(self._words, words)
+
+        # Binary search of all the words at once; the records are not contiguous so searchsorted would copy them
+        size = len(self._words)
+        low = np.zeros(len(words), dtype=np.int64)
+        high = np.full(len(words), size, dtype=np.int64)
+
+        while np.any(low < high):
+            searching = low < high
+            middle = (low + high) // 2
+            below = self._words[np.minimum(middle, size - 1)] < words
+            low = np.where(searching & below, middle + 1, low)
+            high = np.where(searching & ~below, middle, high)
+
+        return low
+
+
+class KmerMasker:
+    """
+        Reproduces the failure rates that Primer3 computes to mask a template (PRIMER_MASK_TEMPLATE).
+
+        Primer3 scores every kmer window of the template once per strand and masks the windows
+        whose failure rate is above PRIMER_MASK_FAILURE_RATE. The failure rates do not depend on
+        the stringency, so they are computed once per template and compared against each
+        stringency: two stringencies with no failure rate between them mask the template in
+        exactly the same way, and Primer3 returns the same designs for both.
+    """
+
+    def __init__(self, kmer_lists: Dict[int, KmerList]):
+        self.kmer_lists = kmer_lists
+        self.window_length = max(kmer_lists)
+
+    def failure_rates(self, sequence: str) -> np.ndarray:
+        """Failure rates of all the kmer windows of the sequence, forward then reverse strand."""
+        codes = _NUCLEOTIDE_CODES[np.frombuffer(sequence.encode('ascii'), dtype=np.uint8)]
+        words = _window_words(codes, self.window_length)
+        if not len(words):
+            return np.empty(0)
+
+        scores_fwd = np.zeros(len(words))
+        scores_rev = np.zeros(len(words))
+        for kmer_length, kmer_list in sorted(self.kmer_lists.items()):
+            coefficient = KMER_LIST_COEFFICIENTS[kmer_length]
+            if kmer_length == self.window_length:
+                score = coefficient * np.log(kmer_list.frequencies(words).astype(float))
+                scores_fwd += score
+                scores_rev += score
+            else:
+                # Shorter kmers are read at the 3' end of the window on each strand
+                last_kmers = words & _binary_mask(kmer_length)
+                first_kmers = words >> np.uint64(2 * (self.window_length - kmer_length))
+                scores_fwd += coefficient * np.log(kmer_list.frequencies(last_kmers).astype(float))
+                scores_rev += coefficient * np.log(kmer_list.frequencies(first_kmers).astype(float))
+
+        return np.concatenate([_failure_rate(scores_fwd), _failure_rate(scores_rev)])
+
+
+def same_mask(failure_rates: np.ndarray, stringency: float, other_stringency: float) -> bool:
+    """Whether Primer3 masks the template in the same way for both stringencies (PRIMER_MASK_FAILURE_RATE)."""
+    # Primer3 does not mask anything when the failure rate is 0
+    low, high = sorted(float(value) or np.inf for value in (stringency, other_stringency))
+
+    between = (failure_rates > low - FAILURE_RATE_TOLERANCE) & (failure_rates <= high + FAILURE_RATE_TOLERANCE)
+    return low == high or not np.any(between)
+
+
+def group_stringencies(failure_rates: np.ndarray, stringencies: Sequence[float], order: Sequence[int]) -> List[int]:
+    """
+    For each stringency, the index of the first stringency in the given order that masks the
+    template in the same way; stringencies that are their own representative need a Primer3 run.
+    """
+    representatives = list(range(len(stringencies)))
+    for position, index in enumerate(order):
+        for earlier in order[:position]:
+            if representatives[earlier] == earlier and same_mask(failure_rates, stringencies[earlier],
+                                                                 stringencies[index]):
+                representatives[index] = earlier
+                break
+
+    return representatives
+
+
+@lru_cache(maxsize=None)
+def load_kmer_masker(kmer_path: str, prefix: str = DEFAULT_KMER_LIST_PREFIX) -> KmerMasker:
+    """Kmer lists are memory-mapped once per process and shared by every template and stringency."""
+    return KmerMasker({
+        kmer_length: KmerList(os.path.join(kmer_path, f'{prefix}_{kmer_length}.list'))
+        for kmer_length in KMER_LIST_COEFFICIENTS
+    })
+
+
+def convert_kmer_list(path: str) -> Tuple[str, str]:
+    """
+    Write the kmers and counts of a Primer3 kmer list as two arrays next to it, copied in chunks
+    so that lists larger than memory can be converted. Returns the paths of the arrays.
+    """
+    kmer_list = KmerList(path)
+    words_path, counts_path = converted_list_paths(path)
+    if kmer_list.converted:
+        return words_path, counts_path
+
+    try:
+        _copy_kmer_list(kmer_list, f'{words_path}.tmp', f'{counts_path}.tmp')
+    except ValueError:
+        os.remove(f'{words_path}.tmp')
+        os.remove(f'{counts_path}.tmp')
+        raise
+
+    os.replace(f'{words_path}.tmp', words_path)
+    os.replace(f'{counts_path}.tmp', counts_path)
+
+    return words_path, counts_path
+
+
+def convert_kmer_lists(kmer_path: str, prefix: str = DEFAULT_KMER_LIST_PREFIX) -> List[str]:
+    converted_paths = []
+    for kmer_length in KMER_LIST_COEFFICIENTS:
+        list_path = os.path.join(kmer_path, f'{prefix}_{kmer_length}.list')
+        converted_paths.extend(convert_kmer_list(list_path))
+        logger.info(f"Kmer list converted: {list_path}")
+
+    return converted_paths
+
+
+def _copy_kmer_list(kmer_list: KmerList, words_path: str, counts_path: str) -> None:
+    words = np.lib.format.open_memmap(words_path, mode='w+', dtype='<u8', shape=(len(kmer_list),))
+    counts = np.lib.format.open_memmap(counts_path, mode='w+', dtype='<u4', shape=(len(kmer_list),))
+
+    previous_word = None
+    for start in range(0, len(kmer_list), CONVERSION_CHUNK_SIZE):
+        chunk = slice(start, start + CONVERSION_CHUNK_SIZE)
+        words[chunk] = kmer_list._words[chunk]
+        counts[chunk] = kmer_list._counts[chunk]
+
+        # Lookups rely on the kmers being sorted, as in Primer3
+        chunk_words = words[chunk]
+        if np.any(chunk_words[1:] < chunk_words[:-1]) or (previous_word is not None
+                                                           and chunk_words[0] < previous_word):
+            raise ValueError(f"Kmers are not sorted in kmer list file: '{kmer_list.path}'")
+        previous_word = chunk_words[-1]
+
+    words.flush()
+    counts.flush()
+
+
+def converted_list_paths(path: str) -> Tuple[str, str]:
+    return tuple(f'{path}{suffix}' for suffix in CONVERTED_SUFFIXES)
+
+
+def reverse_complement(words: np.ndarray, kmer_length: int) -> np.ndarray:
+    complement = ~words.astype(np.uint64) & _binary_mask(kmer_length)
+
+    result = np.zeros_like(complement)
+    for _ in range(kmer_length):
+        result = (result << np.uint64(2)) | (complement & np.uint64(3))
+        complement >>= np.uint64(2)
+
+    return result
+
+
+def _window_words(codes: np.ndarray, window_length: int) -> np.ndarray:
+    number_windows = len(codes) - window_length + 1
+    if number_windows <= 0:
+        return np.empty(0, dtype=np.uint64)
+
+    # Windows spanning a character other than a nucleotide are not scored
+    invalid = np.concatenate([[0], np.cumsum(codes > 3)])
+    is_valid = invalid[window_length:] == invalid[:number_windows]
+
+    words = np.zeros(number_windows, dtype=np.uint64)
+    for offset in range(window_length):
+        words = (words << np.uint64(2)) | (codes[offset:offset + number_windows] & np.uint64(3))
+
+    return words[is_valid]
+
+
+def _failure_rate(scores: np.ndarray) -> np.ndarray:
+    # Logistic formula as written in Primer3; windows that only contain unique kmers score 0
+    exponent = np.exp(scores + FORMULA_INTERCEPT)
+    return np.where(scores != 0, exponent / (1 + exponent), 0.0)
+
+
+def _binary_mask(kmer_length: int) -> np.uint64:
+    return np.uint64((1 << (2 * kmer_length)) - 1)
@@ -1,52 +1,148 @@
 import sys
 import primer3
 
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
 import os
 
+from config.defaults import STRINGENCY_SCHEDULE_ALL, STRINGENCY_SCHEDULE_EARLY_EXIT, STRINGENCY_SCHEDULES
+from primer.kmer_mask import DEFAULT_KMER_LIST_PREFIX, KmerMasker, group_stringencies, load_kmer_masker
 from primer.slice_data import SliceData
+from primer.primer3_cache import Primer3Cache
 from primer.primer3_prepare_config import prepare_p3_config
-from primer.primer_pair import PrimerPair, build_primer_pairs
+from primer.primer_pair import PrimerPair, build_primer_pairs, design_pair_keys
 from primer.primer3_handle_errors import format_no_primer_pairs_message, handle_primer3_errors
+from utils.exceptions import Primer3Error
+from utils.instrumentation import instrumentation
 
-from custom_logger.custom_logger import CustomLogger
+from custom_logger.custom_logger import CustomLogger, configure_worker_logging, worker_log_queue
 
 # Initialize logger
 logger = CustomLogger(__name__)
 
+# Number of pre-targetons queued per worker before results are merged back
+SLICES_PER_WORKER = 4
+
+# Primer3 default for PRIMER_NUM_RETURN
+DEFAULT_PRIMER_NUM_RETURN = 5
+
+# Key under which a failed Primer3 run returns its error instead of designs
+PRIMER3_ERROR_KEY = 'PRIMER_ERROR'
+
 
 class Primer3:
     def __init__(
             self,
             stringency_vector: list,
-            p3_config: dict
+            p3_config: dict,
+            workers: int = 1,
+            cache: Optional[Primer3Cache] = None,
+            stringency_schedule: str = STRINGENCY_SCHEDULE_ALL
     ) -> None:
 
+        if stringency_schedule not in STRINGENCY_SCHEDULES:
+            raise ValueError(f"Unknown stringency schedule '{stringency_schedule}', "
+                             f"expected one of: {', '.join(STRINGENCY_SCHEDULES)}")
+
         self._p3_config = p3_config
         self._kmer_lists_exist()
         self._stringency_vector = stringency_vector or [""]
+        self._workers = workers or 1
+        self._cache = cache
+        self._stringency_schedule = stringency_schedule
+
+        # Prepared once per run rather than for every pre-targeton
+        self._stringency_configs = [prepare_p3_config(self._p3_config, stringency)
+                                    for stringency in self._stringency_vector]
+        self._p3_config_text = self.format_p3_config(self._p3_config)
+        self._p3_config_echoed = False
+        self._executor: Optional[ProcessPoolExecutor] = None
 
     def get_primers(self, slice_data: SliceData) -> List[PrimerPair]:
-        logger.info('The pre-targeton used to generate primer pairs is:\n'
-                    f'\tid: {slice_data.targeton_id}\n'
-                    f'\tchromosome: {slice_data.chromosome}\n'
-                    f'\tstrand: {slice_data.strand}\n'
-                    f'\tstart: {slice_data.start}\n'
-                    f'\tend: {slice_data.end}')
+        self._log_pre_targeton(slice_data)
+        self._echo_p3_config()
 
-        primer_pairs = self._get_primer_pairs(slice_data)
+        with self._create_executor() as executor, instrumentation.stage('primer3'):
+            designs = self._get_primer3_designs_for_slices([slice_data], executor)[0]
+
+        primer_pairs = self._build_primer_pairs(slice_data, designs)
 
         return primer_pairs
 
-    def _get_primer_pairs(self, slice_data: SliceData) -> List[PrimerPair]:
+    def get_primers_batch(self, slices: Iterable[SliceData]) -> Iterator[Tuple[SliceData, List[PrimerPair]]]:
+        """
+        Design primer pairs for every pre-targeton, fanning the (pre-targeton, stringency)
+        Primer3 runs out across the worker pool. Results are yielded in input order;
+        pre-targetons without any primer pairs are skipped with a warning.
+        """
+        self._echo_p3_config()
+
+        slices = iter(slices)
+        with self._create_executor() as executor:
+            while True:
+                chunk = list(islice(slices, self._workers * SLICES_PER_WORKER))
+                if not chunk:
+                    break
+
+                with instrumentation.stage('primer3'):
+                    designs_per_slice = self._get_primer3_designs_for_slices(chunk, executor)
+
+                for slice_data, designs in zip(chunk, designs_per_slice):
+                    self._log_pre_targeton(slice_data)
+                    try:
+                        primer_pairs = self._build_primer_pairs(slice_data, designs)
+                    except (Primer3Error, ValueError) as err:
+                        logger.warning(f"Skipping pre-targeton '{slice_data.name}': {err}")
+                        continue
+
+                    yield slice_data, primer_pairs
+
+    def warm_up(self) -> None:
+        """
+        For long-running processes: load the kmer lists and keep the worker pool alive across
+        calls, so that later designs do not pay for them. Workers are started after the kmer
+        lists are mapped, so they share them.
+        """
+        if self._masks_template():
+            self._load_kmer_masker()
+
+        if self._workers > 1 and self._executor is None:
+            self._executor = self._start_workers()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _build_primer_pairs(
+            self,
+            slice_data: SliceData,
+            designs_per_stringency: List[Optional[dict]]
+    ) -> List[PrimerPair]:
+        with instrumentation.stage('build_primer_pairs') as stage:
+            primer_pairs = self._get_primer_pairs(slice_data, designs_per_stringency)
+            stage.pairs_out = len(primer_pairs)
+
+        return primer_pairs
+
+    def _get_primer_pairs(
+            self,
+            slice_data: SliceData,
+            designs_per_stringency: List[Optional[dict]]
+    ) -> List[PrimerPair]:
         primer_pairs = []
         primer_explain = []
 
-        p3_formatted_config = self.format_p3_config(self._p3_config)
-        sys.stdout.write(p3_formatted_config)
+        for designs in designs_per_stringency:
+            if designs is not None and PRIMER3_ERROR_KEY in designs:
+                raise Primer3Error(f"Primer3 failed: {designs[PRIMER3_ERROR_KEY]}")
 
-        for stringency in self._stringency_vector:
-            designs = self._get_primer3_designs(slice_data.p3_input, stringency)
+        for stringency, designs in zip(self._stringency_vector, designs_per_stringency):
+            # Stringency skipped by the early exit schedule
+            if designs is None:
+                continue
 
             number_pairs = designs['PRIMER_PAIR_NUM_RETURNED']
             primer_explain_flag = self._p3_config['PRIMER_EXPLAIN_FLAG']
@@ -65,13 +161,175 @@ class Primer3:
             handle_primer3_errors(primer_explain, any(primer_pairs))
         # If Primer3 returns pairs but built_primer_pairs does not
         elif not primer_pairs:
-            logger.info(p3_formatted_config)
+            logger.info(self._p3_config_text)
             raise ValueError("No primer pairs returned")
         return primer_pairs
 
-    def _get_primer3_designs(self, slice_info: dict, stringency: float) -> dict:
-        config_data = prepare_p3_config(self._p3_config, stringency)
-        return primer3.bindings.design_primers(slice_info, config_data)
+    def _get_primer3_designs_for_slices(
+            self,
+            slices: List[SliceData],
+            executor: Optional[ProcessPoolExecutor]
+    ) -> List[List[Optional[dict]]]:
+        stringency_configs = self._stringency_configs
+
+        if self._stringency_schedule == STRINGENCY_SCHEDULE_EARLY_EXIT:
+            return self._get_designs_early_exit(slices, executor)
+
+        order = list(range(len(stringency_configs)))
+        representatives = [self._group_stringencies(slice_data, order) for slice_data in slices]
+
+        # One Primer3 run per pre-targeton and distinct template mask, the other stringencies share its designs
+        jobs = [(slice_index, stringency_index)
+                for slice_index, slice_representatives in enumerate(representatives)
+                for stringency_index, representative in enumerate(slice_representatives)
+                if representative == stringency_index]
+
+        designs = self._run_design_jobs([slices[slice_index].p3_input for slice_index, _ in jobs],
+                                        [stringency_configs[stringency_index] for _, stringency_index in jobs],
+                                        executor)
+
+        designs_per_slice = [[None] * len(stringency_configs) for _ in slices]
+        for (slice_index, stringency_index), slice_designs in zip(jobs, designs):
+            designs_per_slice[slice_index][stringency_index] = slice_designs
+
+        # Representatives come first in stringency vector order, so their designs are already in place
+        for slice_designs, slice_representatives in zip(designs_per_slice, representatives):
+            for stringency_index, representative in enumerate(slice_representatives):
+                slice_designs[stringency_index] = slice_designs[representative]
+
+        return designs_per_slice
+
+    def _get_designs_early_exit(
+            self,
+            slices: List[SliceData],
+            executor: Optional[ProcessPoolExecutor]
+    ) -> List[List[Optional[dict]]]:
+        """
+        Run the stringencies one at a time, most stringent (lowest mask failure rate) first.
+        A pre-targeton drops out of the later, looser runs once the runs so far returned
+        PRIMER_NUM_RETURN distinct pairs; the stringencies it skipped are left as None.
+        Pairs are told apart by the key the duplicates filter uses, as looser stringencies
+        mostly find the pairs of the stricter ones again.
+        """
+        num_return = self._p3_config.get('PRIMER_NUM_RETURN', DEFAULT_PRIMER_NUM_RETURN)
+        stringency_configs = self._stringency_configs
+        designs_per_slice = [[None] * len(stringency_configs) for _ in slices]
+        pairs_per_slice: List[Set[str]] = [set() for _ in slices]
+
+        schedule = sorted(range(len(stringency_configs)), key=lambda i: self._stringency_vector[i])
+        representatives = [self._group_stringencies(slice_data, schedule) for slice_data in slices]
+
+        failed: Set[int] = set()
+
+        for stringency_index in schedule:
+            pending = [i for i, pair_keys in enumerate(pairs_per_slice)
+                       if len(pair_keys) < num_return and i not in failed]
+            if not pending:
+                break
+
+            # Stringencies masking the template like an earlier one reuse its designs instead of running
+            to_run = [i for i in pending if representatives[i][stringency_index] == stringency_index]
+            config = stringency_configs[stringency_index]
+            designs = dict(zip(to_run, self._run_design_jobs([slices[i].p3_input for i in to_run],
+                                                             [config] * len(to_run), executor)))
+
+            for slice_index in pending:
+                if slice_index in designs:
+                    slice_designs = designs[slice_index]
+                    if PRIMER3_ERROR_KEY in slice_designs:
+                        # The pre-targeton is skipped when its pairs are built, looser runs would fail the same way
+                        failed.add(slice_index)
+                    else:
+                        pairs_per_slice[slice_index].update(design_pair_keys(slice_designs, slices[slice_index]))
+                else:
+                    # Same pairs as the stringency it reuses, which are already counted
+                    representative = representatives[slice_index][stringency_index]
+                    slice_designs = designs_per_slice[slice_index][representative]
+
+                designs_per_slice[slice_index][stringency_index] = slice_designs
+
+        return designs_per_slice
+
+    def _group_stringencies(self, slice_data: SliceData, order: List[int]) -> List[int]:
+        """
+        Index of the stringency whose Primer3 designs each stringency can reuse, itself if none.
+        Only PRIMER_MASK_FAILURE_RATE changes between stringencies, so stringencies for which
+        the kmer masking of the template is the same get the same designs from Primer3.
+        """
+        if not (self._masks_template() and self._p3_config.get('PRIMER_MASK_FAILURE_RATE') is not None):
+            return list(range(len(self._stringency_vector)))
+
+        # Scored over the whole template, which can only keep stringencies apart that Primer3 would not
+        failure_rates = self._load_kmer_masker().failure_rates(slice_data.bases)
+        return group_stringencies(failure_rates, self._stringency_vector, order)
+
+    def _masks_template(self) -> bool:
+        return bool(self._p3_config.get('PRIMER_MASK_TEMPLATE'))
+
+    def _load_kmer_masker(self) -> KmerMasker:
+        return load_kmer_masker(self._p3_config['PRIMER_MASK_KMERLIST_PATH'],
+                                self._p3_config.get('PRIMER_MASK_KMERLIST_PREFIX', DEFAULT_KMER_LIST_PREFIX))
+
+    def _run_design_jobs(
+            self,
+            slice_inputs: List[dict],
+            configs: List[dict],
+            executor: Optional[ProcessPoolExecutor]
+    ) -> List[dict]:
+        if self._cache is None:
+            return self._run_primer3(slice_inputs, configs, executor)
+
+        # The cache is read and written by this process only, so that its size limit holds with workers
+        keys = [self._cache.key(slice_info, config) for slice_info, config in zip(slice_inputs, configs)]
+        designs = [self._cache.get(key) for key in keys]
+        misses = [index for index, cached_designs in enumerate(designs) if cached_designs is None]
+
+        designed = self._run_primer3([slice_inputs[index] for index in misses],
+                                     [configs[index] for index in misses], executor)
+        for index, missing_designs in zip(misses, designed):
+            if PRIMER3_ERROR_KEY not in missing_designs:
+                self._cache.set(keys[index], missing_designs)
+            designs[index] = missing_designs
+
+        return designs
+
+    @staticmethod
+    def _run_primer3(
+            slice_inputs: List[dict],
+            configs: List[dict],
+            executor: Optional[ProcessPoolExecutor]
+    ) -> List[dict]:
+        instrumentation.count('primer3_runs', len(configs))
+
+        if executor is None:
+            return list(map(_design_primers, slice_inputs, configs))
+        return list(executor.map(_design_primers, slice_inputs, configs))
+
+    def _echo_p3_config(self) -> None:
+        if not self._p3_config_echoed:
+            sys.stdout.write(self._p3_config_text)
+            self._p3_config_echoed = True
+
+    def _create_executor(self):
+        if self._executor is not None:
+            return nullcontext(self._executor)
+        if self._workers > 1:
+            return self._start_workers()
+        return nullcontext()
+
+    def _start_workers(self) -> ProcessPoolExecutor:
+        # Workers hand their log records to this process rather than writing the log file themselves
+        return ProcessPoolExecutor(max_workers=self._workers, initializer=configure_worker_logging,
+                                   initargs=(worker_log_queue(),))
+
+    @staticmethod
+    def _log_pre_targeton(slice_data: SliceData) -> None:
+        logger.info('The pre-targeton used to generate primer pairs is:\n'
+                    f'\tid: {slice_data.targeton_id}\n'
+                    f'\tchromosome: {slice_data.chromosome}\n'
+                    f'\tstrand: {slice_data.strand}\n'
+                    f'\tstart: {slice_data.start}\n'
+                    f'\tend: {slice_data.end}')
 
     def _kmer_lists_exist(self) -> None:
         if self._p3_config['PRIMER_MASK_TEMPLATE']:
@@ -103,3 +361,11 @@ class Primer3:
 
         return p3_config_params
 
+
+def _design_primers(slice_info: dict, config_data: dict) -> dict:
+    # Module level so that it can be pickled and run in worker processes
+    try:
+        return primer3.bindings.design_primers(slice_info, config_data)
+    except OSError as err:
+        # Returned instead of raised, so that the other runs of the batch are not lost
+        return {PRIMER3_ERROR_KEY: str(err)}
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import primer3
+
+from config.defaults import DEFAULT_P3_CACHE_MAX_MB
+from primer.kmer_mask import DEFAULT_KMER_LIST_PREFIX, KMER_LIST_COEFFICIENTS
+from custom_logger.custom_logger import CustomLogger
+
+# Initialize logger
+logger = CustomLogger(__name__)
+
+
+class Primer3Cache:
+    """
+        Content-addressed on-disk cache of Primer3 design results.
+
+        Entries are keyed by a hash of the Primer3 sequence input, the stringency-specific
+        Primer3 config, the Primer3 version and, when the template is masked, the size and
+        modification time of the kmer lists, so repeated runs skip Primer3 for unchanged
+        pre-targetons. Reading an entry refreshes its modification time; once the cache grows
+        beyond max_size_mb the least recently used entries are removed.
+
+        The size of the cache is tracked by the process writing to it, so entries should only
+        be set by one process of a run (not by Primer3 worker processes).
+    """
+
+    def __init__(self, cache_dir: str, max_size_mb: float = DEFAULT_P3_CACHE_MAX_MB):
+        self.cache_dir = cache_dir
+        self.max_size = int(max_size_mb * 1024 * 1024)
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._size = sum(os.path.getsize(entry) for entry in self._entries())
+
+    @staticmethod
+    def key(slice_info: dict, config_data: dict) -> str:
+        kmer_lists: Tuple[tuple, ...] = ()
+        if config_data.get('PRIMER_MASK_TEMPLATE'):
+            kmer_lists = _kmer_lists_identity(
+                config_data.get('PRIMER_MASK_KMERLIST_PATH', ''),
+                config_data.get('PRIMER_MASK_KMERLIST_PREFIX', DEFAULT_KMER_LIST_PREFIX)
+            )
+
+        content = json.dumps([slice_info, config_data, primer3.__version__, kmer_lists],
+                             sort_keys=True, default=str)
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        entry_path = self._entry_path(key)
+
+        try:
+            with open(entry_path, 'rb') as entry:
+                designs = pickle.load(entry)
+            os.utime(entry_path)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError):
+            logger.warning(f"Ignoring corrupted Primer3 cache entry: {entry_path}")
+            return None
+
+        return designs
+
+    def set(self, key: str, designs: dict) -> None:
+        entry_path = self._entry_path(key)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+
+        # Write to a temporary file first so concurrent workers never read a partial entry
+        file_descriptor, tmp_path = tempfile.mkstemp(dir=os.path.dirname(entry_path))
+        with os.fdopen(file_descriptor, 'wb') as entry:
+            pickle.dump(designs, entry, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, entry_path)
+
+        self._size += os.path.getsize(entry_path)
+        if self._size > self.max_size:
+            self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for entry in self._entries():
+            try:
+                entries.append((os.path.getmtime(entry), os.path.getsize(entry), entry))
+            except FileNotFoundError:
+                continue
+
+        self._size = sum(size for _, size, _ in entries)
+
+        for _, size, entry in sorted(entries):
+            if self._size <= self.max_size:
+                break
+            try:
+                os.remove(entry)
+            except FileNotFoundError:
+                pass
+            self._size -= size
+
+    def _entries(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for file_name in files:
+                if file_name.endswith('.pickle'):
+                    yield os.path.join(root, file_name)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f'{key}.pickle')
+
+
+@lru_cache(maxsize=None)
+def _kmer_lists_identity(kmer_path: str, prefix: str) -> Tuple[tuple, ...]:
+    # Replacing a kmer list changes the masking, hence the designs; checked once per process
+    identity = []
+    for kmer_length in KMER_LIST_COEFFICIENTS:
+        list_path = os.path.join(kmer_path, f'{prefix}_{kmer_length}.list')
+        try:
+            stat = os.stat(list_path)
+        except FileNotFoundError:
+            identity.append((list_path, None, None))
+        else:
+            identity.append((os.path.abspath(list_path), stat.st_size, stat.st_mtime_ns))
+
+    return tuple(identity)
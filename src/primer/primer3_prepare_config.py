@@ -1,8 +1,6 @@
-import copy
-
-
 def prepare_p3_config(base_config: dict, stringency: float) -> dict:
-    result_config = copy.deepcopy(base_config)
+    # Only a top-level value is replaced and Primer3 does not modify its config, so a shallow copy is enough
+    result_config = dict(base_config)
 
     if base_config.get('PRIMER_MASK_FAILURE_RATE') is not None:
         result_config['PRIMER_MASK_FAILURE_RATE'] = stringency
@@ -1,9 +1,9 @@
-from typing import Tuple, List, Optional
+from typing import Dict, Tuple, List, Set
 from collections import defaultdict
 import re
 import uuid
 
-from primer.designed_primer import map_to_designed_primer
+from primer.designed_primer import map_to_designed_primer, primer_key
 from utils.get_data.hap1 import contain_variant
 from primer.slice_data import SliceData
 
@@ -28,7 +28,7 @@ class PrimerPair:
         self.reverse_primer_data = {}
         self.reverse = None
         self.forward = None
-
+        self._key = None
 
     def __repr__(self):
         return (f"PrimerPair(pair_id='{self.id}', "
@@ -55,6 +55,13 @@ class PrimerPair:
     def __hash__(self):
         return hash((self.chromosome, self.forward, self.reverse))
 
+    @property
+    def key(self) -> str:
+        """Canonical identity of the pair, shared by identical pairs designed from different slices."""
+        if self._key is None:
+            self._key = pair_key(self.chromosome, self.forward.key, self.reverse.key)
+        return self._key
+
     @property
     def contain_hap_one_variant(self) -> bool:
         forward_start, forward_end = self.forward.primer_start, self.forward.primer_end
@@ -64,6 +71,28 @@ class PrimerPair:
                 contain_variant(self.chromosome, reverse_start, reverse_end))
 
 
+def pair_key(chromosome: str, forward_key: str, reverse_key: str) -> str:
+    return f'{chromosome}:{forward_key}|{reverse_key}'
+
+
+def design_pair_keys(design: dict, slice_data: SliceData) -> Set[str]:
+    """Keys of the primer pairs in a Primer3 design, as PrimerPair.key gives them, without building the pairs."""
+    keys = set()
+    for pair_number in range(design['PRIMER_PAIR_NUM_RETURNED']):
+        primer_keys = {}
+        for side in ('left', 'right'):
+            design_key = f'PRIMER_{side.upper()}_{pair_number}'
+            primer_start, primer_end = calculate_primer_coords(
+                side, design[design_key], slice_data.start, slice_data.end, slice_data.strand)
+            strand = determine_primer_strands(side, slice_data.strand)
+            primer_keys[name_primers(side, slice_data.strand)] = primer_key(
+                design[f'{design_key}_SEQUENCE'], primer_start, primer_end, strand)
+
+        keys.add(pair_key(slice_data.chromosome, primer_keys['LibAmpF'], primer_keys['LibAmpR']))
+
+    return keys
+
+
 def build_primer_loci(
         primer,
         key,
@@ -117,8 +146,11 @@ def name_primers(side: str, strand: str) -> str:
     return primer_name
 
 
+PRIMER_DETAILS_PATTERN = re.compile(r'^(primer_(left|right)_(\d+))(\_(\S+))?$')
+
+
 def capture_primer_details(primer_name: str) -> dict:
-    match = re.search(r'^(primer_(left|right)_(\d+))(\_(\S+))?$', primer_name.lower())
+    match = PRIMER_DETAILS_PATTERN.search(primer_name.lower())
     result = {}
     if match:
         primer_id = match.group(1)
@@ -199,23 +231,23 @@ def build_primer_pairs(
         slice_data: SliceData,
         stringency: float,
 ) -> List[PrimerPair]:
-    primer_pairs = []
+    # Pairs are indexed by their Primer3 pair number so that each output key is handled in a single pass
+    pairs_by_number: Dict[str, PrimerPair] = {}
     primers = defaultdict(dict)
 
+    stringency_string = "_str" + str(stringency).replace(".", "_")
+
     for key in design.keys():
         primer_details = capture_primer_details(key)
 
         if primer_details:
-            libamp_name = name_primers(primer_details['side'], slice_data.strand)
-            primer_name = slice_data.name + "_" + libamp_name + "_" + \
-                          primer_details['pair']
+            pair_number = primer_details['pair']
 
-            stringency_string = "_str" + str(stringency).replace(".", "_")
+            libamp_name = name_primers(primer_details['side'], slice_data.strand)
+            primer_name = slice_data.name + "_" + libamp_name + "_" + pair_number
 
             primer_name_with_stringency = primer_name + stringency_string
-            primer_pair_id = slice_data.name + "_" + primer_details['pair'] + stringency_string
-
-            primer_pair_product_size = design['PRIMER_PAIR_' + primer_details['pair'] + '_PRODUCT_SIZE']
+            primer_pair_id = slice_data.name + "_" + pair_number + stringency_string
 
             primer = build_primer_loci(
                 primers[primer_name_with_stringency],
@@ -227,7 +259,7 @@ def build_primer_pairs(
                 primer_pair_id,
             )
 
-            pair = _find_pair_by_id(primer_pairs, primer_pair_id)
+            pair = pairs_by_number.get(pair_number)
             if pair is None:
                 uid = str(uuid.uuid1())
                 pair = PrimerPair(
@@ -235,19 +267,19 @@ def build_primer_pairs(
                     chromosome=slice_data.chromosome,
                     pre_targeton_start=slice_data.start,
                     pre_targeton_end=slice_data.end,
-                    product_size=primer_pair_product_size,
+                    product_size=design['PRIMER_PAIR_' + pair_number + '_PRODUCT_SIZE'],
                     stringency=stringency,
                     targeton_id=slice_data.targeton_id,
                     uid=uid
                 )
-                primer_pairs.append(pair)
+                pairs_by_number[pair_number] = pair
 
             if libamp_name == "LibAmpF":
                 pair.forward_primer_data = primer
             if libamp_name == "LibAmpR":
                 pair.reverse_primer_data = primer
 
-    primer_pairs = _map_primers_into_designed_primers_objects(primer_pairs)
+    primer_pairs = _map_primers_into_designed_primers_objects(list(pairs_by_number.values()))
     return primer_pairs
 
 
@@ -258,9 +290,3 @@ def _map_primers_into_designed_primers_objects(primer_pairs: List[PrimerPair]) -
 
     return primer_pairs
 
-
-def _find_pair_by_id(pairs: List[PrimerPair], pair_id: str) -> Optional[PrimerPair]:
-    for pair in pairs:
-        if pair.id == pair_id:
-            return pair
-    return None
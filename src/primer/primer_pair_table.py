@@ -0,0 +1,163 @@
+from operator import attrgetter
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from primer.primer_pair import PrimerPair
+
+# Attributes of each primer, stored once per pair as forward_<field> and reverse_<field> columns
+PRIMER_FIELDS = {
+    'primer': 'name',
+    'penalty': 'penalty',
+    'sequence': 'sequence',
+    'primer_start': 'primer_start',
+    'primer_end': 'primer_end',
+    'strand': 'strand',
+    'tm': 'tm',
+    'gc_percent': 'gc_percent',
+    'self_any_th': 'self_any_th',
+    'self_end_th': 'self_end_th',
+    'hairpin_th': 'hairpin_th',
+    'end_stability': 'end_stability',
+}
+
+# Attributes shared by both primers of a pair
+PAIR_FIELDS = {
+    'pair_uid': 'uid',
+    'stringency': 'stringency',
+    'chromosome': 'chromosome',
+    'pre_targeton_start': 'pre_targeton_start',
+    'pre_targeton_end': 'pre_targeton_end',
+    'product_size': 'product_size',
+    'targeton_id': 'targeton_id',
+}
+
+# Primer columns written to the CSV outputs, in output order
+PRIMER_OUTPUT_COLUMNS = [field for field in PRIMER_FIELDS if field != 'strand']
+
+DIRECTIONS = ('forward', 'reverse')
+DISCARD_REASON_COLUMN = 'discard_reason'
+# Step of the filtering that discarded the pair, so that discarded pairs keep the order the filters ran in
+DISCARD_ORDER_COLUMN = 'discard_order'
+PAIR_KEY_COLUMN = 'pair_key'
+
+
+class PrimerPairTable:
+    """
+        Columnar table of primer pairs with one row per pair.
+
+        Each primer attribute is stored as a forward_<field> and a reverse_<field> column, next to
+        the pair-level columns. The table is built once from the designed primer pairs; ranking,
+        BED rows and the one-row-per-primer CSV frame are all derived from its columns.
+        Pairs discarded by the filters stay in the table with their discard_reason set,
+        so kept and discarded outputs are views of the same table.
+    """
+
+    def __init__(self, pairs: pd.DataFrame):
+        self.pairs = pairs
+
+    def __len__(self) -> int:
+        return len(self.pairs.index)
+
+    @property
+    def empty(self) -> bool:
+        return self.pairs.empty
+
+    @staticmethod
+    def from_primer_pairs(
+            primer_pairs: List[PrimerPair],
+            discard_reasons: Optional[List[str]] = None
+    ) -> 'PrimerPairTable':
+        columns = {}
+        for direction in DIRECTIONS:
+            primers = [getattr(pair, direction) for pair in primer_pairs]
+            for column, attribute in PRIMER_FIELDS.items():
+                columns[f'{direction}_{column}'] = list(map(attrgetter(attribute), primers))
+
+        for column, attribute in PAIR_FIELDS.items():
+            columns[column] = list(map(attrgetter(attribute), primer_pairs))
+
+        columns[PAIR_KEY_COLUMN] = list(map(attrgetter('key'), primer_pairs))
+
+        if discard_reasons is not None:
+            columns[DISCARD_REASON_COLUMN] = discard_reasons
+
+        return PrimerPairTable(pd.DataFrame(columns))
+
+    @staticmethod
+    def concat(tables: List['PrimerPairTable']) -> 'PrimerPairTable':
+        if not tables:
+            return PrimerPairTable.from_primer_pairs([])
+
+        return PrimerPairTable(pd.concat([table.pairs for table in tables], ignore_index=True))
+
+    def kept(self) -> 'PrimerPairTable':
+        if DISCARD_REASON_COLUMN not in self.pairs.columns:
+            return self
+
+        is_kept = self.pairs[DISCARD_REASON_COLUMN].isna()
+        return PrimerPairTable(self.pairs[is_kept].drop(columns=[DISCARD_REASON_COLUMN, DISCARD_ORDER_COLUMN],
+                                                        errors='ignore'))
+
+    def discarded(self) -> 'PrimerPairTable':
+        if DISCARD_REASON_COLUMN not in self.pairs.columns:
+            return PrimerPairTable(self.pairs.iloc[0:0])
+
+        # Discarded pairs are reported filter by filter, in build order within a filter, whatever the ranking
+        is_discarded = self.pairs[DISCARD_REASON_COLUMN].notna()
+        discarded = self.pairs[is_discarded].sort_index()
+        if DISCARD_ORDER_COLUMN in discarded.columns:
+            discarded = discarded.sort_values(by=DISCARD_ORDER_COLUMN, kind='stable')
+
+        return PrimerPairTable(discarded)
+
+    def sort(self, by: List[str], ascending: List[bool]) -> 'PrimerPairTable':
+        # kind = "stable" added to ensure stable sorting when sorting on one column
+        return PrimerPairTable(self.pairs.sort_values(by=by, ascending=ascending, kind='stable'))
+
+    def to_primers_dataframe(self, primer_type: str) -> pd.DataFrame:
+        """One row per primer, forward then reverse for each pair, in the CSV output column order."""
+        number_pairs = len(self)
+
+        columns = {'primer_type': np.full(number_pairs * 2, primer_type, dtype=object)}
+        for column in PRIMER_OUTPUT_COLUMNS:
+            columns[column] = _interleave(self.pairs[f'forward_{column}'].to_numpy(),
+                                          self.pairs[f'reverse_{column}'].to_numpy())
+
+        for column in self._pair_columns():
+            columns[column] = np.repeat(self.pairs[column].to_numpy(), 2)
+
+        # Primer rows keep the index they would have in a frame built pair by pair (2i and 2i + 1)
+        pair_index = self.pairs.index.to_numpy()
+        index = _interleave(pair_index * 2, pair_index * 2 + 1)
+
+        return pd.DataFrame(columns, index=index).round(decimals=3)
+
+    def to_bed_rows(self) -> list:
+        rows = []
+        for direction in DIRECTIONS:
+            rows.append(pd.DataFrame({
+                'chromosome': self.pairs['chromosome'],
+                'start': self.pairs[f'{direction}_primer_start'],
+                'end': self.pairs[f'{direction}_primer_end'],
+                'name': self.pairs[f'{direction}_primer'],
+                'score': '0',
+                'strand': self.pairs[f'{direction}_strand'],
+            }).to_numpy(dtype=object))
+
+        return _interleave(*rows).tolist()
+
+    def _pair_columns(self) -> List[str]:
+        columns = list(PAIR_FIELDS)
+        if DISCARD_REASON_COLUMN in self.pairs.columns:
+            columns.append(DISCARD_REASON_COLUMN)
+        return columns
+
+
+def _interleave(forward: np.ndarray, reverse: np.ndarray) -> np.ndarray:
+    dtype = np.result_type(forward.dtype, reverse.dtype)
+    interleaved = np.empty((len(forward) * 2,) + forward.shape[1:], dtype=dtype)
+    interleaved[0::2] = forward
+    interleaved[1::2] = reverse
+    return interleaved
@@ -0,0 +1,42 @@
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from custom_logger.custom_logger import CustomLogger
+
+# Initialize logger
+logger = CustomLogger(__name__)
+
+# (chromosome, start, end) of a primer, as looked up by the HAP1 variant filter
+PrimerInterval = Tuple[str, int, int]
+
+
+class PrimerRegistry:
+    """
+        Batch-level registry of the primers designed for all pre-targetons of a run.
+
+        Neighbouring slices overlap by most of their length, so Primer3 keeps finding the same
+        primers (same genomic interval) for each of them. The registry keeps the variant-filter
+        result of each primer interval, so that it is looked up once per batch instead of once
+        per pre-targeton.
+    """
+
+    def __init__(self):
+        self._variant_results: Dict[PrimerInterval, bool] = {}
+        self.reused_variant_results = 0
+
+    def contain_variants(
+            self,
+            intervals: Iterable[PrimerInterval],
+            look_up_variants: Callable[[List[PrimerInterval]], Dict[PrimerInterval, bool]]
+    ) -> Dict[PrimerInterval, bool]:
+        intervals = list(dict.fromkeys(intervals))
+        missing = [interval for interval in intervals if interval not in self._variant_results]
+
+        self.reused_variant_results += len(intervals) - len(missing)
+        if missing:
+            self._variant_results.update(look_up_variants(missing))
+
+        return {interval: self._variant_results[interval] for interval in intervals}
+
+    def log_summary(self) -> None:
+        logger.info(f"Primer registry: {len(self._variant_results)} distinct primer intervals, "
+                    f"{self.reused_variant_results} HAP1 variant lookups reused")
@@ -1,9 +1,11 @@
-from typing import List
+from typing import List, Union
 import pandas as pd
 import sys
 
-from primer.write_primer_output import _get_primers_dataframe
+from primer.primer_pair import PrimerPair
+from primer.primer_pair_table import PrimerPairTable
 from primer.ranker.rank_criteria import RankingCriteria, ProductSizeCriteria, StringencyCriteria
+from utils.instrumentation import instrumentation
 
 from custom_logger.custom_logger import CustomLogger
 
@@ -54,25 +56,34 @@ class Ranker:
             criterion_index: int = _ranking_criteria_names.index(criterion)
             self._ranking_order.append(self._ranking_criteria[criterion_index])
 
-    def rank(self, primer_type: str, primer_pairs=list) -> pd.DataFrame:
+    def rank(self, primer_type: str, primer_pairs: Union[List[PrimerPair], PrimerPairTable] = list) -> pd.DataFrame:
+        if not isinstance(primer_pairs, PrimerPairTable):
+            primer_pairs = PrimerPairTable.from_primer_pairs(primer_pairs)
 
-        # Primer pairs dataframe are grouped together.
-        primers_df = _get_primers_dataframe(primer_pairs, primer_type)
+        return self.rank_table(primer_pairs).to_primers_dataframe(primer_type)
 
-        if primers_df.empty:
+    def rank_table(self, primer_pairs: PrimerPairTable) -> PrimerPairTable:
+        with instrumentation.stage('ranking') as stage:
+            # Discarded pairs stay in the table but are not ranked
+            stage.pairs_in = len(primer_pairs.kept())
+            ranked_primer_pairs = self._rank_table(primer_pairs)
+            stage.pairs_out = len(ranked_primer_pairs.kept())
+
+        return ranked_primer_pairs
+
+    def _rank_table(self, primer_pairs: PrimerPairTable) -> PrimerPairTable:
+        # Both primers of a pair share the ranking columns, so the pairs are sorted before being split into primers
+        if primer_pairs.kept().empty:
             logger.warning("No primer pairs to rank.")
-            return primers_df
+            return primer_pairs
 
         if self._ranking_order:
             logger.info(f"Ranking is being applied by {', '.join([column.name for column in self._ranking_order])}")
             columns_to_sort = [column.column for column in self._ranking_order]
             is_ascending = [column.is_ascending for column in self._ranking_order]
 
-            # kind = "stable" added to ensure stable sorting when sorting on one column
-            primers_df.sort_values(by=columns_to_sort, ascending=is_ascending, inplace=True,
-                                   kind="stable")
+            return primer_pairs.sort(by=columns_to_sort, ascending=is_ascending)
 
-        else:
-            logger.info("No ranking applied")
+        logger.info("No ranking applied")
 
-        return primers_df
+        return primer_pairs
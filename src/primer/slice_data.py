@@ -1,16 +1,21 @@
 import re
+from typing import Iterator, Optional, Tuple
+
 from Bio import SeqIO
 
-from primer.ensembl import get_seq_from_ensembl_by_coords
+from primer.surrounding_region import SurroundingRegionProvider
 
 from custom_logger.custom_logger import CustomLogger
 
 # Initialize logger
 logger = CustomLogger(__name__)
 
+SURROUNDING_BAND = 1000
+
 
 class SliceData:
-    def __init__(self, name: str, start: int, end: int, strand: str, chromosome: str, bases: str):
+    def __init__(self, name: str, start: int, end: int, strand: str, chromosome: str, bases: str,
+                 surrounding_region_provider: Optional[SurroundingRegionProvider] = None):
         self.name = name
         self.start = start
         self.end = end
@@ -18,6 +23,8 @@ class SliceData:
         self.chromosome = chromosome
         self.bases = bases
         self.targeton_id = name[0:4]
+        self.surrounding_region_provider = surrounding_region_provider
+        self._surrounding_region = None
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, SliceData):
@@ -43,45 +50,74 @@ class SliceData:
             'SEQUENCE_TEMPLATE': self.bases,
         }
 
+    @property
+    def surrounding_interval(self) -> Tuple[str, int, int]:
+        """1-based, inclusive region around the pre-targeton."""
+        return self.chromosome, self.start - SURROUNDING_BAND, self.end + SURROUNDING_BAND
+
     @property
     def surrounding_region(self) -> str:
-        surrounding_band = 1000
+        if self._surrounding_region is None:
+            provider = self.surrounding_region_provider or SurroundingRegionProvider()
+            self._surrounding_region = provider.get(*self.surrounding_interval)
 
-        return get_seq_from_ensembl_by_coords(
-            chromosome=self.chromosome,
-            start=self.start - surrounding_band,
-            end=self.end + surrounding_band
-        )
+        return self._surrounding_region
 
     @staticmethod
-    def get_first_slice_data(fasta: str) -> 'SliceData':
+    def get_first_slice_data(
+            fasta: str,
+            surrounding_region_provider: Optional[SurroundingRegionProvider] = None
+    ) -> 'SliceData':
         with open(fasta) as fasta_data:
             rows = SeqIO.parse(fasta_data, 'fasta')
             first_row = next(rows, None)
             if first_row is None:
                 raise ValueError(f"Unable to parse the FASTA file '{fasta}'")
 
-            # Name::Chr:Start-End(Strand)
-            # ENSE00000769557_HG8_1::1:42929543-42929753
-            # Only matches with numerical chromosome, not X, Y, and MT.
-            match = re.search(r'^(\w+)::(chr\d+|ch\d+|\d+):(\d+)\-(\d+)\(([+-\.]{1})\)$', first_row.id)
-
-            if not match:
-                raise ValueError(f"The sequence ID '{first_row.id}' does not match the expected format.")
-
-            chromosome = ''.join(filter(str.isdigit, match.group(2)))
-
-            slice_data = SliceData(
-                name=match.group(1),
-                start=int(match.group(3)),
-                end=int(match.group(4)),
-                strand=match.group(5),
-                chromosome=chromosome,
-                bases=str(first_row.seq),
-            )
+            slice_data = SliceData.from_fasta_record(first_row, surrounding_region_provider)
 
             if next(rows, None) is not None:
                 logger.warning(f"The FASTA file '{fasta}' contains more than one pre-targeton. "
                                "Only the first pre-targeton is taken.")
 
         return slice_data
+
+    @staticmethod
+    def get_slices_data(
+            fasta: str,
+            surrounding_region_provider: Optional[SurroundingRegionProvider] = None
+    ) -> Iterator['SliceData']:
+        """Lazily yield a SliceData for every pre-targeton record in the FASTA file."""
+        with open(fasta) as fasta_data:
+            is_empty = True
+            for row in SeqIO.parse(fasta_data, 'fasta'):
+                is_empty = False
+                yield SliceData.from_fasta_record(row, surrounding_region_provider)
+
+            if is_empty:
+                raise ValueError(f"Unable to parse the FASTA file '{fasta}'")
+
+    @staticmethod
+    def from_fasta_record(
+            record,
+            surrounding_region_provider: Optional[SurroundingRegionProvider] = None
+    ) -> 'SliceData':
+        # Name::Chr:Start-End(Strand)
+        # ENSE00000769557_HG8_1::1:42929543-42929753
+        # Only matches with numerical chromosome, not X, Y, and MT.
+        match = re.search(r'^(\w+)::(chr\d+|ch\d+|\d+):(\d+)\-(\d+)\(([+-\.]{1})\)$', record.id)
+
+        if not match:
+            raise ValueError(f"The sequence ID '{record.id}' does not match the expected format.")
+
+        chromosome = ''.join(filter(str.isdigit, match.group(2)))
+
+        return SliceData(
+            name=match.group(1),
+            start=int(match.group(3)),
+            end=int(match.group(4)),
+            strand=match.group(5),
+            chromosome=chromosome,
+            bases=str(record.seq),
+            surrounding_region_provider=surrounding_region_provider,
+        )
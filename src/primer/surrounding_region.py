@@ -0,0 +1,111 @@
+import os
+import tempfile
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from primer.ensembl import ENSEMBL_URL, get_seqs_from_ensembl_by_regions
+from utils.reference_genome import ReferenceGenome
+
+from custom_logger.custom_logger import CustomLogger
+
+# Initialize logger
+logger = CustomLogger(__name__)
+
+# 1-based, inclusive (chromosome, start, end), as in Ensembl region queries
+Region = Tuple[str, int, int]
+
+
+class SurroundingRegionProvider:
+    """
+        Provides the genomic sequence around pre-targetons.
+
+        Sequences are read from the local reference genome when one is given; a reference given
+        as a FASTA path is only opened (and indexed) the first time a sequence is needed.
+        Otherwise they are requested from Ensembl and stored in an optional on-disk cache keyed
+        by chromosome and interval so that later runs do not fetch them again. get_many sends up
+        to 50 regions per request, for callers that need the sequences of many pre-targetons.
+    """
+
+    def __init__(
+            self,
+            reference_genome: Optional[ReferenceGenome] = None,
+            ensembl_url: str = ENSEMBL_URL,
+            cache_dir: Optional[str] = None,
+            reference_fasta: Optional[str] = None
+    ):
+        self.reference_genome = reference_genome
+        self.reference_fasta = reference_fasta
+        self.ensembl_url = ensembl_url
+        self.cache_dir = cache_dir
+        self._sequences: Dict[Region, str] = {}
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get(self, chromosome: str, start: int, end: int) -> str:
+        return self.get_many([(chromosome, start, end)])[0]
+
+    def get_many(self, regions: Iterable[Region]) -> List[str]:
+        regions = [(str(chromosome), int(start), int(end)) for chromosome, start, end in regions]
+
+        reference_genome = self._open_reference_genome()
+        if reference_genome is not None:
+            return [reference_genome.fetch(chromosome, start - 1, end) for chromosome, start, end in regions]
+
+        missing = []
+        for region in dict.fromkeys(regions):
+            if region in self._sequences:
+                continue
+
+            sequence = self._read_cache(region)
+            if sequence is None:
+                missing.append(region)
+            else:
+                self._sequences[region] = sequence
+
+        if missing:
+            self._fetch_from_ensembl(missing)
+
+        return [self._sequences[region] for region in regions]
+
+    def _open_reference_genome(self) -> Optional[ReferenceGenome]:
+        if self.reference_genome is None and self.reference_fasta:
+            self.reference_genome = ReferenceGenome(self.reference_fasta)
+
+        return self.reference_genome
+
+    def _fetch_from_ensembl(self, regions: List[Region]) -> None:
+        queries = {f'{chromosome}:{start}..{end}:1': (chromosome, start, end) for chromosome, start, end in regions}
+        logger.info(f"Fetching {len(queries)} surrounding regions from Ensembl")
+
+        sequences = get_seqs_from_ensembl_by_regions(list(queries), self.ensembl_url)
+
+        for query, region in queries.items():
+            if query not in sequences:
+                raise ValueError(f"Ensembl did not return a sequence for region '{query}'")
+
+            self._sequences[region] = sequences[query]
+            self._write_cache(region, sequences[query])
+
+    def _read_cache(self, region: Region) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+
+        try:
+            with open(self._cache_path(region)) as entry:
+                return entry.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_cache(self, region: Region, sequence: str) -> None:
+        if not self.cache_dir:
+            return
+
+        # Write to a temporary file first so concurrent runs never read a partial entry
+        file_descriptor, tmp_path = tempfile.mkstemp(dir=self.cache_dir)
+        with os.fdopen(file_descriptor, 'w') as entry:
+            entry.write(sequence)
+        os.replace(tmp_path, self._cache_path(region))
+
+    def _cache_path(self, region: Region) -> str:
+        chromosome, start, end = region
+        return os.path.join(self.cache_dir, f'{chromosome}_{start}_{end}.seq')
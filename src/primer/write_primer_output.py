@@ -1,36 +1,53 @@
-from collections import defaultdict
 from typing import List
 
 import pandas as pd
 from os import path
 
 from designer.output_data_classes import PrimerOutputData
-from primer.designed_primer import DesignedPrimer
-from primer.primer_pair import PrimerPair
-from config.config import DesignerConfig
+from primer.primer_pair_table import PrimerPairTable
+from utils.instrumentation import instrumentation
 from utils.write_output_files import timestamped_dir, export_to_bed
-from primer.filter.filter_response import PrimerPairDiscarded
 
 from custom_logger.custom_logger import CustomLogger
 
 # Initialize logger
 logger = CustomLogger(__name__)
 
+# Columns identifying the pre-targeton a primer was designed for
+PRE_TARGETON_COLUMNS = ['targeton_id', 'chromosome', 'pre_targeton_start', 'pre_targeton_end']
+
 def write_primer_output(
-    primer_pairs_df: pd.DataFrame,
+    ranked_primer_pairs: PrimerPairTable,
     column_order: List[str],
     prefix='',
-    primer_pairs=[],
-    discarded_primer_pairs=[],
     existing_dir='',
     primer_type='LibAmp'
+) -> PrimerOutputData:
+    with instrumentation.stage('write_output') as stage:
+        # Discarded pairs are written to their own CSV and are not counted
+        stage.pairs_in = len(ranked_primer_pairs.kept())
+        result = _write_primer_output(ranked_primer_pairs, column_order, prefix, existing_dir, primer_type)
+        stage.pairs_out = stage.pairs_in if result.csv else 0
+
+    return result
+
+
+def _write_primer_output(
+    ranked_primer_pairs: PrimerPairTable,
+    column_order: List[str],
+    prefix: str,
+    existing_dir: str,
+    primer_type: str
 ) -> PrimerOutputData:
     export_dir = existing_dir or timestamped_dir(prefix)
     result = PrimerOutputData(export_dir)
 
-    if primer_pairs:
-        primer_rows = construct_primer_rows_bed_format(primer_pairs)
-        result.bed = export_to_bed(primer_rows, export_dir)
+    # Every output is a view of the ranked table, so the primer pairs are converted only once
+    primer_pairs = ranked_primer_pairs.kept()
+    if not primer_pairs.empty:
+        primer_pairs_df = primer_pairs.to_primers_dataframe(primer_type)
+
+        result.bed = export_to_bed(primer_pairs.to_bed_rows(), export_dir)
 
         result.csv = export_primers_to_csv(primer_pairs_df, export_dir, column_order)
         result.optimal_primer_pairs_csv = export_three_optimal_primer_pairs_to_csv(primer_pairs_df,
@@ -39,7 +56,8 @@ def write_primer_output(
 
         logger.info(f"Primer files saved: {result.bed}, {result.csv}, {result.optimal_primer_pairs_csv}")
 
-    if discarded_primer_pairs:
+    discarded_primer_pairs = ranked_primer_pairs.discarded()
+    if not discarded_primer_pairs.empty:
         result.discarded_csv = export_discarded_primers_to_csv(
                                   discarded_primer_pairs,
                                   export_dir,
@@ -60,15 +78,14 @@ def export_primers_to_csv(primers_dataframe: pd.DataFrame, export_dir: str, colu
 
     return primers_csv_output_path
 
-def export_discarded_primers_to_csv(discarded_pairs: List[PrimerPairDiscarded],
+def export_discarded_primers_to_csv(discarded_pairs: PrimerPairTable,
                                     export_dir: str, primer_type: str, column_order: List[str]) -> str:
     PRIMER3_DISCARDED_OUTPUT_CSV = 'discarded_pairs.csv'
     output_path = path.join(export_dir, PRIMER3_DISCARDED_OUTPUT_CSV)
 
     # create a data frame for output as csv
-    discarded_df = _get_discarded_primer_dataframe(discarded_pairs, primer_type)
-    column_order.append('discard_reason')
-    write_dataframe_to_csv(discarded_df, column_order, output_path)
+    discarded_df = discarded_pairs.to_primers_dataframe(primer_type)
+    write_dataframe_to_csv(discarded_df, column_order + ['discard_reason'], output_path)
 
     return output_path
 
@@ -77,66 +94,29 @@ def export_three_optimal_primer_pairs_to_csv(df: pd.DataFrame, export_dir: str,
     OPTIMAL_PRIMERS_CSV = 'optimal_primer_pairs.csv'
     primers_csv_output_path = path.join(export_dir, OPTIMAL_PRIMERS_CSV)
 
-    optimal_primers_df = df.head(6)
-    
-    if len(optimal_primers_df.index) < 6:
+    # Batches combine pre-targetons in one table, so the optimal pairs are picked for each of them
+    pre_targeton_columns = [column for column in PRE_TARGETON_COLUMNS if column in df.columns]
+    if pre_targeton_columns:
+        pre_targeton_dfs = [group for _, group in df.groupby(pre_targeton_columns, sort=False)]
+    else:
+        pre_targeton_dfs = [df]
+
+    optimal_primers_dfs = [pre_targeton_df.head(6) for pre_targeton_df in pre_targeton_dfs]
+
+    if any(len(optimal_primers_df.index) < 6 for optimal_primers_df in optimal_primers_dfs):
         logger.warning("Less than 3 primer pairs returned by Primer3")
 
-    write_dataframe_to_csv(optimal_primers_df, column_order, primers_csv_output_path)
+    write_dataframe_to_csv(pd.concat(optimal_primers_dfs), column_order, primers_csv_output_path)
 
     return primers_csv_output_path
 
 def write_dataframe_to_csv(df: pd.DataFrame, cols: List[str], output_path: str) -> None:
-    df_ordered = _reorder_columns(cols, df)
+    df_ordered = reorder_columns(cols, df)
     df_ordered.to_csv(output_path, index=False)
     return None
 
-def _get_primers_dataframe(pairs: List[PrimerPair], primer_type: str) -> pd.DataFrame:
-    primers_dict = defaultdict(list)
-
-    for pair in pairs:
-        _add_primer_pair(primers_dict, pair, primer_type)
-
-    return pd.DataFrame(primers_dict).round(decimals=3)
-
-def _get_discarded_primer_dataframe(discarded_pairs: List[PrimerPairDiscarded],
-                                    primer_type: str) -> pd.DataFrame:
-    discarded_primers_dict = defaultdict(list)
-    for discarded_pair in discarded_pairs:
-        _add_primer_pair(discarded_primers_dict, discarded_pair, primer_type)
-        discarded_primers_dict['discard_reason'].extend([discarded_pair.reason_discarded]*2)
-
-    return pd.DataFrame(discarded_primers_dict).round(decimals=3)
-
-def _add_primer_pair(primers_dict: defaultdict(list),
-                     pair: PrimerPair, primer_type: str) -> None:
-    for direction in ['forward', 'reverse']:
-        primer = getattr(pair, direction)
-        primers_dict['primer_type'].append(primer_type)
-        primers_dict['primer'].append(primer.name)
-        primers_dict['penalty'].append(primer.penalty)
-        primers_dict['sequence'].append(primer.sequence)
-        primers_dict['primer_start'].append(primer.primer_start)
-        primers_dict['primer_end'].append(primer.primer_end)
-        primers_dict['tm'].append(primer.tm)
-        primers_dict['gc_percent'].append(primer.gc_percent)
-        primers_dict['self_any_th'].append(primer.self_any_th)
-        primers_dict['self_end_th'].append(primer.self_end_th)
-        primers_dict['hairpin_th'].append(primer.hairpin_th)
-        primers_dict['end_stability'].append(primer.end_stability)
-
-    primers_dict['pair_uid'].extend([pair.uid] * 2)
-    primers_dict['stringency'].extend([pair.stringency] * 2)
-    primers_dict['chromosome'].extend([pair.chromosome] * 2)
-    primers_dict['pre_targeton_start'].extend([pair.pre_targeton_start] * 2)
-    primers_dict['pre_targeton_end'].extend([pair.pre_targeton_end] * 2)
-    primers_dict['product_size'].extend([pair.product_size] * 2)
-    primers_dict['targeton_id'].extend([pair.targeton_id] * 2)
-
-    return None
-
-def _reorder_columns(csv_col_order: List[str],
-                     dataframe: pd.DataFrame):
+def reorder_columns(csv_col_order: List[str],
+                    dataframe: pd.DataFrame):
 
     col_order_unique = list(dict.fromkeys(csv_col_order))
     _check_unique_columns(col_order_unique, csv_col_order)
@@ -170,24 +150,3 @@ def _check_unique_columns(col_order_unique, csv_col_order):
             discarded.append(column)
             logger.warning(f"'{column}' duplicated in config file, only first instance retained")
 
-
-def construct_primer_rows_bed_format(pairs: List[PrimerPair]) -> list:
-    primer_rows = []
-    for pair in pairs:
-        primer_rows.append(create_bed_row_for_primer(primer=pair.forward, chromosome=pair.chromosome))
-        primer_rows.append(create_bed_row_for_primer(primer=pair.reverse, chromosome=pair.chromosome))
-
-    return primer_rows
-
-
-def create_bed_row_for_primer(primer: DesignedPrimer, chromosome: str) -> list:
-    primer_row = [
-        chromosome,
-        primer.primer_start,
-        primer.primer_end,
-        primer.name,
-        '0',
-        primer.strand
-    ]
-
-    return primer_row
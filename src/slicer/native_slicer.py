@@ -0,0 +1,103 @@
+import csv
+from typing import Iterator, List, NamedTuple
+
+from pybedtools import BedTool
+from slicer.slicer import Slicer
+from utils.exceptions import SlicerError
+from utils.instrumentation import instrumentation
+from utils.reference_genome import ReferenceGenome
+
+from custom_logger.custom_logger import CustomLogger
+
+# Initialize logger
+logger = CustomLogger(__name__)
+
+# Complements the IUPAC nucleotide codes, like `bedtools getfasta -s`
+COMPLEMENT = str.maketrans('ACGTRYKMSWBVDHNacgtrykmswbvdhn', 'TGCAYRMKSWVBHDNtgcayrmkswvbhdn')
+
+
+class Slice(NamedTuple):
+    chrom: str
+    start: int
+    end: int
+    name: str
+    score: str
+    strand: str
+    sequence: str
+
+    @property
+    def fasta_header(self) -> str:
+        # Same header as `bedtools getfasta -s -name+`
+        return f'{self.name}::{self.chrom}:{self.start}-{self.end}({self.strand})'
+
+
+class NativeSlicer(Slicer):
+    """
+        In-process slicer that reads the reference through the memory-mapped, indexed FASTA
+        (ReferenceGenome) instead of shelling out to `bedtools getfasta`. Each exon's flanked
+        region is fetched once and every slice is cut from that buffer.
+    """
+
+    def get_slices(self, params) -> List[Slice]:
+        return list(self.iter_slices(params))
+
+    def iter_slices(self, params) -> Iterator[Slice]:
+        """
+            Lazily yield slices exon by exon, so memory does not grow with the size of the BED file.
+            The 'slicer' stage only counts the time spent cutting slices, not writing them out.
+        """
+        return instrumentation.stage_iter('slicer', self._iter_slices(params))
+
+    def _iter_slices(self, params) -> Iterator[Slice]:
+        try:
+            if params['1b']:
+                bed = BedTool(self.iter_one_based_input(params['bed']))
+            else:
+                bed = BedTool(params['bed'])
+
+            with ReferenceGenome(params['fasta']) as fasta:
+                count = 1
+                for exon in bed:
+                    name = exon.name if exon.name != '.' else f'region{count}'
+                    yield from self._cut_exon_slices(fasta, exon, name, params)
+                    count += 1
+
+        except Exception as err:
+            raise SlicerError(f'Unexpected error occurred: {err}')
+
+    @staticmethod
+    def iter_one_based_input(input_bed) -> Iterator[list]:
+        with open(input_bed) as file:
+            for row in csv.reader(file, delimiter="\t"):
+                # BED is only 0-based on the start thus only need to edit column 1
+                row[1] = str(int(row[1]) - 1)
+                yield row
+
+    def _cut_exon_slices(self, fasta: ReferenceGenome, exon, exon_name: str, params) -> List[Slice]:
+        slice_data = self._generate_slice_data(exon, exon_name, params)
+        if not slice_data:
+            return []
+
+        chrom_length = fasta.get_reference_length(exon.chrom)
+        region_start = max(slice_data[0][1], 0)
+        region_end = min(slice_data[-1][2], chrom_length)
+        region = fasta.fetch(exon.chrom, region_start, region_end)
+
+        slices = []
+        for chrom, start, end, name, score, strand in slice_data:
+            if start < 0 or end > chrom_length:
+                logger.warning(f'Slice {name} ({chrom}:{start}-{end}) is beyond the length of '
+                               f'{chrom} ({chrom_length} bp). Skipping.')
+                continue
+
+            sequence = region[start - region_start:end - region_start]
+            if strand == '-':
+                sequence = reverse_complement(sequence)
+
+            slices.append(Slice(chrom, start, end, name, score, strand, sequence))
+
+        return slices
+
+
+def reverse_complement(sequence: str) -> str:
+    return sequence.translate(COMPLEMENT)[::-1]
@@ -6,6 +6,7 @@ from pybedtools import BedTool
 from pybedtools.helpers import BEDToolsError
 
 from utils.exceptions import SlicerError
+from utils.instrumentation import instrumentation
 
 
 class Slicer:
@@ -13,6 +14,10 @@ class Slicer:
         pass
 
     def get_slices(self, params):
+        with instrumentation.stage('slicer'):
+            return self._get_slices(params)
+
+    def _get_slices(self, params):
         try:
             input_bed = params['bed']
             if params['1b']:
@@ -17,11 +17,11 @@ class ParsedInputArguments:
             help=(
                 'Command to run in Designer CLI, available commands: '
                 'version, slicer, primer, collate_primer_data, scoring, design, '
-                'generate_targeton_csv, post_primers'
+                'generate_targeton_csv, post_primers, build_hap1_index, convert_kmer_lists, serve'
             ),
             type=str,
             choices=['version', 'slicer', 'primer', 'collate_primer_data', 'scoring', 'design', 'generate_targeton_csv',
-                     'post_primers'],
+                     'post_primers', 'build_hap1_index', 'convert_kmer_lists', 'serve'],
         )
 
         parser = add_input_args(parser)
@@ -100,6 +100,83 @@ def add_input_args(parser):
         ),
     )
 
+    parser.add_argument(
+        '--batch',
+        help=(
+            'Design primers for every pre-targeton in the FASTA file '
+            'instead of only the first one'
+        ),
+        action='store_true',
+    )
+    parser.add_argument(
+        '--combine_output',
+        help=(
+            'With --batch, write a single set of output files for all pre-targetons '
+            'instead of one subfolder per pre-targeton'
+        ),
+        action='store_true',
+    )
+    parser.add_argument(
+        '--prometheus_metrics',
+        help=(
+            'Also write the stage timings and counters of the instrumentation report '
+            'as Prometheus text (instrumentation.prom)'
+        ),
+        action='store_true',
+    )
+    parser.add_argument(
+        '--profile',
+        help=(
+            'Run the command under cProfile and write the profile (profile.prof), the collapsed '
+            'stacks for flame graphs (profile.collapsed) and the hotspots (profile_hotspots.txt) '
+            'to the output directory'
+        ),
+        action='store_true',
+    )
+    parser.add_argument(
+        '--profile_top',
+        help='Number of functions listed in profile_hotspots.txt (default 30)',
+        type=positive_int,
+        default=30,
+    )
+
+    parser.add_argument(
+        '--workers',
+        help='Number of worker processes used to run Primer3 (default 1)',
+        type=positive_int,
+        default=1,
+    )
+
+    parser.add_argument(
+        '--reference',
+        help=(
+            'Optional: uncompressed reference genome FASTA used for the sequence surrounding '
+            'pre-targetons instead of the Ensembl REST API'
+        ),
+    )
+    parser.add_argument(
+        '--kmer_dir',
+        help=(
+            'Directory with the Primer3 kmer lists converted by convert_kmer_lists '
+            '(default PRIMER_MASK_KMERLIST_PATH from the Primer3 config)'
+        ),
+    )
+    parser.add_argument(
+        '--host',
+        help='Host the serve command listens on (default 127.0.0.1)',
+        default='127.0.0.1',
+    )
+    parser.add_argument(
+        '--port',
+        help='Port the serve command listens on (default 5000)',
+        type=positive_int,
+        default=5000,
+    )
+    parser.add_argument(
+        '--vcf',
+        help='VCF file (plain or gzipped) of HAP1 variants used to build the HAP1 variant index',
+    )
+
     # CONFIG
     parser.add_argument(
         '--conf',
@@ -135,6 +212,15 @@ def add_input_args(parser):
         type=positive_int,
         default=5,
     )
+    parser.add_argument(
+        '--slicer_engine',
+        help=(
+            'Engine used by the slicer command: bedtools (default) shells out to bedtools getfasta, '
+            'native cuts slices in-process from the indexed reference FASTA'
+        ),
+        choices=['bedtools', 'native'],
+        default='bedtools',
+    )
     parser.add_argument(
         '--min',
         help='Minimum amplicon length',
@@ -174,6 +260,22 @@ def add_input_args(parser):
         '--output_tsv',
         help='Path for output TSV file',
     )
+    parser.add_argument(
+        '--hap1_index',
+        type=str,
+        help=(
+            'Path for the local HAP1 variant index. Written by build_hap1_index; '
+            'when passed to primer or design, the HAP1_variant filter uses it instead of the Web service'
+        ),
+    )
+    parser.add_argument(
+        '--p3_cache',
+        type=str,
+        help=(
+            'Optional: directory for the on-disk cache of Primer3 results, '
+            'repeated runs skip Primer3 for unchanged pre-targetons'
+        ),
+    )
     parser.add_argument(
         '--primer3_params',
         type=str,
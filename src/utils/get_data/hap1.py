@@ -1,12 +1,25 @@
 import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.instrumentation import instrumentation
+
+HAP1_VARIANT_URL = "https://z4ell7ogh5.execute-api.eu-west-2.amazonaws.com/prod"
+MAX_CONCURRENT_REQUESTS = 8
+MAX_RETRIES = 3
+RETRY_BACKOFF_FACTOR = 0.5
 
 
-def contain_variant(chromosome: str, start: int, end: int) -> bool:
-    url = f"https://z4ell7ogh5.execute-api.eu-west-2.amazonaws.com/prod?chromosome=chr{chromosome}&start={start}&end={end}"
+def contain_variant(chromosome: str, start: int, end: int, session: Optional[requests.Session] = None) -> bool:
+    url = f"{HAP1_VARIANT_URL}?chromosome=chr{chromosome}&start={start}&end={end}"
     headers = {'Content-type': 'application/json'}
 
-    response = requests.get(url, headers=headers)
+    response = (session or requests).get(url, headers=headers)
+    instrumentation.count('hap1_variant_requests')
 
     if response.status_code == requests.codes.ok:
         variants_found = json.loads(response.text)["variants"]
@@ -14,3 +27,40 @@ def contain_variant(chromosome: str, start: int, end: int) -> bool:
         return len(variants_found) > 0
     else:
         raise requests.exceptions.RequestException
+
+
+def contain_variants(
+        intervals: Iterable[Tuple[str, int, int]],
+        max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS,
+) -> Dict[Tuple[str, int, int], bool]:
+    """
+        Look up many (chromosome, start, end) intervals in one parallel round.
+        Identical intervals are requested once; requests share a pooled session
+        which retries failed requests with exponential backoff.
+    """
+    unique_intervals = list(dict.fromkeys(intervals))
+    if not unique_intervals:
+        return {}
+
+    with _create_session(max_concurrent_requests) as session, \
+            ThreadPoolExecutor(max_workers=max_concurrent_requests) as executor:
+        results = executor.map(
+            lambda interval: contain_variant(*interval, session=session),
+            unique_intervals
+        )
+
+        return dict(zip(unique_intervals, results))
+
+
+def _create_session(pool_size: int) -> requests.Session:
+    retries = Retry(
+        total=MAX_RETRIES,
+        backoff_factor=RETRY_BACKOFF_FACTOR,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=['GET'],
+    )
+
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retries))
+
+    return session
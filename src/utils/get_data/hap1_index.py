@@ -0,0 +1,114 @@
+import gzip
+from collections import defaultdict
+from typing import Dict, Tuple
+
+import numpy as np
+
+from custom_logger.custom_logger import CustomLogger
+
+# Initialize logger
+logger = CustomLogger(__name__)
+
+
+class HAP1VariantIndex:
+    """
+        Local, on-disk store of HAP1 variants used instead of the HAP1 variant Web service.
+
+        Variants are kept per chromosome as arrays of 1-based start and end positions
+        sorted by start, so an interval query is two binary searches with no network round-trip.
+        contain_variants() answers many intervals at once with vectorised binary searches.
+        The index file is created from a VCF with build_hap1_variant_index().
+    """
+
+    def __init__(self, index_path: str):
+        self._variants: Dict[str, Tuple[np.ndarray, np.ndarray, int]] = {}
+        self._sorted_ends: Dict[str, np.ndarray] = {}
+
+        with np.load(index_path) as index:
+            for key in index.files:
+                if key.endswith('_starts'):
+                    chromosome = key[:-len('_starts')]
+                    starts = index[key]
+                    ends = index[f'{chromosome}_ends']
+                    max_length = int((ends - starts).max()) + 1 if len(starts) else 0
+                    self._variants[chromosome] = (starts, ends, max_length)
+                    self._sorted_ends[chromosome] = np.sort(ends)
+
+    def contain_variant(self, chromosome: str, start: int, end: int) -> bool:
+        variants = self._variants.get(_normalise_chromosome(chromosome))
+        if variants is None:
+            return False
+
+        starts, ends, max_length = variants
+
+        # Only variants starting in [start - max_length + 1, end] can overlap the interval
+        first = np.searchsorted(starts, start - max_length + 1, side='left')
+        last = np.searchsorted(starts, end, side='right')
+
+        return bool((ends[first:last] >= start).any())
+
+    def contain_variants(self, chromosomes: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        chromosomes = np.asarray(chromosomes, dtype=str)
+        starts = np.asarray(starts)
+        ends = np.asarray(ends)
+        result = np.zeros(len(chromosomes), dtype=bool)
+
+        for chromosome in np.unique(chromosomes):
+            normalised_chromosome = _normalise_chromosome(chromosome)
+            if normalised_chromosome not in self._variants:
+                continue
+
+            rows = chromosomes == chromosome
+            variant_starts = self._variants[normalised_chromosome][0]
+            variant_ends = self._sorted_ends[normalised_chromosome]
+
+            # Variants overlapping [start, end] are those starting at or before end,
+            # minus those ending before start (which also start before end)
+            started = np.searchsorted(variant_starts, ends[rows], side='right')
+            ended = np.searchsorted(variant_ends, starts[rows], side='left')
+            result[rows] = started > ended
+
+        return result
+
+
+def build_hap1_variant_index(vcf_path: str, index_path: str) -> str:
+    starts = defaultdict(list)
+    ends = defaultdict(list)
+
+    opener = gzip.open if vcf_path.endswith('.gz') else open
+    with opener(vcf_path, 'rt') as vcf:
+        for line in vcf:
+            if line.startswith('#'):
+                continue
+
+            fields = line.split('\t', 5)
+            chromosome = _normalise_chromosome(fields[0])
+            position = int(fields[1])
+            reference = fields[3]
+
+            starts[chromosome].append(position)
+            ends[chromosome].append(position + len(reference) - 1)
+
+    arrays = {}
+    for chromosome in starts:
+        chromosome_starts = np.array(starts[chromosome], dtype=np.int64)
+        chromosome_ends = np.array(ends[chromosome], dtype=np.int64)
+        order = np.argsort(chromosome_starts, kind='stable')
+
+        arrays[f'{chromosome}_starts'] = chromosome_starts[order]
+        arrays[f'{chromosome}_ends'] = chromosome_ends[order]
+
+    with open(index_path, 'wb') as index_file:
+        np.savez(index_file, **arrays)
+
+    number_variants = sum(len(positions) for positions in starts.values())
+    logger.info(f"HAP1 variant index with {number_variants} variants saved: {index_path}")
+
+    return index_path
+
+
+def _normalise_chromosome(chromosome: str) -> str:
+    chromosome = str(chromosome)
+    if chromosome.lower().startswith('chr'):
+        return chromosome[3:]
+    return chromosome
@@ -0,0 +1,133 @@
+import json
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from os import path
+from typing import Dict, Iterable, Iterator, TypeVar
+
+REPORT_JSON = 'instrumentation.json'
+REPORT_PROMETHEUS = 'instrumentation.prom'
+PROMETHEUS_PREFIX = 'designer'
+
+T = TypeVar('T')
+
+
+@dataclass
+class StageMetrics:
+    calls: int = 0
+    wall_time_s: float = 0.0
+    pairs_in: int = 0
+    pairs_out: int = 0
+
+
+@dataclass
+class StageCall:
+    # Filled in by the instrumented code while the stage runs
+    pairs_in: int = 0
+    pairs_out: int = 0
+
+
+class Instrumentation:
+    """
+        Wall time, call count and primer pairs in and out of each stage of the pipeline,
+        plus event counters such as the network requests made.
+
+        Stages can be nested (a stage includes the time of the stages it runs) and can be
+        entered from several threads. Only the process running the command is measured:
+        Primer3 worker processes are timed as a whole through the stage that waits for them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages: Dict[str, StageMetrics] = {}
+        self.counters: Counter = Counter()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stages = {}
+            self.counters = Counter()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageCall]:
+        call = StageCall()
+        start = time.perf_counter()
+        try:
+            yield call
+        finally:
+            self._record(name, time.perf_counter() - start, call)
+
+    def stage_iter(self, name: str, items: Iterable[T]) -> Iterator[T]:
+        """
+            Yield the items of a lazy iterable as one stage call. Only the time spent producing
+            the items is recorded, not the time the caller spends on each item between them.
+        """
+        wall_time = 0.0
+        start = time.perf_counter()
+        try:
+            for item in items:
+                wall_time += time.perf_counter() - start
+                start = None
+                yield item
+                start = time.perf_counter()
+        finally:
+            if start is not None:
+                wall_time += time.perf_counter() - start
+            self._record(name, wall_time, StageCall())
+
+    def _record(self, name: str, wall_time: float, call: StageCall) -> None:
+        with self._lock:
+            metrics = self.stages.setdefault(name, StageMetrics())
+            metrics.calls += 1
+            metrics.wall_time_s += wall_time
+            metrics.pairs_in += call.pairs_in
+            metrics.pairs_out += call.pairs_out
+
+    def count(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += value
+
+    def report(self) -> dict:
+        with self._lock:
+            return {
+                'stages': {name: asdict(metrics) for name, metrics in self.stages.items()},
+                'counters': dict(self.counters),
+            }
+
+    def to_prometheus(self) -> str:
+        report = self.report()
+        lines = []
+
+        stage_metrics = [
+            ('stage_calls_total', 'calls', 'Number of times each pipeline stage ran'),
+            ('stage_wall_time_seconds_total', 'wall_time_s', 'Wall time spent in each pipeline stage'),
+            ('stage_pairs_in_total', 'pairs_in', 'Primer pairs entering each pipeline stage'),
+            ('stage_pairs_out_total', 'pairs_out', 'Primer pairs leaving each pipeline stage'),
+        ]
+        for metric, field, description in stage_metrics:
+            lines.append(f'# HELP {PROMETHEUS_PREFIX}_{metric} {description}')
+            lines.append(f'# TYPE {PROMETHEUS_PREFIX}_{metric} counter')
+            for name, metrics in report['stages'].items():
+                lines.append(f'{PROMETHEUS_PREFIX}_{metric}{{stage="{name}"}} {metrics[field]}')
+
+        for name, value in report['counters'].items():
+            lines.append(f'# TYPE {PROMETHEUS_PREFIX}_{name}_total counter')
+            lines.append(f'{PROMETHEUS_PREFIX}_{name}_total {value}')
+
+        return '\n'.join(lines) + '\n'
+
+    def write_report(self, output_dir: str, prometheus: bool = False) -> str:
+        report_path = path.join(output_dir, REPORT_JSON)
+        with open(report_path, 'w') as report_file:
+            json.dump(self.report(), report_file, indent=4)
+
+        if prometheus:
+            with open(path.join(output_dir, REPORT_PROMETHEUS), 'w') as prometheus_file:
+                prometheus_file.write(self.to_prometheus())
+
+        return report_path
+
+
+# Shared by all the modules of the process, like their loggers
+instrumentation = Instrumentation()
@@ -0,0 +1,106 @@
+import cProfile
+import io
+import pstats
+from os import path
+from typing import Dict, List, Tuple
+
+PROFILE_FILE = 'profile.prof'
+COLLAPSED_STACKS_FILE = 'profile.collapsed'
+HOTSPOTS_FILE = 'profile_hotspots.txt'
+DEFAULT_TOP = 30
+
+# Deepest call stack written to the collapsed stacks, and the smallest share of the total time
+# a stack needs to be followed: the number of paths through the call graph grows exponentially
+MAX_STACK_DEPTH = 200
+MIN_STACK_FRACTION = 0.0001
+
+# pstats function key: (file name, line number, function name)
+Function = Tuple[str, int, str]
+
+
+def write_profile(profiler: cProfile.Profile, output_dir: str, top: int = DEFAULT_TOP) -> List[str]:
+    """
+    Write the raw profile (for pstats or snakeviz), the collapsed stacks (for flamegraph.pl or
+    speedscope) and the top hotspots by cumulative and own time. Returns the paths written.
+    """
+    profile_path = path.join(output_dir, PROFILE_FILE)
+    profiler.dump_stats(profile_path)
+
+    stats = pstats.Stats(profiler)
+
+    collapsed_stacks_path = path.join(output_dir, COLLAPSED_STACKS_FILE)
+    with open(collapsed_stacks_path, 'w') as collapsed_stacks_file:
+        collapsed_stacks_file.writelines(f'{stack} {microseconds}\n'
+                                         for stack, microseconds in collapsed_stacks(stats).items())
+
+    hotspots_path = path.join(output_dir, HOTSPOTS_FILE)
+    with open(hotspots_path, 'w') as hotspots_file:
+        hotspots_file.write(hotspots(stats, top))
+
+    return [profile_path, collapsed_stacks_path, hotspots_path]
+
+
+def hotspots(stats: pstats.Stats, top: int = DEFAULT_TOP) -> str:
+    summary = io.StringIO()
+    for sort_key, title in (('cumulative', 'cumulative time'), ('tottime', 'own time')):
+        summary.write(f'Top {top} functions by {title}\n')
+        stats.stream = summary
+        stats.sort_stats(sort_key).print_stats(top)
+
+    return summary.getvalue()
+
+
+def collapsed_stacks(stats: pstats.Stats) -> Dict[str, int]:
+    """
+    Microseconds of own time per call stack, in the collapsed format of flame graphs.
+
+    cProfile only records the time spent in each function per caller, not whole stacks, so the
+    time of a function is shared between its stacks in proportion to the time of each caller.
+    Recursive calls are folded into the first occurrence of the function in the stack, and stacks
+    under MIN_STACK_FRACTION of the total time are left out.
+    """
+    callees: Dict[Function, Dict[Function, float]] = {}
+    roots = []
+    for function, (_, _, _, _, callers) in stats.stats.items():
+        if not callers:
+            roots.append(function)
+        for caller, (_, _, _, caller_cumulative_time) in callers.items():
+            callees.setdefault(caller, {})[function] = caller_cumulative_time
+
+    stacks: Dict[str, int] = {}
+    min_stack_time = stats.total_tt * MIN_STACK_FRACTION
+
+    def walk(function: Function, time_in_stack: float, stack: List[str], functions_in_stack: set) -> None:
+        own_time, cumulative_time = stats.stats[function][2:4]
+        if not cumulative_time or time_in_stack < min_stack_time or len(stack) >= MAX_STACK_DEPTH:
+            return
+
+        # Fraction of the time of the function spent under this stack
+        share = min(time_in_stack / cumulative_time, 1.0)
+
+        stack = stack + [_frame_name(function)]
+        microseconds = int(own_time * share * 1e6)
+        if microseconds:
+            key = ';'.join(stack)
+            stacks[key] = stacks.get(key, 0) + microseconds
+
+        for callee, time_from_function in callees.get(function, {}).items():
+            if callee not in functions_in_stack:
+                walk(callee, time_from_function * share, stack, functions_in_stack | {callee})
+
+    for root in roots:
+        walk(root, stats.stats[root][3], [], {root})
+
+    return stacks
+
+
+def _frame_name(function: Function) -> str:
+    file_name, line, name = function
+    if file_name == '~':
+        # Built-in functions have no source file
+        label = name
+    else:
+        label = f'{name} ({path.basename(file_name)}:{line})'
+
+    # ';' separates the frames of a collapsed stack
+    return label.replace(';', ',')
@@ -0,0 +1,116 @@
+import mmap
+from os import path
+from typing import Dict, List, NamedTuple
+
+import pysam
+
+from utils.file_system import check_file_exists
+
+from custom_logger.custom_logger import CustomLogger
+
+# Initialize logger
+logger = CustomLogger(__name__)
+
+
+class FaidxEntry(NamedTuple):
+    length: int
+    offset: int
+    line_bases: int
+    line_width: int
+
+
+class ReferenceGenome:
+    """
+        Random access to an uncompressed reference FASTA through its `.fai` index.
+
+        The FASTA is memory-mapped read-only, so fetching an interval is a direct byte-offset
+        computation with no parsing, subprocess or network call, and the mapped pages are shared
+        through the OS page cache by every process reading the same file. Instances can be pickled
+        to worker processes: only the index travels and the file is mapped again on first use.
+        The `.fai` index is created next to the FASTA if it is missing.
+    """
+
+    def __init__(self, fasta: str):
+        check_file_exists(fasta)
+        if fasta.endswith('.gz'):
+            raise ValueError(f"Reference FASTA must be uncompressed to be memory-mapped: '{fasta}'")
+
+        self.fasta = fasta
+        self.index = self._read_index(fasta)
+        self._file = None
+        self._mmap = None
+
+    def __getstate__(self) -> dict:
+        return {'fasta': self.fasta, 'index': self.index}
+
+    def __setstate__(self, state: dict) -> None:
+        self.fasta = state['fasta']
+        self.index = state['index']
+        self._file = None
+        self._mmap = None
+
+    def __enter__(self) -> 'ReferenceGenome':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def references(self) -> List[str]:
+        return list(self.index)
+
+    def get_reference_length(self, chromosome: str) -> int:
+        return self._get_entry(chromosome).length
+
+    def fetch(self, chromosome: str, start: int, end: int) -> str:
+        """Return the sequence of the 0-based, end-exclusive interval, clipped to the chromosome."""
+        entry = self._get_entry(chromosome)
+        start = max(start, 0)
+        end = min(end, entry.length)
+        if start >= end:
+            return ''
+
+        data = self._get_mmap()[self._byte_offset(entry, start):self._byte_offset(entry, end)]
+
+        return data.replace(b'\n', b'').replace(b'\r', b'').decode('ascii')
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._file.close()
+        self._mmap = None
+        self._file = None
+
+    def _get_entry(self, chromosome: str) -> FaidxEntry:
+        chromosome = str(chromosome)
+        for name in (chromosome, f'chr{chromosome}', chromosome[3:] if chromosome.startswith('chr') else None):
+            if name in self.index:
+                return self.index[name]
+
+        raise ValueError(f"Chromosome '{chromosome}' not found in reference FASTA '{self.fasta}'")
+
+    def _get_mmap(self) -> mmap.mmap:
+        if self._mmap is None:
+            self._file = open(self.fasta, 'rb')
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    @staticmethod
+    def _byte_offset(entry: FaidxEntry, position: int) -> int:
+        lines, column = divmod(position, entry.line_bases)
+        return entry.offset + lines * entry.line_width + column
+
+    @staticmethod
+    def _read_index(fasta: str) -> Dict[str, FaidxEntry]:
+        index_path = f'{fasta}.fai'
+        if not path.exists(index_path):
+            logger.info(f"Creating FASTA index: {index_path}")
+            pysam.faidx(fasta)
+
+        index = {}
+        with open(index_path) as index_file:
+            for line in index_file:
+                fields = line.rstrip('\n').split('\t')
+                index[fields[0]] = FaidxEntry(*(int(field) for field in fields[1:5]))
+
+        return index
@@ -102,7 +102,7 @@ def validate_primer_json(json: str) -> None:
             raise FileFormatError('Primer JSON not in expected format')
 
 
-def validate_files(bed='', fasta='', txt='', p3_csv='', score_tsv='', primer_json=''):
+def validate_files(bed='', fasta='', txt='', p3_csv='', score_tsv='', primer_json='', vcf=''):
     try:
         if bed:
             check_file_exists(bed)
@@ -116,6 +116,9 @@ def validate_files(bed='', fasta='', txt='', p3_csv='', score_tsv='', primer_jso
         if txt:
             check_file_exists(txt)
 
+        if vcf:
+            check_file_exists(vcf)
+
         if p3_csv:
             check_file_exists(p3_csv)
             validate_p3_csv(p3_csv)
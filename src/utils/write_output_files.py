@@ -3,7 +3,7 @@ from __future__ import annotations
 import csv
 import re
 
-from typing import TYPE_CHECKING, List, Union
+from typing import TYPE_CHECKING, Iterable, List, Union
 from os import path
 from pathlib import Path
 
@@ -19,6 +19,7 @@ from designer.output_data_classes import (
 )
 
 if TYPE_CHECKING:  # For avoiding circular import dependencies, only import for type checking.
+    from slicer.native_slicer import Slice
     from src.primer_designer import PrimerDesigner
     from src.cli import Scoring
 
@@ -61,6 +62,26 @@ def write_slicer_fasta_output(export_dir: str, slices: List[dict]) -> str:
     return fasta_path
 
 
+def write_native_slicer_output(dir_prefix: str, slices: Iterable[Slice]) -> SlicerOutputData:
+    # Slices are written as they are produced, so the whole set is never held in memory
+    WRITE_BUFFER_SIZE = 1024 * 1024
+
+    export_dir = timestamped_dir(dir_prefix)
+    result = SlicerOutputData(export_dir)
+    result.bed = path.join(export_dir, 'slicer_output.bed')
+    result.fasta = path.join(export_dir, 'slicer_output.fasta')
+
+    with open(result.bed, 'w', buffering=WRITE_BUFFER_SIZE) as bed_file, \
+            open(result.fasta, 'w', buffering=WRITE_BUFFER_SIZE) as fasta_file:
+        for slice_record in slices:
+            bed_file.write('\t'.join(map(str, slice_record[:6])) + '\n')
+            fasta_file.write(f'>{slice_record.fasta_header}\n{slice_record.sequence}\n')
+
+    print('Slice files saved: ', result.bed, result.fasta)
+
+    return result
+
+
 def export_to_bed(bed_rows: list, export_dir: str) -> str:
     PRIMER_OUTPUT_BED = 'p3_output.bed'
 
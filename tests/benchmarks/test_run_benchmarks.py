@@ -0,0 +1,51 @@
+import unittest
+from unittest.mock import patch
+
+from benchmarks.run_benchmarks import compare_to_baselines, time_case
+from benchmarks.synthetic import SLICE_LENGTH, SLICE_OFFSET, synthetic_slices
+
+
+class TestRunBenchmarks(unittest.TestCase):
+
+    @patch('builtins.print')
+    def test_compare_to_baselines(self, _):
+        # arrange
+        results = {'Ranker.rank': {'1': 0.010, '10': 0.030}, 'DuplicatesFilter': {'1': 0.001}}
+        baselines = {'Ranker.rank': {'1': 0.009, '10': 0.010}}
+
+        # act
+        result = compare_to_baselines(results, baselines, tolerance=0.5)
+
+        # assert
+        self.assertEqual(result, ['Ranker.rank [10]'])
+
+    def test_time_case_returns_seconds_per_call(self):
+        # act
+        result = time_case(lambda: None, repeat=2)
+
+        # assert
+        self.assertGreater(result, 0)
+        self.assertLess(result, 0.001)
+
+
+class TestSynthetic(unittest.TestCase):
+
+    def test_synthetic_slices_overlap(self):
+        # act
+        slices = synthetic_slices(3, seed=1)
+
+        # assert
+        self.assertEqual([slice_data.name for slice_data in slices],
+                         ['ENSE00000001_HG8_1', 'ENSE00000001_HG8_2', 'ENSE00000001_HG8_3'])
+        self.assertTrue(all(len(slice_data.bases) == SLICE_LENGTH for slice_data in slices))
+        self.assertEqual(slices[0].bases[SLICE_OFFSET:], slices[1].bases[:-SLICE_OFFSET])
+        self.assertEqual(slices[1].start - slices[0].start, SLICE_OFFSET)
+
+    def test_synthetic_slices_reproducible(self):
+        # act & assert
+        self.assertEqual(synthetic_slices(2, seed=3), synthetic_slices(2, seed=3))
+        self.assertNotEqual(synthetic_slices(1, seed=3)[0].bases, synthetic_slices(1, seed=4)[0].bases)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,6 @@
+import os
+import subprocess
+import sys
 from unittest import TestCase
 
 from unittest.mock import patch, call
@@ -12,6 +15,21 @@ class TestDesignerConfigClass(TestCase):
         self.default_config_path = 'tests/config_files/test_default_designer.config.json'
         self.config_with_params_path = 'tests/config_files/test_user_designer.config_with_params.json'
 
+    def test_importing_config_does_not_load_primer3(self):
+        # arrange
+        heavy_modules = ['primer.primer3', 'primer.primer3_cache', 'primer3', 'numpy', 'pandas', 'requests']
+        code = (
+            "import sys, config.config\n"
+            f"print(','.join(module for module in {heavy_modules!r} if module in sys.modules))"
+        )
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+
+        # act
+        result = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True)
+
+        # assert
+        self.assertEqual(result.stdout.strip(), '')
+
     def test_stringency_is_set(self):
         expected = [1, 0.5, 0.1]
 
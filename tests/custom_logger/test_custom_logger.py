@@ -0,0 +1,108 @@
+import logging
+import multiprocessing
+import sys
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from custom_logger.custom_logger import CustomLogger, LevelFormatter, configure_worker_logging
+
+
+def _log_from_worker(message: str) -> None:
+    CustomLogger('tests.custom_logger.worker').warning(message)
+
+
+def _make_record(level: int, message: str, name: str = 'primer.primer3', exc_info=None) -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 1, message, None, exc_info)
+
+
+class _CapturingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+class TestCustomLogger(unittest.TestCase):
+
+    def test_logging_configured_once_per_process(self):
+        # arrange
+        CustomLogger('tests.custom_logger.first')
+        handlers = list(logging.getLogger().handlers)
+
+        # act
+        CustomLogger('tests.custom_logger.second')
+
+        # assert
+        self.assertEqual(logging.getLogger().handlers, handlers)
+
+    def test_console_prints_custom_logger_records_only(self):
+        # arrange
+        logger = CustomLogger('tests.custom_logger.console')
+        handler = _CapturingHandler()
+        logging.getLogger().addHandler(handler)
+        console_handler = next(handler for handler in logging.getLogger().handlers
+                               if isinstance(handler.formatter, LevelFormatter))
+
+        # act
+        try:
+            logger.warning('Printed')
+            logging.getLogger('urllib3.connectionpool').warning('Log file only')
+        finally:
+            logging.getLogger().removeHandler(handler)
+
+        # assert
+        self.assertEqual([console_handler.filter(record) for record in handler.records], [True, False])
+
+class TestLevelFormatter(unittest.TestCase):
+
+    def setUp(self):
+        self.formatter = LevelFormatter()
+
+    def test_format_per_level(self):
+        # act & assert
+        self.assertEqual(self.formatter.format(_make_record(logging.INFO, 'Info')), 'Info')
+        self.assertEqual(self.formatter.format(_make_record(logging.DEBUG, 'Debug')), 'DEBUG: Debug')
+        self.assertEqual(self.formatter.format(_make_record(logging.WARNING, 'Warning')), 'WARNING: Warning')
+        self.assertRegex(self.formatter.format(_make_record(logging.ERROR, 'Error')),
+                         r' - ERROR - primer.primer3 - ERROR - Error$')
+        self.assertRegex(self.formatter.format(_make_record(logging.CRITICAL, 'Critical')),
+                         r' - CRITICAL - primer.primer3 - CRITICAL - Critical$')
+
+    def test_format_exception(self):
+        # arrange
+        try:
+            raise ValueError('Bad value')
+        except ValueError:
+            record = _make_record(logging.ERROR, 'Exception', exc_info=sys.exc_info())
+
+        # act
+        result = self.formatter.format(record)
+
+        # assert
+        self.assertIn(' - EXCEPTION - primer.primer3 - ERROR - Exception\nTraceback', result)
+        self.assertTrue(result.endswith('ValueError: Bad value'))
+
+
+class TestWorkerLogging(unittest.TestCase):
+
+    def test_worker_records_sent_to_queue(self):
+        # arrange
+        log_queue = multiprocessing.Queue()
+
+        # act
+        with ProcessPoolExecutor(max_workers=1, initializer=configure_worker_logging,
+                                 initargs=(log_queue,)) as executor:
+            executor.submit(_log_from_worker, 'Logged by a worker').result()
+        record = log_queue.get(timeout=10)
+
+        # assert
+        self.assertEqual(record.name, 'tests.custom_logger.worker')
+        self.assertEqual(record.levelno, logging.WARNING)
+        self.assertEqual(record.getMessage(), 'Logged by a worker')
+        self.assertTrue(record.custom_logger)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import unittest
+from unittest.mock import Mock, patch
+
+from designer.design_service import DesignService, create_app
+from primer.filter.filter_manager import FilterManager
+from primer.primer3 import Primer3
+from primer.ranker.ranker import Ranker
+from utils.exceptions import Primer3Error
+
+PRE_TARGETON_ID = "ENSE00000769557_HG8_11::1:42929593-42929803(-)"
+BASES = (
+    "CACCTTCCCTCCGGTCCCCCCAGTGCTAAAGAAGCTGCGCGGGACAGCTGACGTGACCCATGACCTGCAGGAGATGAAGGAAGAGAGTCGGCAGATGATGCGGGAGA"
+    "AGAAGGTCACCATCCTGGAGCTGTTCCGCTCCCCCGCCTACCGCCAGCCCATCCTCATCGCTGTGGTGCTGCAGCTGTCCCAGCAGCTGTCTGGCATCAACGC"
+)
+P3_CONFIG = {
+    "PRIMER_TASK": "pick_cloning_primers",
+    "PRIMER_PICK_LEFT_PRIMER": 1,
+    "PRIMER_PICK_RIGHT_PRIMER": 1,
+    "PRIMER_OPT_SIZE": 20,
+    "PRIMER_MIN_SIZE": 18,
+    "PRIMER_MAX_SIZE": 23,
+    "P3_FILE_FLAG": 1,
+    "SEQUENCE_INCLUDED_REGION": [0, 200],
+    "PRIMER_EXPLAIN_FLAG": 1,
+    "PRIMER_MASK_TEMPLATE": 0
+}
+COLUMN_ORDER = ['primer_type', 'primer', 'sequence', 'stringency', 'chromosome']
+
+
+class TestDesignService(unittest.TestCase):
+
+    def setUp(self):
+        self.primer3 = Primer3(stringency_vector=[1], p3_config=P3_CONFIG)
+        self.service = DesignService(
+            self.primer3,
+            FilterManager({'duplicates': True}),
+            Ranker({'stringency': True, 'product_size': True}),
+            COLUMN_ORDER
+        )
+        self.client = create_app(self.service).test_client()
+
+    def test_health(self):
+        # act
+        response = self.client.get('/health')
+
+        # assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {'status': 'ok'})
+
+    def test_design(self):
+        # arrange
+        fasta = f">{PRE_TARGETON_ID}\n{BASES}\n"
+
+        # act
+        response = self.client.post('/design', json={'fasta': fasta})
+
+        # assert
+        self.assertEqual(response.status_code, 200)
+        result = response.get_json()
+        self.assertEqual(result['skipped'], [])
+        self.assertEqual([pre_targeton['name'] for pre_targeton in result['pre_targetons']],
+                         ['ENSE00000769557_HG8_11'])
+
+        primers = result['pre_targetons'][0]['primers']
+        self.assertEqual(primers[0], {
+            'primer_type': 'LibAmp',
+            'primer': 'ENSE00000769557_HG8_11_LibAmpF_0',
+            'sequence': 'CAGACAGCTGCTGGGACA',
+            'stringency': 1,
+            'chromosome': '1',
+        })
+        self.assertEqual(primers[1]['primer'], 'ENSE00000769557_HG8_11_LibAmpR_0')
+
+    def test_design_drops_unknown_columns(self):
+        # arrange
+        service = DesignService(self.primer3, FilterManager({'duplicates': True}),
+                                Ranker({'stringency': True, 'product_size': True}),
+                                COLUMN_ORDER + ['not_a_column'])
+        fasta = f">{PRE_TARGETON_ID}\n{BASES}\n"
+
+        # act
+        response = create_app(service).test_client().post('/design', json={'fasta': fasta})
+
+        # assert
+        self.assertEqual(response.status_code, 200)
+        primers = response.get_json()['pre_targetons'][0]['primers']
+        self.assertEqual(list(primers[0]), COLUMN_ORDER)
+
+    def test_design_reports_pre_targetons_without_primers(self):
+        # arrange
+        primer3 = Mock(get_primers_batch=Mock(return_value=iter([])))
+        service = DesignService(primer3, FilterManager({}), Ranker({}), COLUMN_ORDER)
+        fasta = f">{PRE_TARGETON_ID}\n{BASES}\n"
+
+        # act
+        result = service.design(fasta)
+
+        # assert
+        self.assertEqual(result, {'pre_targetons': [], 'skipped': ['ENSE00000769557_HG8_11']})
+
+    def test_design_primer3_error(self):
+        # arrange
+        fasta = f">{PRE_TARGETON_ID}\n{BASES}\n"
+
+        for error in (Primer3Error('Primer3 configuration error'), OSError('Primer3 configuration error')):
+            with self.subTest(error=type(error).__name__), \
+                    patch.object(self.primer3, 'get_primers_batch', side_effect=error):
+                # act
+                response = self.client.post('/design', json={'fasta': fasta})
+
+                # assert
+                self.assertEqual(response.status_code, 500)
+                self.assertEqual(response.get_json(), {'error': 'Primer3 failed: Primer3 configuration error'})
+
+    def test_design_missing_fasta(self):
+        # act
+        response = self.client.post('/design', json={})
+
+        # assert
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('fasta', response.get_json()['error'])
+
+    def test_design_invalid_sequence_id(self):
+        # act
+        response = self.client.post('/design', json={'fasta': f">invalid_id\n{BASES}\n"})
+
+        # assert
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json(),
+                         {'error': "The sequence ID 'invalid_id' does not match the expected format."})
+
+
+if __name__ == '__main__':
+    unittest.main()
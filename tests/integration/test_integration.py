@@ -1,6 +1,7 @@
 import unittest
 import sys
 import pandas as pd
+import numpy as np
 
 from unittest.mock import patch
 from unittest import TestCase
@@ -135,6 +136,45 @@ class TestPrimerIntegration(TestCase):
                 self.assertEqual(num_optimal_primers, expected_num_optimal_primers)
 
 
+class TestPrimerBatchIntegration(TestCase):
+    def setUp(self):
+        self.fasta_file_path = r"./tests/integration/fixtures/batch_example.fa"
+        self.config_file_path = r"./tests/config_files/test_user_primer3.config.json"
+        self.designer_config = r"./tests/config_files/test_user_designer.config.json"
+
+    @patch('primer.filter.hap1_variant_filter.HAP1VariantFilter.keep_mask')
+    def test_primer_batch_output_combined(self, mock_hap1_keep_mask):
+        mock_hap1_keep_mask.side_effect = lambda primer_pairs: np.ones(len(primer_pairs), dtype=bool)
+
+        with TemporaryDirectory() as tmpdir:
+            # Arrange
+            with patch.object(
+                sys, 'argv',
+                [
+                    "./designer.sh", "primer",
+                    "--fasta", self.fasta_file_path,
+                    "--dir", tmpdir,
+                    "--conf", self.designer_config,
+                    "--primer3_params", self.config_file_path,
+                    "--batch", "--combine_output",
+                ]
+            ):
+                args = ParsedInputArguments().get_args()
+
+                # Act
+                primer_result = primer_command(args=args)
+
+                # Assert
+                df_primers = pd.read_csv(primer_result.csv)
+                expected_slices = [record.name for record in SliceData.get_slices_data(self.fasta_file_path)]
+                self.assertGreater(len(expected_slices), 1)
+                self.assertEqual(set(df_primers['primer'].str.split('_LibAmp').str[0]), set(expected_slices))
+
+                # Every pre-targeton gets its own optimal primer pairs
+                df_optimal_primers = pd.read_csv(primer_result.optimal_primer_pairs_csv)
+                self.assertEqual(set(df_optimal_primers['primer'].str.split('_LibAmp').str[0]), set(expected_slices))
+
+
 class TestTargetonCSVIntegration(TestCase):
     def setUp(self):
         self.ipcress_input_path = r"./tests/integration/fixtures/ipcress_primer_input.txt"
@@ -1,9 +1,11 @@
+from dataclasses import replace
 from unittest import TestCase
 
 from primer.designed_primer import DesignedPrimer, Interval
 from primer.filter.duplicates_filter import DuplicatesFilter
 from primer.primer_pair import PrimerPair
 from primer.primer_pair_discarded import PrimerPairDiscarded
+from primer.primer_pair_table import PrimerPairTable
 
 
 class TestDuplicatesFilter(TestCase):
@@ -63,3 +65,71 @@ class TestDuplicatesFilter(TestCase):
         self.assertEqual(len(filter_response.primer_pairs_to_discard), 1)
         self.assertIn(PrimerPairDiscarded(pair_min_stringency, DuplicatesFilter.reason_discarded),
                       filter_response.primer_pairs_to_discard)
+
+    def test_keep_mask_keeps_lowest_stringency_of_each_group(self):
+        # Arrange
+        pairs = []
+        for chromosome, stringency in [("1", 1), ("1", 0.1), ("2", 1), ("1", 0.5)]:
+            pair = PrimerPair(
+                pair_id=f"pair_{chromosome}_{stringency}",
+                chromosome=chromosome,
+                pre_targeton_start=11540,
+                pre_targeton_end=11545,
+                product_size=200,
+                stringency=stringency,
+                targeton_id="targeton_id",
+                uid="uid")
+            pair.forward = self.designed_primer
+            pair.reverse = self.designed_primer
+            pairs.append(pair)
+
+        # Act
+        keep_mask = DuplicatesFilter().keep_mask(PrimerPairTable.from_primer_pairs(pairs))
+
+        # Assertion
+        self.assertEqual(keep_mask.tolist(), [False, True, True, False])
+
+    def test_keep_mask_compares_sequence_and_coordinates_only(self):
+        # Arrange
+        pair_with_other_penalty = PrimerPair(
+            pair_id="pair_with_other_penalty",
+            chromosome="1",
+            pre_targeton_start=11545,
+            pre_targeton_end=11550,
+            product_size=200,
+            stringency=0.1,
+            targeton_id="targeton_id_2",
+            uid="uid")
+        pair_with_other_penalty.forward = replace(self.designed_primer, penalty=0.7)
+        pair_with_other_penalty.reverse = self.designed_primer
+
+        pair_moved = PrimerPair(
+            pair_id="pair_moved",
+            chromosome="1",
+            pre_targeton_start=11540,
+            pre_targeton_end=11545,
+            product_size=200,
+            stringency=1,
+            targeton_id="targeton_id",
+            uid="uid")
+        pair_moved.forward = replace(self.designed_primer, primer_start=11, primer_end=21)
+        pair_moved.reverse = self.designed_primer
+
+        pair = PrimerPair(
+            pair_id="pair",
+            chromosome="1",
+            pre_targeton_start=11540,
+            pre_targeton_end=11545,
+            product_size=200,
+            stringency=1,
+            targeton_id="targeton_id",
+            uid="uid")
+        pair.forward = self.designed_primer
+        pair.reverse = self.designed_primer
+
+        # Act
+        keep_mask = DuplicatesFilter().keep_mask(
+            PrimerPairTable.from_primer_pairs([pair, pair_moved, pair_with_other_penalty]))
+
+        # Assertion
+        self.assertEqual(keep_mask.tolist(), [False, True, True])
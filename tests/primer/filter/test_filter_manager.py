@@ -11,6 +11,8 @@ from primer.filter.hap1_variant_filter import HAP1VariantFilter
 from primer.filter.filter_manager import FilterManager
 from primer.primer_pair import PrimerPair
 from primer.primer_pair_discarded import PrimerPairDiscarded
+from primer.primer_pair_table import PrimerPairTable
+from utils.instrumentation import Instrumentation
 
 
 class TestFilterManager(TestCase):
@@ -317,3 +319,68 @@ class TestFilterManager(TestCase):
         expected_error_message = ("Wrong value(s) provided for 'duplicates, HAP1_variant' in config file "
                                   "(only takes true or false). Unable to apply filtering - Exiting programme")
         logger_error.assert_called_once_with(expected_error_message)
+
+    @patch('primer.filter.filter_manager.instrumentation', new_callable=Instrumentation)
+    @patch('primer.filter.hap1_variant_filter.contain_variants')
+    def test_filter_table_sets_discard_reasons(self, mock_contain_variants, instrumentation):
+        # Arrange
+        mock_contain_variants.side_effect = lambda intervals: {
+            interval: interval[1] <= 11542 <= interval[2] for interval in intervals
+        }
+        pairs = []
+        for pair_id, chromosome, stringency, forward in [
+            ("pair_with_variant", "1", 0.1, self.primer_with_variant),
+            ("pair_duplicate", "2", 1, self.primer_with_no_variant),
+            ("pair_kept", "2", 0.1, self.primer_with_no_variant),
+        ]:
+            pair = PrimerPair(
+                pair_id=pair_id,
+                chromosome=chromosome,
+                pre_targeton_start=11540,
+                pre_targeton_end=11545,
+                product_size=200,
+                stringency=stringency,
+                targeton_id="targeton_id",
+                uid=pair_id)
+            pair.forward = forward
+            pair.reverse = self.primer_with_no_variant
+            pairs.append(pair)
+
+        # Act
+        result = FilterManager(self.mock_config["filters"]).filter_table(PrimerPairTable.from_primer_pairs(pairs))
+
+        # Assertion
+        self.assertEqual(result.pairs['discard_reason'].tolist(),
+                         [HAP1VariantFilter.reason_discarded, DuplicatesFilter.reason_discarded, None])
+        # Discarded pairs are reported in the order the filters ran, not in build order
+        self.assertEqual(result.discarded().pairs['pair_uid'].tolist(), ["pair_duplicate", "pair_with_variant"])
+        self.assertNotIn('discard_order', result.kept().pairs.columns)
+        # Only pairs kept by the duplicates filter are looked up
+        self.assertEqual(len(mock_contain_variants.call_args[0][0]), 4)
+        self.assertEqual({name: (stage.calls, stage.pairs_in, stage.pairs_out)
+                          for name, stage in instrumentation.stages.items()},
+                         {'filter.duplicates': (1, 3, 2), 'filter.HAP1_variant': (1, 2, 1), 'filters': (1, 3, 1)})
+
+    def test_filter_duplicates_across_targetons(self):
+        # Arrange
+        tables = []
+        for targeton_id, stringency in [("ABCD", 1), ("EFGH", 0.1)]:
+            pair = PrimerPair(
+                pair_id=f"{targeton_id}_0_str{stringency}",
+                chromosome="1",
+                pre_targeton_start=11540,
+                pre_targeton_end=11545,
+                product_size=200,
+                stringency=stringency,
+                targeton_id=targeton_id,
+                uid=targeton_id)
+            pair.forward = self.primer_with_no_variant
+            pair.reverse = self.primer_with_no_variant
+            tables.append(FilterManager({"duplicates": True}).filter_table(PrimerPairTable.from_primer_pairs([pair])))
+
+        # Act
+        result = FilterManager({"duplicates": True}).filter_duplicates(PrimerPairTable.concat(tables))
+
+        # Assertion
+        self.assertEqual(result.kept().pairs['targeton_id'].tolist(), ["EFGH"])
+        self.assertEqual(result.discarded().pairs['discard_reason'].tolist(), [DuplicatesFilter.reason_discarded])
@@ -1,9 +1,11 @@
 import unittest
+from unittest.mock import Mock, patch
 
 from primer.designed_primer import DesignedPrimer, Interval
 from primer.primer_pair import PrimerPair
 from primer.filter.hap1_variant_filter import HAP1VariantFilter
 from primer.primer_pair_discarded import PrimerPairDiscarded
+from primer.primer_registry import PrimerRegistry
 
 
 class TestHAP1VariantFilter(unittest.TestCase):
@@ -81,3 +83,110 @@ class TestHAP1VariantFilter(unittest.TestCase):
         self.assertEqual(len(filter_response.primer_pairs_to_discard), 1)
         self.assertIn(PrimerPairDiscarded(pair_with_variant, reason_discarded=HAP1VariantFilter.reason_discarded),
                       filter_response.primer_pairs_to_discard)
+
+    def test_apply_filters_with_variant_index(self):
+        # Arrange
+        variant_index = Mock()
+        variant_index.contain_variants.side_effect = lambda chromosomes, starts, ends: (starts <= 11542) & (11542 <= ends)
+
+        pair_with_variant = PrimerPair(
+            pair_id="pair_with_hap1_variant",
+            chromosome="1",
+            pre_targeton_start=11540,
+            pre_targeton_end=11545,
+            product_size=200,
+            stringency=0.1,
+            targeton_id="targeton_id",
+            uid="uid")
+        pair_with_variant.forward = self.primer_with_no_variant
+        pair_with_variant.reverse = self.primer_with_variant
+
+        pair_with_no_variant = PrimerPair(
+            pair_id="pair_with_no_variant",
+            chromosome="1",
+            pre_targeton_start=11540,
+            pre_targeton_end=11545,
+            product_size=200,
+            stringency=1,
+            targeton_id="targeton_id",
+            uid="uid")
+        pair_with_no_variant.forward = self.primer_with_no_variant
+        pair_with_no_variant.reverse = self.primer_with_no_variant
+
+        # Act
+        filter_response = HAP1VariantFilter(variant_index).apply([pair_with_variant, pair_with_no_variant])
+
+        # Assertion
+        self.assertEqual(filter_response.primer_pairs_to_keep, [pair_with_no_variant])
+        self.assertEqual(filter_response.primer_pairs_to_discard,
+                         [PrimerPairDiscarded(pair_with_variant, HAP1VariantFilter.reason_discarded)])
+
+    @patch('primer.filter.hap1_variant_filter.contain_variants')
+    def test_apply_filters_requests_variants_once_per_batch(self, mock_contain_variants):
+        # Arrange
+        mock_contain_variants.side_effect = lambda intervals: {
+            interval: interval[1] <= 11542 <= interval[2] for interval in intervals
+        }
+
+        pair_with_variant = PrimerPair(
+            pair_id="pair_with_hap1_variant",
+            chromosome="1",
+            pre_targeton_start=11540,
+            pre_targeton_end=11545,
+            product_size=200,
+            stringency=0.1,
+            targeton_id="targeton_id",
+            uid="uid")
+        pair_with_variant.forward = self.primer_with_variant
+        pair_with_variant.reverse = self.primer_with_no_variant
+
+        pair_with_no_variant = PrimerPair(
+            pair_id="pair_with_no_variant",
+            chromosome="1",
+            pre_targeton_start=11540,
+            pre_targeton_end=11545,
+            product_size=200,
+            stringency=1,
+            targeton_id="targeton_id",
+            uid="uid")
+        pair_with_no_variant.forward = self.primer_with_no_variant
+        pair_with_no_variant.reverse = self.primer_with_no_variant
+
+        # Act
+        filter_response = HAP1VariantFilter().apply([pair_with_variant, pair_with_no_variant])
+
+        # Assertion
+        mock_contain_variants.assert_called_once_with([
+            ("1", 11540, 11545), ("1", 10, 20), ("1", 10, 20), ("1", 10, 20)
+        ])
+        self.assertEqual(filter_response.primer_pairs_to_keep, [pair_with_no_variant])
+        self.assertEqual(filter_response.primer_pairs_to_discard,
+                         [PrimerPairDiscarded(pair_with_variant, HAP1VariantFilter.reason_discarded)])
+
+    @patch('primer.filter.hap1_variant_filter.contain_variants')
+    def test_apply_filters_reuses_registered_variant_results(self, mock_contain_variants):
+        # Arrange
+        mock_contain_variants.side_effect = lambda intervals: {
+            interval: interval[1] <= 11542 <= interval[2] for interval in intervals
+        }
+        pair = PrimerPair(
+            pair_id="pair_with_hap1_variant",
+            chromosome="1",
+            pre_targeton_start=11540,
+            pre_targeton_end=11545,
+            product_size=200,
+            stringency=0.1,
+            targeton_id="targeton_id",
+            uid="uid")
+        pair.forward = self.primer_with_variant
+        pair.reverse = self.primer_with_no_variant
+        hap1_filter = HAP1VariantFilter(registry=PrimerRegistry())
+
+        # Act
+        first_response = hap1_filter.apply([pair])
+        second_response = hap1_filter.apply([pair])
+
+        # Assertion
+        mock_contain_variants.assert_called_once_with([("1", 11540, 11545), ("1", 10, 20)])
+        self.assertEqual(first_response.primer_pairs_to_discard, second_response.primer_pairs_to_discard)
+        self.assertEqual(len(second_response.primer_pairs_to_discard), 1)
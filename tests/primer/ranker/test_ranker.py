@@ -1,12 +1,15 @@
 import logging
 from io import StringIO
 from unittest import TestCase
+from unittest.mock import patch
 import pandas as pd
 
 from pandas.testing import assert_frame_equal
 from primer.ranker.ranker import Ranker
 from primer.primer_pair import PrimerPair
 from primer.designed_primer import DesignedPrimer, Interval
+from primer.primer_pair_table import PrimerPairTable
+from utils.instrumentation import Instrumentation
 from tests.utils.utils import CapturingStreamHandler
 
 class RankerTest(TestCase):
@@ -319,6 +322,20 @@ mockType,primer_rv,0.5,CTCGATCG,11640,11645,60.0,50.0,30.0,10.0,20.0,25.0,uid2,0
         # Assert
         assert_frame_equal(result.reset_index(drop = True), expected_ranked_df)
 
+    @patch('primer.ranker.ranker.instrumentation', new_callable=Instrumentation)
+    def test_rank_table_counts_only_kept_pairs(self, instrumentation):
+        # Arrange
+        primer_pairs = PrimerPairTable.from_primer_pairs(self.mocked_primer_pairs,
+                                                         [None, 'discarded', None])
+
+        # Act
+        ranked_primer_pairs = Ranker(self.mocked_ranking_config_all_true).rank_table(primer_pairs)
+
+        # Assert
+        self.assertEqual(len(ranked_primer_pairs), 3)
+        ranking = instrumentation.stages['ranking']
+        self.assertEqual((ranking.calls, ranking.pairs_in, ranking.pairs_out), (1, 2, 2))
+
 
 def _create_dataframe(data: str) -> pd.DataFrame:
     data_io = StringIO(data)
@@ -120,3 +120,23 @@ class TestDesignedPrimers(TestCase):
         )
 
         self.assertEqual(result, expected)
+
+    def test_designed_primer_key(self):
+        primer = DesignedPrimer(
+            name="Primer1",
+            penalty=0.5,
+            pair_id="Pair1",
+            sequence="ATCGATCG",
+            coords=Interval(start=100, end=200),
+            primer_start=100,
+            primer_end=108,
+            strand="-",
+            tm=60.0,
+            gc_percent=50.0,
+            self_any_th=30.0,
+            self_end_th=10.0,
+            hairpin_th=20.0,
+            end_stability=25.0
+        )
+
+        self.assertEqual(primer.key, "ATCGATCG:100-108(-)")
@@ -3,7 +3,7 @@ from unittest.mock import patch, MagicMock
 
 import requests
 
-from primer.ensembl import get_seq_from_ensembl_by_coords
+from primer.ensembl import get_seq_from_ensembl_by_coords, get_seqs_from_ensembl_by_regions
 
 
 class TestEnsemble(TestCase):
@@ -34,3 +34,28 @@ class TestEnsemble(TestCase):
 
         mock_get.assert_called_once_with('https://rest.ensembl.org/sequence/region/human/X:1000..2000:1',
                                          headers={'Content-type': 'text/plain'})
+
+    @patch('requests.post')
+    @patch('time.sleep', return_value=None)
+    def test_get_seqs_from_ensembl_by_regions_success(self, mock_sleep, mock_post):
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = [{'query': 'X:1000..2000:1', 'seq': 'ACGT'}]
+        mock_post.return_value = mock_response
+
+        result = get_seqs_from_ensembl_by_regions(['X:1000..2000:1'])
+
+        mock_post.assert_called_once_with('https://rest.ensembl.org/sequence/region/human',
+                                          headers={'Content-type': 'application/json', 'Accept': 'application/json'},
+                                          json={'regions': ['X:1000..2000:1']})
+        self.assertEqual(result, {'X:1000..2000:1': 'ACGT'})
+
+    @patch('requests.post')
+    @patch('time.sleep', return_value=None)
+    def test_get_seqs_from_ensembl_by_regions_failure(self, mock_sleep, mock_post):
+        mock_response = MagicMock()
+        mock_response.status_code = 400
+        mock_post.return_value = mock_response
+
+        with self.assertRaises(requests.exceptions.RequestException):
+            get_seqs_from_ensembl_by_regions(['X:1000..2000:1'])
@@ -0,0 +1,152 @@
+import os
+import struct
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy as np
+
+from primer.kmer_mask import (
+    GLISTMAKER_HEADER_SIZE, GLISTMAKER_MAGIC, GLISTMAKER_RECORD, KmerList, KmerMasker, convert_kmer_list,
+    convert_kmer_lists, group_stringencies, reverse_complement, same_mask
+)
+
+
+def encode(kmer: str) -> int:
+    word = 0
+    for nucleotide in kmer:
+        word = (word << 2) | 'ACGT'.index(nucleotide)
+    return word
+
+
+def write_kmer_list(path: str, kmer_length: int, counts: dict) -> None:
+    header = bytearray(GLISTMAKER_HEADER_SIZE)
+    struct.pack_into('<I', header, 0, GLISTMAKER_MAGIC)
+    struct.pack_into('<I', header, 12, kmer_length)
+    struct.pack_into('<I', header, 16, len(counts))
+    struct.pack_into('<Q', header, 32, GLISTMAKER_HEADER_SIZE)
+
+    records = np.array([(encode(kmer), count) for kmer, count in counts.items()], dtype=GLISTMAKER_RECORD)
+    with open(path, 'wb') as list_file:
+        list_file.write(bytes(header))
+        list_file.write(records.tobytes())
+
+
+class TestKmerMask(TestCase):
+    def setUp(self):
+        self.kmer_dir = TemporaryDirectory()
+        self.addCleanup(self.kmer_dir.cleanup)
+
+        self.template = 'ACGTACGTACGTACGTT'
+        self.list_11 = os.path.join(self.kmer_dir.name, 'homo_sapiens_11.list')
+        self.list_16 = os.path.join(self.kmer_dir.name, 'homo_sapiens_16.list')
+        write_kmer_list(self.list_11, 11, {'AAAAAAAAAAA': 5, 'ACGTACGTACG': 1000})
+        write_kmer_list(self.list_16, 16, {'ACGTACGTACGTACGT': 10 ** 6, 'CCCCCCCCCCCCCCCC': 7})
+
+    def test_frequencies(self):
+        # arrange
+        kmer_list = KmerList(self.list_11)
+        words = np.array([encode('ACGTACGTACG'), encode('TTTTTTTTTTT'), encode('GGGGGGGGGGG')], dtype=np.uint64)
+
+        # act
+        result = kmer_list.frequencies(words)
+
+        # assert
+        self.assertEqual(len(kmer_list), 2)
+        self.assertEqual(result.tolist(), [1000, 5, 1])
+
+    def test_reverse_complement(self):
+        # act
+        result = reverse_complement(np.array([encode('AACGT')], dtype=np.uint64), 5)
+
+        # assert
+        self.assertEqual(result.tolist(), [encode('ACGTT')])
+
+    def test_failure_rates(self):
+        # arrange
+        masker = KmerMasker({11: KmerList(self.list_11), 16: KmerList(self.list_16)})
+        score_11 = 0.1772 * np.log(1000)
+        score_16 = 0.239 * np.log(10 ** 6)
+
+        # act
+        result = masker.failure_rates(self.template)
+
+        # assert
+        # The reverse strand of the second window starts with the reverse complement of a listed 11-mer
+        expected_scores = [score_16 + score_11, 0.0, score_16 + score_11, score_11]
+        expected = [np.exp(score - 4.336) / (1 + np.exp(score - 4.336)) if score else 0.0 for score in expected_scores]
+        np.testing.assert_allclose(result, expected)
+
+    def test_failure_rates_skip_windows_with_unknown_bases(self):
+        # arrange
+        masker = KmerMasker({11: KmerList(self.list_11), 16: KmerList(self.list_16)})
+
+        # act
+        result = masker.failure_rates('ACGTACGTNCGTACGTT')
+
+        # assert
+        self.assertEqual(len(result), 0)
+
+    def test_not_a_kmer_list(self):
+        # arrange
+        with open(self.list_11, 'w') as list_file:
+            list_file.write('list of 11-mers')
+
+        # act & assert
+        with self.assertRaises(ValueError):
+            KmerList(self.list_11)
+
+    def test_same_mask(self):
+        # arrange
+        failure_rates = np.array([0.0, 0.3, 0.05])
+
+        # act & assert
+        self.assertTrue(same_mask(failure_rates, 1, 0.5))
+        self.assertFalse(same_mask(failure_rates, 0.5, 0.1))
+        self.assertTrue(same_mask(failure_rates, 0, 1))
+        self.assertFalse(same_mask(failure_rates, 0.3 + 1e-12, 0.5))
+
+    def test_group_stringencies(self):
+        # arrange
+        failure_rates = np.array([0.3, 0.05])
+
+        # act
+        in_vector_order = group_stringencies(failure_rates, [1, 0.5, 0.1, 0.4], [0, 1, 2, 3])
+        most_stringent_first = group_stringencies(failure_rates, [1, 0.5, 0.1, 0.4], [2, 3, 1, 0])
+
+        # assert
+        self.assertEqual(in_vector_order, [0, 0, 2, 0])
+        self.assertEqual(most_stringent_first, [3, 3, 2, 3])
+
+    @patch('primer.kmer_mask.CONVERSION_CHUNK_SIZE', 1)
+    def test_convert_kmer_list(self):
+        # arrange
+        words = np.array([encode('ACGTACGTACG'), encode('TTTTTTTTTTT'), encode('GGGGGGGGGGG')], dtype=np.uint64)
+        expected = KmerList(self.list_11).frequencies(words)
+
+        # act
+        words_path, counts_path = convert_kmer_list(self.list_11)
+        kmer_list = KmerList(self.list_11)
+
+        # assert
+        self.assertTrue(kmer_list.converted)
+        self.assertEqual(np.load(words_path).tolist(), [encode('AAAAAAAAAAA'), encode('ACGTACGTACG')])
+        self.assertEqual(np.load(counts_path).tolist(), [5, 1000])
+        self.assertEqual(kmer_list.frequencies(words).tolist(), expected.tolist())
+
+    def test_convert_kmer_lists(self):
+        # act
+        result = convert_kmer_lists(self.kmer_dir.name)
+
+        # assert
+        self.assertEqual(result, [f'{self.list_11}.words.npy', f'{self.list_11}.counts.npy',
+                                  f'{self.list_16}.words.npy', f'{self.list_16}.counts.npy'])
+        self.assertTrue(all(os.path.exists(path) for path in result))
+
+    def test_convert_unsorted_kmer_list(self):
+        # arrange
+        write_kmer_list(self.list_11, 11, {'ACGTACGTACG': 1000, 'AAAAAAAAAAA': 5})
+
+        # act & assert
+        with self.assertRaises(ValueError):
+            convert_kmer_list(self.list_11)
@@ -1,6 +1,8 @@
 import unittest
 from pyfakefs.fake_filesystem_unittest import TestCase
-from unittest.mock import patch
+from unittest.mock import Mock, patch
+
+import numpy as np
 
 from primer.designed_primer import DesignedPrimer, Interval
 from primer.primer_pair import PrimerPair
@@ -9,6 +11,20 @@ from primer.slice_data import SliceData
 from utils.exceptions import Primer3Error
 
 
+def designs_with_pairs(positions) -> dict:
+    # Primer3 designs with one pair per position of the left primer on the template
+    designs = {'PRIMER_PAIR_NUM_RETURNED': len(positions)}
+    for pair_number, position in enumerate(positions):
+        designs.update({
+            f'PRIMER_LEFT_{pair_number}': [position, 20],
+            f'PRIMER_LEFT_{pair_number}_SEQUENCE': 'ACGT' * 5,
+            f'PRIMER_RIGHT_{pair_number}': [position + 150, 20],
+            f'PRIMER_RIGHT_{pair_number}_SEQUENCE': 'TGCA' * 5,
+        })
+
+    return designs
+
+
 class IntegrationTestPrimer3(TestCase):
 
     def setUp(self):
@@ -235,5 +251,253 @@ class IntegrationTestPrimer3(TestCase):
         self.assertEqual(result, expected_result)
 
 
+class TestPrimer3Batch(unittest.TestCase):
+
+    def setUp(self):
+        self.p3_config = {
+             "PRIMER_TASK": "pick_cloning_primers",
+             "PRIMER_PICK_LEFT_PRIMER": 1,
+             "PRIMER_PICK_RIGHT_PRIMER": 1,
+             "PRIMER_OPT_SIZE": 20,
+             "PRIMER_MIN_SIZE": 18,
+             "PRIMER_MAX_SIZE": 23,
+             "P3_FILE_FLAG": 1,
+             "SEQUENCE_INCLUDED_REGION": [0, 200],
+             "PRIMER_EXPLAIN_FLAG": 1,
+             "PRIMER_MASK_TEMPLATE": 0
+             }
+        bases = "CACCTTCCCTCCGGTCCCCCCAGTGCTAAAGAAGCTGCGCGGGACAGCTGACGTGACCCATGACCTGCAGGAGATGAAGGAAGAGAGTCGGCAGATGATGCGGGAGAAGAAGGTCACCATCCTGGAGCTGTTCCGCTCCCCCGCCTACCGCCAGCCCATCCTCATCGCTGTGGTGCTGCAGCTGTCCCAGCAGCTGTCTGGCATCAACGC"
+        self.slices = [
+            SliceData(name=f"ENSE00000769557_HG8_{i}", chromosome="1", start=42929593 + i,
+                      end=42929803 + i, bases=bases, strand=strand)
+            for i, strand in enumerate(["-", "+", "-"])
+        ]
+
+    def test_get_primers_batch_workers_keep_input_order(self):
+        # act
+        sequential = list(Primer3(stringency_vector=[1, 0.5], p3_config=self.p3_config)
+                          .get_primers_batch(self.slices))
+        parallel = list(Primer3(stringency_vector=[1, 0.5], p3_config=self.p3_config, workers=2)
+                        .get_primers_batch(self.slices))
+
+        # assert
+        self.assertEqual([slice_data for slice_data, _ in parallel], self.slices)
+        self.assertEqual(parallel, sequential)
+        self.assertEqual([pair.stringency for pair in parallel[0][1]], [1, 0.5])
+
+    def test_warm_up_keeps_workers_across_batches(self):
+        # arrange
+        primer3 = Primer3(stringency_vector=[1], p3_config=self.p3_config, workers=2)
+
+        # act
+        primer3.warm_up()
+        executor = primer3._executor
+        try:
+            first = list(primer3.get_primers_batch(self.slices))
+            second = list(primer3.get_primers_batch(self.slices))
+            executor_kept = primer3._executor is executor
+        finally:
+            primer3.shutdown()
+
+        # assert
+        self.assertIsNotNone(executor)
+        self.assertTrue(executor_kept)
+        self.assertEqual(first, second)
+        self.assertIsNone(primer3._executor)
+
+    @patch('custom_logger.custom_logger.CustomLogger.warning')
+    @patch('primer.primer3.build_primer_pairs')
+    def test_get_primers_batch_skips_pre_targeton_without_pairs(self, mock_build_primer_pairs, logger_warning):
+        # arrange
+        mock_build_primer_pairs.side_effect = lambda designs, slice_data, stringency: (
+            [] if slice_data.name.endswith("_1") else ["pair"])
+
+        # act
+        result = list(Primer3(stringency_vector=[1], p3_config=self.p3_config).get_primers_batch(self.slices))
+
+        # assert
+        self.assertEqual([slice_data.name for slice_data, _ in result],
+                         ["ENSE00000769557_HG8_0", "ENSE00000769557_HG8_2"])
+        logger_warning.assert_called_once_with(
+            "Skipping pre-targeton 'ENSE00000769557_HG8_1': No primer pairs returned")
+
+    @patch('custom_logger.custom_logger.CustomLogger.warning')
+    def test_get_primers_batch_skips_pre_targeton_when_primer3_fails(self, logger_warning):
+        # arrange
+        # Shorter than SEQUENCE_INCLUDED_REGION, which Primer3 rejects
+        failing_slice = SliceData(name="ENSE00000769557_HG8_short", chromosome="1", start=42929593,
+                                  end=42929643, bases=self.slices[0].bases[:50], strand="+")
+        slices = [self.slices[0], failing_slice, self.slices[2]]
+
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                logger_warning.reset_mock()
+
+                # act
+                result = list(Primer3(stringency_vector=[1, 0.5], p3_config=self.p3_config, workers=workers)
+                              .get_primers_batch(slices))
+
+                # assert
+                self.assertEqual([slice_data for slice_data, _ in result], [self.slices[0], self.slices[2]])
+                self.assertTrue(all(primer_pairs for _, primer_pairs in result))
+                logger_warning.assert_called_once()
+                self.assertIn("Skipping pre-targeton 'ENSE00000769557_HG8_short': Primer3 failed: ",
+                              logger_warning.call_args.args[0])
+                self.assertIn("SEQUENCE_INCLUDED_REGION", logger_warning.call_args.args[0])
+
+    @patch('primer.primer3._design_primers')
+    def test_early_exit_stops_running_failed_pre_targeton(self, mock_design_primers):
+        # arrange
+        self.p3_config.update({"PRIMER_MASK_FAILURE_RATE": 0.1, "PRIMER_NUM_RETURN": 5})
+        mock_design_primers.side_effect = lambda slice_info, config: (
+            {'PRIMER_ERROR': 'failed'} if slice_info['SEQUENCE_ID'].endswith('_1') else designs_with_pairs(range(3)))
+        primer3 = Primer3(stringency_vector=[1, 0.1], p3_config=self.p3_config, stringency_schedule='early_exit')
+
+        # act
+        result = primer3._get_primer3_designs_for_slices(self.slices, None)
+
+        # assert
+        self.assertEqual(result[1], [None, {'PRIMER_ERROR': 'failed'}])
+        self.assertEqual([call.args[0]['SEQUENCE_ID'] for call in mock_design_primers.call_args_list],
+                         ["ENSE00000769557_HG8_0", "ENSE00000769557_HG8_1", "ENSE00000769557_HG8_2",
+                          "ENSE00000769557_HG8_0", "ENSE00000769557_HG8_2"])
+
+    @patch('primer.primer3._design_primers')
+    def test_early_exit_skips_looser_stringencies(self, mock_design_primers):
+        # arrange
+        self.p3_config.update({"PRIMER_MASK_FAILURE_RATE": 0.1, "PRIMER_NUM_RETURN": 5})
+        mock_design_primers.return_value = designs_with_pairs(range(5))
+        primer3 = Primer3(stringency_vector=[1, 0.5, 0.1], p3_config=self.p3_config,
+                          stringency_schedule='early_exit')
+
+        # act
+        result = primer3._get_primer3_designs_for_slices(self.slices, None)
+
+        # assert
+        self.assertEqual(result, [[None, None, designs_with_pairs(range(5))]] * 3)
+        self.assertEqual([call.args[1]['PRIMER_MASK_FAILURE_RATE'] for call in mock_design_primers.call_args_list],
+                         [0.1, 0.1, 0.1])
+
+    @patch('primer.primer3._design_primers')
+    def test_early_exit_runs_next_stringency_until_enough_pairs(self, mock_design_primers):
+        # arrange
+        self.p3_config.update({"PRIMER_MASK_FAILURE_RATE": 0.1, "PRIMER_NUM_RETURN": 5})
+        # Each stringency finds 3 new pairs for the first pre-targeton and none for the others
+        mock_design_primers.side_effect = lambda slice_info, config: designs_with_pairs(
+            [int(config['PRIMER_MASK_FAILURE_RATE'] * 10) + offset for offset in range(3)]
+            if slice_info['SEQUENCE_ID'].endswith('_0') else [])
+        primer3 = Primer3(stringency_vector=[1, 0.5, 0.1], p3_config=self.p3_config,
+                          stringency_schedule='early_exit')
+
+        # act
+        result = primer3._get_primer3_designs_for_slices(self.slices, None)
+
+        # assert
+        self.assertEqual(result[0], [None, designs_with_pairs([5, 6, 7]), designs_with_pairs([1, 2, 3])])
+        self.assertEqual(result[1], [designs_with_pairs([])] * 3)
+        self.assertEqual([call.args[1]['PRIMER_MASK_FAILURE_RATE'] for call in mock_design_primers.call_args_list],
+                         [0.1, 0.1, 0.1, 0.5, 0.5, 0.5, 1, 1])
+
+    @patch('primer.primer3.Primer3._group_stringencies', return_value=[0, 2, 2])
+    @patch('primer.primer3._design_primers', return_value=designs_with_pairs(range(10)))
+    def test_early_exit_does_not_count_reused_designs(self, mock_design_primers, _):
+        # arrange
+        self.p3_config.update({"PRIMER_MASK_FAILURE_RATE": 0.1, "PRIMER_NUM_RETURN": 20})
+        primer3 = Primer3(stringency_vector=[1, 0.5, 0.1], p3_config=self.p3_config,
+                          stringency_schedule='early_exit')
+
+        # act
+        result = primer3._get_primer3_designs_for_slices(self.slices[:1], None)
+
+        # assert
+        self.assertEqual(result, [[designs_with_pairs(range(10))] * 3])
+        self.assertEqual([call.args[1]['PRIMER_MASK_FAILURE_RATE'] for call in mock_design_primers.call_args_list],
+                         [0.1, 1])
+
+    @patch('primer.primer3._design_primers')
+    def test_early_exit_counts_distinct_pairs(self, mock_design_primers):
+        # arrange
+        self.p3_config.update({"PRIMER_MASK_FAILURE_RATE": 0.1, "PRIMER_NUM_RETURN": 6})
+        positions = {0.1: [0, 1, 2, 3], 0.5: [2, 3, 4], 1: [5]}
+        mock_design_primers.side_effect = lambda slice_info, config: designs_with_pairs(
+            positions[config['PRIMER_MASK_FAILURE_RATE']])
+        primer3 = Primer3(stringency_vector=[1, 0.5, 0.1], p3_config=self.p3_config,
+                          stringency_schedule='early_exit')
+
+        # act
+        result = primer3._get_primer3_designs_for_slices(self.slices[:1], None)
+
+        # assert
+        self.assertEqual(result, [[designs_with_pairs([5]), designs_with_pairs([2, 3, 4]),
+                                   designs_with_pairs([0, 1, 2, 3])]])
+        self.assertEqual([call.args[1]['PRIMER_MASK_FAILURE_RATE'] for call in mock_design_primers.call_args_list],
+                         [0.1, 0.5, 1])
+
+    def test_early_exit_keeps_pairs_of_stringencies_run(self):
+        # arrange
+        self.p3_config["PRIMER_NUM_RETURN"] = 1
+
+        # act
+        result = list(Primer3(stringency_vector=[1, 0.5], p3_config=self.p3_config,
+                              stringency_schedule='early_exit').get_primers_batch(self.slices))
+
+        # assert
+        self.assertEqual([slice_data for slice_data, _ in result], self.slices)
+        self.assertEqual({pair.stringency for pair in result[0][1]}, {0.5})
+
+    def test_unknown_stringency_schedule(self):
+        # act & assert
+        with self.assertRaises(ValueError):
+            Primer3(stringency_vector=[1], p3_config=self.p3_config, stringency_schedule='unknown')
+
+
+    @patch('primer.primer3.load_kmer_masker')
+    @patch('primer.primer3._design_primers')
+    @patch('primer.primer3.Primer3._kmer_lists_exist')
+    def test_stringencies_with_same_mask_share_designs(self, _, mock_design_primers, mock_load_kmer_masker):
+        # arrange
+        self.p3_config.update({"PRIMER_MASK_TEMPLATE": 1, "PRIMER_MASK_FAILURE_RATE": 0.1,
+                               "PRIMER_MASK_KMERLIST_PATH": "kmers/"})
+        mock_load_kmer_masker.return_value = Mock(failure_rates=Mock(return_value=np.array([0.0, 0.3])))
+        mock_design_primers.side_effect = lambda slice_info, config: {
+            'PRIMER_MASK_FAILURE_RATE': config['PRIMER_MASK_FAILURE_RATE']}
+        primer3 = Primer3(stringency_vector=[1, 0.5, 0.1], p3_config=self.p3_config)
+
+        # act
+        result = primer3._get_primer3_designs_for_slices(self.slices[:1], None)
+
+        # assert
+        self.assertEqual(result, [[{'PRIMER_MASK_FAILURE_RATE': 1}, {'PRIMER_MASK_FAILURE_RATE': 1},
+                                   {'PRIMER_MASK_FAILURE_RATE': 0.1}]])
+        self.assertEqual(mock_design_primers.call_count, 2)
+        mock_load_kmer_masker.assert_called_with("kmers/", "homo_sapiens")
+
+
+    @patch('primer.primer3.prepare_p3_config', side_effect=lambda config, stringency: dict(config))
+    @patch('primer.primer3._design_primers', return_value={'PRIMER_PAIR_NUM_RETURNED': 0})
+    def test_stringency_configs_prepared_once(self, _, mock_prepare_p3_config):
+        # arrange
+        primer3 = Primer3(stringency_vector=[1, 0.5, 0.1], p3_config=self.p3_config)
+
+        # act
+        primer3._get_primer3_designs_for_slices(self.slices, None)
+        primer3._get_primer3_designs_for_slices(self.slices, None)
+
+        # assert
+        self.assertEqual(mock_prepare_p3_config.call_count, 3)
+
+    @patch('primer.primer3.sys.stdout')
+    def test_p3_config_echoed_once(self, mock_stdout):
+        # arrange
+        primer3 = Primer3(stringency_vector=[1], p3_config=self.p3_config)
+
+        # act
+        list(primer3.get_primers_batch(self.slices))
+        primer3.get_primers(self.slices[0])
+
+        # assert
+        mock_stdout.write.assert_called_once_with(primer3.format_p3_config(self.p3_config))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,99 @@
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+from primer.primer3 import Primer3
+from primer.primer3_cache import Primer3Cache, _kmer_lists_identity
+from primer.slice_data import SliceData
+
+
+class TestPrimer3Cache(TestCase):
+
+    def setUp(self):
+        self.tmpdir = TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+        self.slice_info = {'SEQUENCE_ID': 'slice_name', 'SEQUENCE_TEMPLATE': 'ACGT'}
+        self.config_data = {'PRIMER_TASK': 'generic', 'PRIMER_MASK_FAILURE_RATE': 0.1}
+
+    def test_key_depends_on_input_and_config(self):
+        key = Primer3Cache.key(self.slice_info, self.config_data)
+
+        self.assertEqual(key, Primer3Cache.key(dict(reversed(self.slice_info.items())), self.config_data))
+        self.assertNotEqual(key, Primer3Cache.key(self.slice_info, {**self.config_data,
+                                                                    'PRIMER_MASK_FAILURE_RATE': 1}))
+
+    def test_key_depends_on_primer3_version(self):
+        key = Primer3Cache.key(self.slice_info, self.config_data)
+
+        with patch('primer.primer3_cache.primer3.__version__', '0.0.0'):
+            self.assertNotEqual(key, Primer3Cache.key(self.slice_info, self.config_data))
+
+    def test_key_depends_on_kmer_lists_when_masking(self):
+        kmer_dir = os.path.join(self.tmpdir.name, 'kmers')
+        os.makedirs(kmer_dir)
+        for kmer_length in (11, 16):
+            with open(os.path.join(kmer_dir, f'homo_sapiens_{kmer_length}.list'), 'w') as kmer_list:
+                kmer_list.write('AAAAAAAAAAA 10\n')
+        config_data = {**self.config_data, 'PRIMER_MASK_TEMPLATE': 1, 'PRIMER_MASK_KMERLIST_PATH': kmer_dir}
+        key = Primer3Cache.key(self.slice_info, config_data)
+
+        with open(os.path.join(kmer_dir, 'homo_sapiens_16.list'), 'a') as kmer_list:
+            kmer_list.write('CCCCCCCCCCCCCCCC 20\n')
+        _kmer_lists_identity.cache_clear()
+
+        self.assertNotEqual(key, Primer3Cache.key(self.slice_info, config_data))
+
+    def test_get_returns_stored_designs(self):
+        cache = Primer3Cache(self.tmpdir.name)
+        designs = {'PRIMER_PAIR_NUM_RETURNED': 1, 'PRIMER_LEFT_0': (10, 20)}
+
+        cache.set('abc', designs)
+
+        self.assertEqual(cache.get('abc'), designs)
+        self.assertIsNone(cache.get('missing'))
+
+    def test_set_evicts_least_recently_used_entries(self):
+        cache = Primer3Cache(self.tmpdir.name, max_size_mb=0.0015)
+        designs = {'PRIMER_LEFT_0_SEQUENCE': 'A' * 500}
+
+        cache.set('aa_first', designs)
+        cache.set('bb_second', designs)
+        os.utime(cache._entry_path('aa_first'), (0, 0))
+        os.utime(cache._entry_path('bb_second'), (1, 1))
+        cache.get('aa_first')
+
+        cache.set('cc_third', designs)
+
+        self.assertIsNotNone(cache.get('aa_first'))
+        self.assertIsNone(cache.get('bb_second'))
+        self.assertIsNotNone(cache.get('cc_third'))
+
+    @patch('primer3.bindings.design_primers')
+    def test_primer3_skips_design_when_cached(self, mock_design_primers):
+        mock_design_primers.return_value = {'PRIMER_PAIR_NUM_RETURNED': 0, 'PRIMER_LEFT_EXPLAIN': '',
+                                            'PRIMER_RIGHT_EXPLAIN': '', 'PRIMER_PAIR_EXPLAIN': ''}
+        p3_config = {"PRIMER_EXPLAIN_FLAG": 1, "PRIMER_MASK_TEMPLATE": 0}
+        slices = [SliceData('slice_name', 100, 200, '+', '1', 'ACGT')]
+
+        for _ in range(2):
+            primer3 = Primer3(stringency_vector=[1], p3_config=p3_config, cache=Primer3Cache(self.tmpdir.name))
+            list(primer3.get_primers_batch(slices))
+
+        mock_design_primers.assert_called_once()
+
+    @patch('primer3.bindings.design_primers')
+    def test_size_limit_holds_with_workers(self, mock_design_primers):
+        mock_design_primers.side_effect = lambda slice_info, config: {
+            'PRIMER_PAIR_NUM_RETURNED': 0, 'PRIMER_LEFT_EXPLAIN': slice_info['SEQUENCE_ID'] * 100,
+            'PRIMER_RIGHT_EXPLAIN': '', 'PRIMER_PAIR_EXPLAIN': ''}
+        p3_config = {"PRIMER_EXPLAIN_FLAG": 1, "PRIMER_MASK_TEMPLATE": 0}
+        slices = [SliceData(f'slice_name_{index:02d}', 100, 200, '+', '1', 'ACGT') for index in range(16)]
+        cache = Primer3Cache(self.tmpdir.name, max_size_mb=0.005)
+
+        list(Primer3(stringency_vector=[1], p3_config=p3_config, workers=2, cache=cache).get_primers_batch(slices))
+
+        cache_size = sum(os.path.getsize(entry) for entry in cache._entries())
+        self.assertGreater(cache_size, 0)
+        self.assertLessEqual(cache_size, cache.max_size)
@@ -1,3 +1,4 @@
+import json
 import unittest
 
 from pyfakefs.fake_filesystem_unittest import TestCase
@@ -10,6 +11,7 @@ from primer.slice_data import SliceData
 from primer.primer_pair import \
     PrimerPair, \
     build_primer_pairs, \
+    design_pair_keys, \
     name_primers, \
     capture_primer_details, \
     build_primer_loci, \
@@ -118,6 +120,39 @@ class TestPrimerPair(TestCase):
         self.assertEqual(expected, actual)
         self.assertEqual(f"{details_mock.call_args}", "call('key_1')")
 
+    def test_build_primer_pairs_groups_primers_by_pair_number(self):
+        # arrange
+        input_design = json.loads(self.primer3_output_json_data)
+
+        # act
+        actual = build_primer_pairs(input_design, self.input_slice_data, 0.1)
+
+        # assert
+        self.assertEqual([pair.id for pair in actual], [f"slice_name_{i}_str0_1" for i in range(5)])
+        self.assertEqual(len({pair.uid for pair in actual}), 5)
+        for i, pair in enumerate(actual):
+            self.assertEqual(pair.product_size, input_design[f"PRIMER_PAIR_{i}_PRODUCT_SIZE"])
+            self.assertEqual(pair.forward.name, f"slice_name_LibAmpF_{i}")
+            self.assertEqual(pair.forward.sequence, input_design[f"PRIMER_LEFT_{i}_SEQUENCE"])
+            self.assertEqual(pair.reverse.name, f"slice_name_LibAmpR_{i}")
+            self.assertEqual(pair.reverse.sequence, input_design[f"PRIMER_RIGHT_{i}_SEQUENCE"])
+
+    def test_design_pair_keys_match_built_primer_pairs(self):
+        # arrange
+        input_design = json.loads(self.primer3_output_json_data)
+
+        for strand in ('+', '-'):
+            with self.subTest(strand=strand):
+                slice_data = SliceData(name='slice_name', start=100, end=200, strand=strand,
+                                       chromosome='1', bases='bases')
+
+                # act
+                actual = design_pair_keys(input_design, slice_data)
+
+                # assert
+                self.assertEqual(actual, {pair.key for pair in build_primer_pairs(input_design, slice_data, 0.1)})
+                self.assertEqual(len(actual), 5)
+
     @patch('primer.primer_pair.determine_primer_strands')
     @patch('primer.primer_pair.calculate_primer_coords')
     def test_build_primer_loci_with_coords_success(
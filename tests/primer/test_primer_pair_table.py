@@ -0,0 +1,175 @@
+from unittest import TestCase
+
+from primer.designed_primer import DesignedPrimer, Interval
+from primer.filter.duplicates_filter import DuplicatesFilter
+from primer.filter.filter_manager import FilterManager
+from primer.primer_pair import PrimerPair
+from primer.primer_pair_table import PrimerPairTable
+
+
+def create_primer_pair(uid: str, stringency: float, product_size: int, offset: int = 0) -> PrimerPair:
+    pair = PrimerPair(
+        pair_id=f"ABCD_{uid}_str1",
+        chromosome="1",
+        pre_targeton_start=42930996,
+        pre_targeton_end=42931206,
+        product_size=product_size,
+        stringency=stringency,
+        targeton_id="ABCD",
+        uid=uid)
+
+    pair.forward = DesignedPrimer(
+        name=f"ABCD_LibAmpF_{uid}",
+        penalty=0.16123,
+        pair_id=pair.id,
+        sequence="AGAAAACGCTGGTGTGGTGA",
+        coords=Interval(start=169, end=20),
+        primer_start=42931146 + offset,
+        primer_end=42931166 + offset,
+        strand="+",
+        tm=60.0,
+        gc_percent=50.0,
+        self_any_th=0.0,
+        self_end_th=0.0,
+        hairpin_th=0.0,
+        end_stability=4.02
+    )
+
+    pair.reverse = DesignedPrimer(
+        name=f"ABCD_LibAmpR_{uid}",
+        penalty=0.30,
+        pair_id=pair.id,
+        sequence="TGTTGCTCTTTTCCCAGGCT",
+        coords=Interval(start=41, end=20),
+        primer_start=42930996 + offset,
+        primer_end=42931016 + offset,
+        strand="-",
+        tm=59.8,
+        gc_percent=50.1,
+        self_any_th=0.1,
+        self_end_th=0.2,
+        hairpin_th=0.2,
+        end_stability=4.58
+    )
+
+    return pair
+
+
+class TestPrimerPairTable(TestCase):
+    def setUp(self):
+        self.pairs = [
+            create_primer_pair('uid0', 1, 129),
+            create_primer_pair('uid1', 0.1, 140, offset=5),
+        ]
+
+    def test_from_primer_pairs_one_row_per_pair(self):
+        # act
+        table = PrimerPairTable.from_primer_pairs(self.pairs)
+
+        # assert
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.pairs['forward_primer'].tolist(), ['ABCD_LibAmpF_uid0', 'ABCD_LibAmpF_uid1'])
+        self.assertEqual(table.pairs['reverse_primer_start'].tolist(), [42930996, 42931001])
+        self.assertEqual(table.pairs['pair_uid'].tolist(), ['uid0', 'uid1'])
+
+    def test_to_primers_dataframe_interleaves_primers(self):
+        # arrange
+        table = PrimerPairTable.from_primer_pairs(self.pairs)
+
+        # act
+        result = table.to_primers_dataframe('LibAmp')
+
+        # assert
+        self.assertEqual(result.columns.tolist(), [
+            'primer_type', 'primer', 'penalty', 'sequence', 'primer_start', 'primer_end', 'tm', 'gc_percent',
+            'self_any_th', 'self_end_th', 'hairpin_th', 'end_stability', 'pair_uid', 'stringency', 'chromosome',
+            'pre_targeton_start', 'pre_targeton_end', 'product_size', 'targeton_id'
+        ])
+        self.assertEqual(result['primer'].tolist(),
+                         ['ABCD_LibAmpF_uid0', 'ABCD_LibAmpR_uid0', 'ABCD_LibAmpF_uid1', 'ABCD_LibAmpR_uid1'])
+        self.assertEqual(result['pair_uid'].tolist(), ['uid0', 'uid0', 'uid1', 'uid1'])
+        self.assertEqual(result['penalty'].tolist(), [0.161, 0.3, 0.161, 0.3])
+        self.assertEqual(result.index.tolist(), [0, 1, 2, 3])
+
+    def test_to_primers_dataframe_keeps_primer_index_after_sort(self):
+        # arrange
+        table = PrimerPairTable.from_primer_pairs(self.pairs).sort(by=['stringency'], ascending=[True])
+
+        # act
+        result = table.to_primers_dataframe('LibAmp')
+
+        # assert
+        self.assertEqual(result['pair_uid'].tolist(), ['uid1', 'uid1', 'uid0', 'uid0'])
+        self.assertEqual(result.index.tolist(), [2, 3, 0, 1])
+
+    def test_to_primers_dataframe_with_discard_reason(self):
+        # arrange
+        table = PrimerPairTable.from_primer_pairs(self.pairs, ['reason0', 'reason1'])
+
+        # act
+        result = table.to_primers_dataframe('LibAmp')
+
+        # assert
+        self.assertEqual(result.columns[-1], 'discard_reason')
+        self.assertEqual(result['discard_reason'].tolist(), ['reason0', 'reason0', 'reason1', 'reason1'])
+
+    def test_to_bed_rows(self):
+        # arrange
+        table = PrimerPairTable.from_primer_pairs(self.pairs[:1])
+
+        # act
+        result = table.to_bed_rows()
+
+        # assert
+        self.assertEqual(result, [
+            ['1', 42931146, 42931166, 'ABCD_LibAmpF_uid0', '0', '+'],
+            ['1', 42930996, 42931016, 'ABCD_LibAmpR_uid0', '0', '-'],
+        ])
+
+    def test_empty_table(self):
+        # act
+        table = PrimerPairTable.from_primer_pairs([])
+
+        # assert
+        self.assertTrue(table.empty)
+        self.assertTrue(table.to_primers_dataframe('LibAmp').empty)
+        self.assertEqual(table.to_bed_rows(), [])
+
+    def test_filtered_table_keeps_discarded_pairs_with_reason(self):
+        # arrange
+        duplicate = create_primer_pair('uid2', 1, 150)
+        table = PrimerPairTable.from_primer_pairs(self.pairs + [duplicate])
+
+        # act
+        table = FilterManager({'duplicates': True}).filter_table(table)
+
+        # assert
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.kept().pairs['pair_uid'].tolist(), ['uid0', 'uid1'])
+        self.assertNotIn('discard_reason', table.kept().pairs.columns)
+        self.assertEqual(table.discarded().pairs['pair_uid'].tolist(), ['uid2'])
+        self.assertEqual(table.discarded().pairs['discard_reason'].tolist(), [DuplicatesFilter.reason_discarded])
+
+    def test_discarded_keeps_filter_order_after_sort(self):
+        # arrange
+        duplicates = [create_primer_pair('uid2', 1, 150), create_primer_pair('uid3', 0.1, 150, offset=5)]
+        table = FilterManager({'duplicates': True}).filter_table(PrimerPairTable.from_primer_pairs(self.pairs + duplicates))
+
+        # act
+        result = table.sort(by=['stringency'], ascending=[True])
+
+        # assert
+        self.assertEqual(result.kept().pairs['pair_uid'].tolist(), ['uid1', 'uid0'])
+        self.assertEqual(result.discarded().pairs['pair_uid'].tolist(), ['uid2', 'uid3'])
+
+    def test_concat(self):
+        # arrange
+        first = PrimerPairTable.from_primer_pairs(self.pairs[:1])
+        second = PrimerPairTable.from_primer_pairs(self.pairs[1:])
+
+        # act
+        result = PrimerPairTable.concat([first, second])
+
+        # assert
+        self.assertEqual(result.pairs['pair_uid'].tolist(), ['uid0', 'uid1'])
+        self.assertEqual(result.pairs.index.tolist(), [0, 1])
@@ -0,0 +1,21 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+from primer.primer_registry import PrimerRegistry
+
+
+class TestPrimerRegistry(TestCase):
+    def test_contain_variants_looks_up_each_interval_once(self):
+        # arrange
+        registry = PrimerRegistry()
+        look_up_variants = Mock(side_effect=lambda intervals: {interval: interval[1] == 10 for interval in intervals})
+        registry.contain_variants([("1", 10, 20), ("1", 30, 40)], look_up_variants)
+
+        # act
+        result = registry.contain_variants([("1", 30, 40), ("1", 50, 60), ("1", 30, 40)], look_up_variants)
+
+        # assert
+        self.assertEqual(result, {("1", 30, 40): False, ("1", 50, 60): False})
+        self.assertEqual(look_up_variants.call_count, 2)
+        look_up_variants.assert_called_with([("1", 50, 60)])
+        self.assertEqual(registry.reused_variant_results, 1)
@@ -1,4 +1,4 @@
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 from pyfakefs.fake_filesystem_unittest import TestCase
 
@@ -111,3 +111,39 @@ class TestSliceData(TestCase):
             _ = SliceData.get_first_slice_data(mocked_fasta)
 
         self.assertTrue("does not match the expected format" in str(ex.exception))
+
+    def test_get_slices_data_yields_every_record(self):
+        slices_fasta_file = 'two_slices.fa'
+        self.fs.create_file(slices_fasta_file,
+                            contents='>region1_1::chr1:5-10(+)\nGTGATCGAGGAGTTCTA\n'
+                                     '>region2_1::chr2:15-20(-)\nAAAAGGGCCCTTTAAAA')
+
+        expected = [
+            SliceData(name='region1_1', start=5, end=10, strand='+', chromosome='1', bases='GTGATCGAGGAGTTCTA'),
+            SliceData(name='region2_1', start=15, end=20, strand='-', chromosome='2', bases='AAAAGGGCCCTTTAAAA'),
+        ]
+
+        result = list(SliceData.get_slices_data(slices_fasta_file))
+
+        self.assertEqual(result, expected)
+
+    def test_get_slices_data_when_empty_fasta_file(self):
+        empty_fasta = "empty.fa"
+        self.fs.create_file(empty_fasta, contents='')
+
+        with self.assertRaises(ValueError) as error:
+            list(SliceData.get_slices_data(empty_fasta))
+
+        self.assertEqual(str(error.exception), f"Unable to parse the FASTA file '{empty_fasta}'")
+
+    def test_surrounding_region_is_fetched_once(self):
+        provider = Mock()
+        provider.get.return_value = 'ACGT'
+        slice_sample = SliceData('slice_name', 1500, 1710, '+', '1', 'slice_bases',
+                                 surrounding_region_provider=provider)
+
+        first = slice_sample.surrounding_region
+        second = slice_sample.surrounding_region
+
+        self.assertEqual((first, second), ('ACGT', 'ACGT'))
+        provider.get.assert_called_once_with('1', 500, 2710)
@@ -0,0 +1,125 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from os import listdir, path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from primer.surrounding_region import SurroundingRegionProvider
+
+
+class StubEnsemblHandler(BaseHTTPRequestHandler):
+    """Stands in for the Ensembl POST /sequence/region/human endpoint."""
+    requests = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        StubEnsemblHandler.requests.append((self.path, body['regions']))
+
+        response = json.dumps([{'query': region, 'seq': f'SEQ[{region}]'} for region in body['regions']])
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(response.encode())
+
+    def log_message(self, *args):
+        pass
+
+
+class TestSurroundingRegionProvider(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(('127.0.0.1', 0), StubEnsemblHandler)
+        cls.server_url = f'http://127.0.0.1:{cls.server.server_port}'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        StubEnsemblHandler.requests = []
+        self.cache_dir = TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+
+    def test_get_many_uses_single_batch_request(self):
+        # arrange
+        provider = SurroundingRegionProvider(ensembl_url=self.server_url)
+
+        # act
+        result = provider.get_many([('1', 100, 200), ('X', 5, 10), ('1', 100, 200)])
+
+        # assert
+        self.assertEqual(result, ['SEQ[1:100..200:1]', 'SEQ[X:5..10:1]', 'SEQ[1:100..200:1]'])
+        self.assertEqual(StubEnsemblHandler.requests,
+                         [('/sequence/region/human', ['1:100..200:1', 'X:5..10:1'])])
+
+    def test_get_is_served_from_memory_after_first_fetch(self):
+        # arrange
+        provider = SurroundingRegionProvider(ensembl_url=self.server_url)
+        provider.get('1', 100, 200)
+
+        # act
+        result = provider.get('1', 100, 200)
+
+        # assert
+        self.assertEqual(result, 'SEQ[1:100..200:1]')
+        self.assertEqual(len(StubEnsemblHandler.requests), 1)
+
+    def test_get_is_served_from_disk_cache(self):
+        # arrange
+        SurroundingRegionProvider(ensembl_url=self.server_url, cache_dir=self.cache_dir.name).get('1', 100, 200)
+        provider = SurroundingRegionProvider(ensembl_url=self.server_url, cache_dir=self.cache_dir.name)
+
+        # act
+        result = provider.get('1', 100, 200)
+
+        # assert
+        self.assertEqual(result, 'SEQ[1:100..200:1]')
+        self.assertEqual(len(StubEnsemblHandler.requests), 1)
+        self.assertEqual(listdir(self.cache_dir.name), ['1_100_200.seq'])
+
+    @patch('time.sleep', return_value=None)
+    def test_get_many_splits_large_batches(self, mock_sleep):
+        # arrange
+        provider = SurroundingRegionProvider(ensembl_url=self.server_url)
+        regions = [('1', start, start + 10) for start in range(120)]
+
+        # act
+        result = provider.get_many(regions)
+
+        # assert
+        self.assertEqual(len(result), 120)
+        self.assertEqual([len(regions) for _, regions in StubEnsemblHandler.requests], [50, 50, 20])
+
+    def test_get_from_reference_genome(self):
+        # arrange
+        reference_genome = Mock()
+        reference_genome.fetch.return_value = 'ACGT'
+        provider = SurroundingRegionProvider(reference_genome, ensembl_url=self.server_url)
+
+        # act
+        result = provider.get('1', 100, 200)
+
+        # assert
+        self.assertEqual(result, 'ACGT')
+        reference_genome.fetch.assert_called_once_with('1', 99, 200)
+        self.assertEqual(StubEnsemblHandler.requests, [])
+
+    def test_reference_fasta_opened_on_first_use(self):
+        # arrange
+        fasta_path = path.join(self.cache_dir.name, 'reference.fa')
+        with open(fasta_path, 'w') as fasta:
+            fasta.write('>1\nACGTACGTAC\nGTACGTACGT\n')
+        provider = SurroundingRegionProvider(ensembl_url=self.server_url, reference_fasta=fasta_path)
+        index_created_before_use = path.exists(fasta_path + '.fai')
+
+        # act
+        result = provider.get('1', 3, 12)
+
+        # assert
+        self.assertFalse(index_created_before_use)
+        self.assertEqual(result, 'GTACGTACGT')
+        self.assertEqual(StubEnsemblHandler.requests, [])
@@ -11,11 +11,13 @@ from pyfakefs.fake_filesystem_unittest import TestCase
 
 from tests.utils.utils import CapturingStreamHandler
 
-from collections import defaultdict
+from primer.filter.filter_manager import FilterManager
 from primer.primer_pair import PrimerPair
+from primer.primer_pair_table import PrimerPairTable
 from primer.designed_primer import DesignedPrimer, Interval
-from primer.write_primer_output import _reorder_columns, _add_primer_pair, export_three_optimal_primer_pairs_to_csv, \
-    export_primers_to_csv
+from primer.write_primer_output import reorder_columns, export_three_optimal_primer_pairs_to_csv, \
+    export_primers_to_csv, write_primer_output
+from utils.instrumentation import Instrumentation
 
 
 class TestWritePrimerOutputFiles(TestCase):
@@ -42,7 +44,7 @@ class TestWritePrimerOutputFiles(TestCase):
         df = pd.DataFrame(data)
 
         # Act (reorder dataframe according to list)
-        ordered_df = _reorder_columns(column_names, df)
+        ordered_df = reorder_columns(column_names, df)
 
         # Assertion
         pd.testing.assert_frame_equal(ordered_df, df)
@@ -58,7 +60,7 @@ class TestWritePrimerOutputFiles(TestCase):
         }
         df = pd.DataFrame(data)
 
-        ordered_df = _reorder_columns(column_names, df)
+        ordered_df = reorder_columns(column_names, df)
 
         pd.testing.assert_frame_equal(ordered_df, df)
         logs = self.handler.buffer.getvalue().strip()
@@ -75,7 +77,7 @@ class TestWritePrimerOutputFiles(TestCase):
         df = pd.DataFrame(data)
 
         with self.assertRaises(ValueError) as value_error:
-            _reorder_columns(column_names, df)
+            reorder_columns(column_names, df)
             self.assertEqual(str(value_error.exception), "All column names in config file are wrong")
 
         logs = self.handler.buffer.getvalue().strip()
@@ -91,7 +93,7 @@ class TestWritePrimerOutputFiles(TestCase):
         df = pd.DataFrame(data)
 
         # Act (reorder dataframe according to list)
-        ordered_df = _reorder_columns(column_names, df)
+        ordered_df = reorder_columns(column_names, df)
 
         pd.testing.assert_frame_equal(ordered_df, df[['Name', 'Age']])
         logs = self.handler.buffer.getvalue().strip()
@@ -107,7 +109,7 @@ class TestWritePrimerOutputFiles(TestCase):
         df = pd.DataFrame(data)
 
         # Act (reorder dataframe according to list)
-        ordered_df = _reorder_columns(column_names, df)
+        ordered_df = reorder_columns(column_names, df)
 
         # Assertion
         pd.testing.assert_frame_equal(ordered_df, df[['Name']])
@@ -125,7 +127,7 @@ class TestWritePrimerOutputFiles(TestCase):
         df = pd.DataFrame(data)
 
         # Act (reorder dataframe according to list)
-        ordered_df = _reorder_columns(column_names, df)
+        ordered_df = reorder_columns(column_names, df)
 
         # Assertion
         pd.testing.assert_frame_equal(ordered_df, df[['Age', 'Name']])
@@ -183,6 +185,30 @@ class TestWritePrimerOutputFiles(TestCase):
 
         self.assertEqual(content, expected_content)
     
+    def test_export_three_optimal_primers_to_csv_per_pre_targeton(self):
+        # Arrange ranked primers of two pre-targetons, the first one having all the best pairs
+        data = {
+            'primer': [f'STEQ_{i}' for i in range(8)] + [f'mask_{i}' for i in range(4)],
+            'targeton_id': ['STEQ'] * 8 + ['mask'] * 4,
+            'chromosome': ['7'] * 8 + ['1'] * 4,
+            'pre_targeton_start': [44490254] * 8 + [42930996] * 4,
+            'pre_targeton_end': [44490755] * 8 + [42931206] * 4,
+        }
+        df = pd.DataFrame(data)
+
+        export_dir = '/mock/directory'
+        self.fs.create_dir(export_dir)
+
+        # Act
+        result_path = export_three_optimal_primer_pairs_to_csv(df, export_dir, column_order=list(data))
+
+        # Assert
+        optimal_primers = pd.read_csv(result_path)
+        self.assertEqual(optimal_primers['primer'].tolist(),
+                         [f'STEQ_{i}' for i in range(6)] + [f'mask_{i}' for i in range(4)])
+        logs = self.handler.buffer.getvalue().strip()
+        self.assertEqual(logs, "Less than 3 primer pairs returned by Primer3")
+
     def test_warning_if_less_than_three_optimal_primers_return(self):
         # Arrange
         data = {
@@ -206,11 +232,8 @@ class TestWritePrimerOutputFiles(TestCase):
 
 
 class TestDataFrameBuild(TestCase):
-    def test__add_primer_pair_when_dict_empty(self):
-        test_dict = defaultdict(list)
-        primer_type = "LibAmp"
-
-        pair = PrimerPair(
+    def setUp(self):
+        self.first_pair = PrimerPair(
                 pair_id="ABCD_0_str1",
                 chromosome="1",
                 pre_targeton_start=42930996,
@@ -220,7 +243,7 @@ class TestDataFrameBuild(TestCase):
                 targeton_id="ABCD",
                 uid="uid0")
 
-        pair.forward = DesignedPrimer(
+        self.first_pair.forward = DesignedPrimer(
                 name="ABCD_LibAmpF_0",
                 penalty=0.16,
                 pair_id="ABCD_0_str1",
@@ -237,7 +260,7 @@ class TestDataFrameBuild(TestCase):
                 end_stability=4.02
             )
 
-        pair.reverse = DesignedPrimer(
+        self.first_pair.reverse = DesignedPrimer(
                 name="ABCD_LibAmpR_0",
                 penalty=0.30,
                 pair_id="ABCD_0_str1",
@@ -254,60 +277,7 @@ class TestDataFrameBuild(TestCase):
                 end_stability=4.58
             )
 
-        expected_dict = defaultdict(list)
-        expected_dict = {
-                'primer_type': ['LibAmp', 'LibAmp'],
-                'primer': ['ABCD_LibAmpF_0', 'ABCD_LibAmpR_0'],
-                'penalty': [0.16, 0.3],
-                'sequence': ['AGAAAACGCTGGTGTGGTGA', 'TGTTGCTCTTTTCCCAGGCT'],
-                'primer_start': [42931146, 42930996],
-                'primer_end': [42931166, 42931016],
-                'tm': [60.0, 59.8],
-                'gc_percent': [50.0, 50.1],
-                'self_any_th': [0.0, 0.1],
-                'self_end_th': [0.0, 0.2],
-                'hairpin_th': [0.0, 0.2],
-                'end_stability': [4.02, 4.58],
-                'pair_uid': ['uid0', 'uid0'],
-                'stringency': [1, 1],
-                'chromosome': ['1', '1'],
-                'pre_targeton_start': [42930996, 42930996],
-                'pre_targeton_end': [42931206, 42931206],
-                'product_size': [129, 129],
-                'targeton_id': ['ABCD', 'ABCD']
-                }
-
-        self.maxDiff = None
-        self.assertIsNone(_add_primer_pair(test_dict, pair, primer_type))
-        self.assertDictEqual(test_dict, expected_dict)
-
-    def test__add_primer_pair_when_dict_not_empty(self):
-        test_dict = defaultdict(list)
-        primer_type = "LibAmp"
-
-        test_dict = {
-                'primer_type': ['LibAmp', 'LibAmp'],
-                'primer': ['ABCD_LibAmpF_0', 'ABCD_LibAmpR_0'],
-                'penalty': [0.16, 0.3],
-                'sequence': ['AGAAAACGCTGGTGTGGTGA', 'TGTTGCTCTTTTCCCAGGCT'],
-                'primer_start': [42931146, 42930996],
-                'primer_end': [42931166, 42931016],
-                'tm': [60.0, 59.8],
-                'gc_percent': [50.0, 50.1],
-                'self_any_th': [0.0, 0.1],
-                'self_end_th': [0.0, 0.2],
-                'hairpin_th': [0.0, 0.2],
-                'end_stability': [4.02, 4.58],
-                'pair_uid': ['uid0', 'uid0'],
-                'stringency': [1, 1],
-                'chromosome': ['1', '1'],
-                'pre_targeton_start': [42930996, 42930996],
-                'pre_targeton_end': [42931206, 42931206],
-                'product_size': [129, 129],
-                'targeton_id': ['ABCD', 'ABCD']
-            }
-
-        pair = PrimerPair(
+        self.second_pair = PrimerPair(
                 pair_id="ABCD_1_str1",
                 chromosome="1",
                 pre_targeton_start=42930996,
@@ -317,7 +287,7 @@ class TestDataFrameBuild(TestCase):
                 targeton_id="ABCD",
                 uid="uid1")
 
-        pair.forward = DesignedPrimer(
+        self.second_pair.forward = DesignedPrimer(
                 name="ABCD_LibAmpF_1",
                 penalty=0.17,
                 pair_id="ABCD_1_str1",
@@ -334,7 +304,7 @@ class TestDataFrameBuild(TestCase):
                 end_stability=4.75
             )
 
-        pair.reverse = DesignedPrimer(
+        self.second_pair.reverse = DesignedPrimer(
                 name="ABCD_LibAmpR_1",
                 penalty=0.31,
                 pair_id="ABCD_1_str1",
@@ -351,7 +321,39 @@ class TestDataFrameBuild(TestCase):
                 end_stability=4.58
             )
 
-        expected_dict = defaultdict(list)
+    def test_primers_dataframe_when_one_pair(self):
+        primer_type = "LibAmp"
+
+        expected_dict = {
+                'primer_type': ['LibAmp', 'LibAmp'],
+                'primer': ['ABCD_LibAmpF_0', 'ABCD_LibAmpR_0'],
+                'penalty': [0.16, 0.3],
+                'sequence': ['AGAAAACGCTGGTGTGGTGA', 'TGTTGCTCTTTTCCCAGGCT'],
+                'primer_start': [42931146, 42930996],
+                'primer_end': [42931166, 42931016],
+                'tm': [60.0, 59.8],
+                'gc_percent': [50.0, 50.1],
+                'self_any_th': [0.0, 0.1],
+                'self_end_th': [0.0, 0.2],
+                'hairpin_th': [0.0, 0.2],
+                'end_stability': [4.02, 4.58],
+                'pair_uid': ['uid0', 'uid0'],
+                'stringency': [1, 1],
+                'chromosome': ['1', '1'],
+                'pre_targeton_start': [42930996, 42930996],
+                'pre_targeton_end': [42931206, 42931206],
+                'product_size': [129, 129],
+                'targeton_id': ['ABCD', 'ABCD']
+                }
+
+        primers_df = PrimerPairTable.from_primer_pairs([self.first_pair]).to_primers_dataframe(primer_type)
+
+        self.maxDiff = None
+        self.assertDictEqual(primers_df.to_dict(orient='list'), expected_dict)
+
+    def test_primers_dataframe_when_filtered_pairs(self):
+        primer_type = "LibAmp"
+
         expected_dict = {
                 'primer_type': ['LibAmp', 'LibAmp', 'LibAmp', 'LibAmp'],
                 'primer': ['ABCD_LibAmpF_0', 'ABCD_LibAmpR_0',
@@ -376,9 +378,29 @@ class TestDataFrameBuild(TestCase):
                 'targeton_id': ['ABCD', 'ABCD', 'ABCD', 'ABCD']
             }
 
+        filtered_pairs = FilterManager({'duplicates': True}).filter_table(
+            PrimerPairTable.from_primer_pairs([self.first_pair, self.second_pair]))
+        primers_df = filtered_pairs.kept().to_primers_dataframe(primer_type)
+
         self.maxDiff = None
-        self.assertIsNone(_add_primer_pair(test_dict, pair, primer_type))
-        self.assertDictEqual(test_dict, expected_dict)
+        self.assertDictEqual(primers_df.to_dict(orient='list'), expected_dict)
+
+    @patch('primer.write_primer_output.instrumentation', new_callable=Instrumentation)
+    def test_write_primer_output_counts_written_pairs(self, instrumentation):
+        # Arrange
+        self.setUpPyfakefs()
+        export_dir = '/mock/directory'
+        self.fs.create_dir(export_dir)
+        primer_pairs = PrimerPairTable.from_primer_pairs([self.first_pair, self.second_pair],
+                                                         [None, 'discarded'])
+
+        # Act
+        result = write_primer_output(primer_pairs, column_order=['primer', 'pair_uid'], existing_dir=export_dir)
+
+        # Assert
+        self.assertEqual(pd.read_csv(result.csv)['pair_uid'].tolist(), ['uid0', 'uid0'])
+        write_output = instrumentation.stages['write_output']
+        self.assertEqual((write_output.calls, write_output.pairs_in, write_output.pairs_out), (1, 1, 1))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,118 @@
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+from Bio import SeqIO
+
+from slicer.native_slicer import NativeSlicer, reverse_complement
+from utils.instrumentation import Instrumentation
+
+
+class TestNativeSlicer(TestCase):
+    def setUp(self):
+        self.fasta_file_path = r"./tests/integration/fixtures/fasta_example.fa"
+        self.expected_fasta_path = r"./tests/integration/fixtures/slicer_output.fasta"
+        self.tmpdir = TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+        self.params = {
+            'fasta': self.fasta_file_path,
+            '1b': False,
+            'flank_5': 50,
+            'flank_3': 50,
+            'length': 210,
+            'offset': 5,
+        }
+
+    def create_bed(self, contents: str) -> str:
+        bed_path = path.join(self.tmpdir.name, 'test.bed')
+        with open(bed_path, 'w') as bed_file:
+            bed_file.write(contents)
+        return bed_path
+
+    def test_get_slices_matches_bedtools_output(self):
+        # arrange
+        self.params['bed'] = self.create_bed('chr1\t100\t250\texon1\t.\t+\n')
+        expected = [(record.id, str(record.seq)) for record in SeqIO.parse(self.expected_fasta_path, 'fasta')
+                    if record.id.startswith('exon1_')]
+
+        # act
+        actual = NativeSlicer().get_slices(self.params)
+
+        # assert
+        self.assertEqual([(s.fasta_header, s.sequence) for s in actual], expected)
+
+    def test_get_slices_reverse_strand(self):
+        # arrange
+        self.params['offset'] = 40
+        forward = NativeSlicer().get_slices({**self.params, 'bed': self.create_bed('chr1\t100\t250\t.\t.\t+\n')})
+        self.params['bed'] = self.create_bed('chr1\t100\t250\t.\t.\t-\n')
+
+        # act
+        actual = NativeSlicer().get_slices(self.params)
+
+        # assert
+        self.assertEqual(actual[0][:6], ('chr1', 50, 260, 'region1_1', '.', '-'))
+        self.assertEqual(actual[0].fasta_header, 'region1_1::chr1:50-260(-)')
+        self.assertEqual([s.sequence for s in actual], [reverse_complement(s.sequence) for s in forward])
+
+    def test_get_slices_skips_slices_beyond_chromosome(self):
+        # arrange
+        self.params['bed'] = self.create_bed('chr1\t20\t1790\texon1\t.\t+\n')
+        self.params['offset'] = 100
+
+        # act
+        actual = NativeSlicer().get_slices(self.params)
+
+        # assert
+        self.assertTrue(actual)
+        self.assertTrue(all(s.start >= 0 and s.end <= 1800 for s in actual))
+        self.assertTrue(all(len(s.sequence) == 210 for s in actual))
+
+    def test_reverse_complement(self):
+        self.assertEqual(reverse_complement('AACGTn'), 'nACGTT')
+
+    def test_reverse_complement_iupac_codes(self):
+        self.assertEqual(reverse_complement('RYKMSWBVDHN'), 'NDHBVWSKMRY')
+        self.assertEqual(reverse_complement('rykmswbvdhn'), 'ndhbvwskmry')
+
+    def test_get_slices_reverse_strand_with_ambiguity_code(self):
+        # arrange
+        fasta_path = path.join(self.tmpdir.name, 'iupac.fa')
+        with open(fasta_path, 'w') as fasta_file:
+            fasta_file.write('>chr1\n' + 'A' * 100 + 'RY' + 'C' * 108 + 'G' * 100 + '\n')
+        self.params.update({'fasta': fasta_path, 'flank_5': 0, 'flank_3': 0,
+                            'bed': self.create_bed('chr1\t100\t310\t.\t.\t-\n')})
+
+        # act
+        actual = NativeSlicer().get_slices(self.params)
+
+        # assert
+        self.assertEqual(actual[0].sequence, 'C' * 100 + 'G' * 108 + 'RY')
+
+    def test_iter_slices_one_based_input(self):
+        # arrange
+        self.params['bed'] = self.create_bed('chr1\t101\t250\texon1\t.\t+\n')
+        self.params['1b'] = True
+
+        # act
+        slices = NativeSlicer().iter_slices(self.params)
+        first_slice = next(slices)
+
+        # assert
+        self.assertEqual(first_slice[:6], ('chr1', 50, 260, 'exon1_1', '.', '+'))
+        self.assertEqual(len(list(slices)), 8)
+
+    @patch('slicer.native_slicer.instrumentation', new_callable=Instrumentation)
+    def test_iter_slices_records_slicer_stage(self, instrumentation):
+        # arrange
+        self.params['bed'] = self.create_bed('chr1\t100\t250\texon1\t.\t+\n')
+        slices = NativeSlicer().iter_slices(self.params)
+
+        # act
+        list(slices)
+
+        # assert
+        self.assertEqual(list(instrumentation.stages), ['slicer'])
+        self.assertEqual(instrumentation.stages['slicer'].calls, 1)
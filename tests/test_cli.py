@@ -0,0 +1,85 @@
+import os
+import subprocess
+import sys
+import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from cli import COMMANDS, profile_command, resolve_command
+from utils.file_system import FolderCreator
+from utils.arguments_parser import ParsedInputArguments
+
+
+class TestCli(unittest.TestCase):
+
+    def test_importing_cli_does_not_load_command_subsystems(self):
+        # arrange
+        heavy_modules = ['pandas', 'numpy', 'pybedtools', 'Bio', 'primer3', 'requests', 'flask', 'scoring']
+        code = (
+            "import sys, cli\n"
+            f"print(','.join(module for module in {heavy_modules!r} if module in sys.modules))"
+        )
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+
+        # act
+        result = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True)
+
+        # assert
+        self.assertEqual(result.stdout.strip(), '')
+
+    @patch('cli.version_command')
+    def test_resolve_command_version(self, mock_version_command):
+        # act
+        resolve_command({'command': 'version'})
+
+        # assert
+        mock_version_command.assert_called_once_with()
+
+    @patch('cli.build_hap1_index_command')
+    def test_resolve_command_passes_arguments(self, mock_build_hap1_index_command):
+        # act
+        resolve_command({'command': 'build_hap1_index', 'vcf': 'variants.vcf', 'hap1_index': 'hap1.index'})
+
+        # assert
+        mock_build_hap1_index_command.assert_called_once_with('variants.vcf', 'hap1.index')
+
+    def test_registered_commands_are_accepted_by_parser(self):
+        for command in COMMANDS:
+            with self.subTest(command=command), patch.object(sys, 'argv', ['./designer.sh', command]):
+                # act
+                args = ParsedInputArguments().get_args()
+
+                # assert
+                self.assertEqual(args['command'], command)
+
+    def test_profile_command_writes_profile_to_output_dir(self):
+        with TemporaryDirectory() as output_dir:
+            # arrange
+            def command(args):
+                FolderCreator.create_timestamped(output_dir)
+
+            # act
+            with patch.dict(COMMANDS, {'version': command}):
+                profile_command({'command': 'version', 'dir': 'unused', 'profile_top': 5})
+
+            # assert
+            self.assertEqual(os.path.dirname(FolderCreator.get_dir()), output_dir)
+            self.assertTrue(os.path.exists(os.path.join(FolderCreator.get_dir(), 'profile.prof')))
+
+    def test_profile_command_writes_profile_when_command_fails(self):
+        with TemporaryDirectory() as output_dir:
+            # arrange
+            def command(args):
+                raise ValueError('Invalid FASTA file')
+
+            # act
+            with patch.dict(COMMANDS, {'version': command}), self.assertRaises(ValueError):
+                profile_command({'command': 'version', 'dir': output_dir})
+
+            # assert
+            self.assertEqual(os.path.dirname(FolderCreator.get_dir()), output_dir)
+            self.assertTrue(os.path.exists(os.path.join(FolderCreator.get_dir(), 'profile_hotspots.txt')))
+
+
+if __name__ == '__main__':
+    unittest.main()
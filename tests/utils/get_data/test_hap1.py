@@ -3,7 +3,7 @@ from unittest.mock import patch, Mock
 
 import requests
 
-from utils.get_data.hap1 import contain_variant
+from utils.get_data.hap1 import contain_variant, contain_variants
 
 
 class TestHap1(TestCase):
@@ -30,3 +30,27 @@ class TestHap1(TestCase):
 
         with self.assertRaises(requests.exceptions.RequestException):
             contain_variant(chromosome="1", start=100, end=200)
+
+    @patch('requests.Session.get')
+    def test_contain_variants_deduplicates_intervals(self, session_get):
+        session_get.side_effect = lambda url, headers: Mock(
+            status_code=200,
+            text='{"variants": ["variant1"]}' if 'start=100&' in url else '{"variants": []}'
+        )
+
+        intervals = [("1", 100, 200), ("1", 300, 400), ("1", 100, 200)]
+
+        result = contain_variants(intervals)
+
+        self.assertEqual(result, {("1", 100, 200): True, ("1", 300, 400): False})
+        self.assertEqual(session_get.call_count, 2)
+
+    @patch('requests.Session.get')
+    def test_contain_variants_request_exception(self, session_get):
+        session_get.return_value = Mock(status_code=404, text='')
+
+        with self.assertRaises(requests.exceptions.RequestException):
+            contain_variants([("1", 100, 200)])
+
+    def test_contain_variants_no_intervals(self):
+        self.assertEqual(contain_variants([]), {})
@@ -0,0 +1,71 @@
+import gzip
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import numpy as np
+
+from utils.get_data.hap1_index import HAP1VariantIndex, build_hap1_variant_index
+
+
+class TestHap1Index(TestCase):
+
+    def setUp(self):
+        self.tmpdir = TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+        self.vcf_content = (
+            "##fileformat=VCFv4.2\n"
+            "#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\n"
+            "chr1\t11542\t.\tA\tG\t.\tPASS\t.\n"
+            "chr1\t500\t.\tACGTACGTAC\tA\t.\tPASS\t.\n"
+            "chr2\t100\t.\tC\tT\t.\tPASS\t.\n"
+        )
+        self.index_path = path.join(self.tmpdir.name, 'hap1_index.npz')
+
+    def _build_index(self, vcf_name: str = 'variants.vcf') -> HAP1VariantIndex:
+        vcf_path = path.join(self.tmpdir.name, vcf_name)
+        opener = gzip.open if vcf_name.endswith('.gz') else open
+        with opener(vcf_path, 'wt') as vcf:
+            vcf.write(self.vcf_content)
+
+        build_hap1_variant_index(vcf_path, self.index_path)
+
+        return HAP1VariantIndex(self.index_path)
+
+    def test_contain_variant_with_variants(self):
+        index = self._build_index()
+
+        self.assertTrue(index.contain_variant(chromosome="1", start=11540, end=11545))
+        self.assertTrue(index.contain_variant(chromosome="chr2", start=100, end=100))
+
+    def test_contain_variant_without_variants(self):
+        index = self._build_index()
+
+        self.assertFalse(index.contain_variant(chromosome="1", start=10, end=20))
+        self.assertFalse(index.contain_variant(chromosome="2", start=101, end=200))
+        self.assertFalse(index.contain_variant(chromosome="3", start=100, end=100))
+
+    def test_contain_variant_overlapping_reference_allele(self):
+        index = self._build_index()
+
+        # Reference allele of the deletion spans 500-509
+        self.assertTrue(index.contain_variant(chromosome="1", start=505, end=520))
+        self.assertFalse(index.contain_variant(chromosome="1", start=510, end=520))
+
+    def test_contain_variants_matches_contain_variant(self):
+        index = self._build_index()
+        chromosomes = np.array(["1", "1", "chr1", "2", "3", "1", "2"])
+        starts = np.array([11540, 10, 505, 100, 100, 510, 101])
+        ends = np.array([11545, 20, 520, 100, 100, 520, 200])
+
+        result = index.contain_variants(chromosomes, starts, ends)
+
+        expected = [index.contain_variant(*interval) for interval in zip(chromosomes, starts, ends)]
+        self.assertEqual(result.tolist(), expected)
+        self.assertEqual(result.tolist(), [True, False, True, True, False, False, False])
+
+    def test_build_index_from_gzipped_vcf(self):
+        index = self._build_index('variants.vcf.gz')
+
+        self.assertTrue(index.contain_variant(chromosome="1", start=11542, end=11542))
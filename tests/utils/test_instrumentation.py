@@ -0,0 +1,132 @@
+import json
+import unittest
+from os import path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from utils.instrumentation import Instrumentation
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.instrumentation = Instrumentation()
+
+    @patch('utils.instrumentation.time.perf_counter')
+    def test_stage_records_calls_time_and_pairs(self, mock_perf_counter):
+        # arrange
+        mock_perf_counter.side_effect = [10.0, 10.5, 20.0, 20.25]
+
+        # act
+        for pairs_in, pairs_out in [(10, 6), (4, 4)]:
+            with self.instrumentation.stage('filters') as stage:
+                stage.pairs_in = pairs_in
+                stage.pairs_out = pairs_out
+
+        # assert
+        self.assertEqual(self.instrumentation.report()['stages'], {
+            'filters': {'calls': 2, 'wall_time_s': 0.75, 'pairs_in': 14, 'pairs_out': 10}
+        })
+
+    @patch('utils.instrumentation.time.perf_counter')
+    def test_stage_iter_records_only_time_producing_items(self, mock_perf_counter):
+        # arrange
+        # Producing the two items and finishing take 1s each, the caller holds each item for 10s
+        mock_perf_counter.side_effect = [0.0, 1.0, 11.0, 12.0, 22.0, 23.0]
+
+        # act
+        items = list(self.instrumentation.stage_iter('slicer', iter(['first', 'second'])))
+
+        # assert
+        self.assertEqual(items, ['first', 'second'])
+        self.assertEqual(self.instrumentation.report()['stages'], {
+            'slicer': {'calls': 1, 'wall_time_s': 3.0, 'pairs_in': 0, 'pairs_out': 0}
+        })
+
+    def test_stage_iter_recorded_when_caller_stops_early(self):
+        # arrange
+        items = self.instrumentation.stage_iter('slicer', iter(['first', 'second']))
+
+        # act
+        next(items)
+        items.close()
+
+        # assert
+        self.assertEqual(self.instrumentation.stages['slicer'].calls, 1)
+
+    def test_stage_recorded_when_it_raises(self):
+        # act
+        with self.assertRaises(ValueError):
+            with self.instrumentation.stage('primer3'):
+                raise ValueError('No primer pairs returned')
+
+        # assert
+        self.assertEqual(self.instrumentation.stages['primer3'].calls, 1)
+
+    def test_count_and_reset(self):
+        # arrange
+        self.instrumentation.count('hap1_variant_requests')
+        self.instrumentation.count('hap1_variant_requests', 3)
+
+        # act
+        counters = self.instrumentation.report()['counters']
+        self.instrumentation.reset()
+
+        # assert
+        self.assertEqual(counters, {'hap1_variant_requests': 4})
+        self.assertEqual(self.instrumentation.report(), {'stages': {}, 'counters': {}})
+
+    @patch('utils.instrumentation.time.perf_counter')
+    def test_to_prometheus(self, mock_perf_counter):
+        # arrange
+        mock_perf_counter.side_effect = [1.0, 3.0]
+        with self.instrumentation.stage('ranking') as stage:
+            stage.pairs_in = stage.pairs_out = 5
+        self.instrumentation.count('ensembl_requests', 2)
+
+        # act
+        result = self.instrumentation.to_prometheus()
+
+        # assert
+        self.assertEqual(result, (
+            '# HELP designer_stage_calls_total Number of times each pipeline stage ran\n'
+            '# TYPE designer_stage_calls_total counter\n'
+            'designer_stage_calls_total{stage="ranking"} 1\n'
+            '# HELP designer_stage_wall_time_seconds_total Wall time spent in each pipeline stage\n'
+            '# TYPE designer_stage_wall_time_seconds_total counter\n'
+            'designer_stage_wall_time_seconds_total{stage="ranking"} 2.0\n'
+            '# HELP designer_stage_pairs_in_total Primer pairs entering each pipeline stage\n'
+            '# TYPE designer_stage_pairs_in_total counter\n'
+            'designer_stage_pairs_in_total{stage="ranking"} 5\n'
+            '# HELP designer_stage_pairs_out_total Primer pairs leaving each pipeline stage\n'
+            '# TYPE designer_stage_pairs_out_total counter\n'
+            'designer_stage_pairs_out_total{stage="ranking"} 5\n'
+            '# TYPE designer_ensembl_requests_total counter\n'
+            'designer_ensembl_requests_total 2\n'
+        ))
+
+    def test_write_report(self):
+        # arrange
+        self.instrumentation.count('primer3_runs', 6)
+
+        with TemporaryDirectory() as tmpdir:
+            # act
+            report_path = self.instrumentation.write_report(tmpdir, prometheus=True)
+
+            # assert
+            self.assertEqual(report_path, path.join(tmpdir, 'instrumentation.json'))
+            with open(report_path) as report_file:
+                self.assertEqual(json.load(report_file), {'stages': {}, 'counters': {'primer3_runs': 6}})
+            self.assertTrue(path.isfile(path.join(tmpdir, 'instrumentation.prom')))
+
+    def test_write_report_without_prometheus(self):
+        with TemporaryDirectory() as tmpdir:
+            # act
+            self.instrumentation.write_report(tmpdir)
+
+            # assert
+            self.assertFalse(path.exists(path.join(tmpdir, 'instrumentation.prom')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import cProfile
+import itertools
+import pstats
+import re
+import unittest
+from os import path
+from tempfile import TemporaryDirectory
+
+from utils.profiler import (
+    COLLAPSED_STACKS_FILE,
+    HOTSPOTS_FILE,
+    PROFILE_FILE,
+    _frame_name,
+    collapsed_stacks,
+    write_profile,
+)
+
+
+def leaf(size):
+    total = 0
+    for value in range(size):
+        total += value
+
+    return total
+
+
+def branch(size):
+    return leaf(size) + leaf(size)
+
+
+def root():
+    return branch(1000) + leaf(1000)
+
+
+class TestProfiler(unittest.TestCase):
+
+    def setUp(self):
+        # One tick per profiler event, so that times do not depend on the machine
+        self.profiler = cProfile.Profile(timer=itertools.count().__next__)
+        self.profiler.runcall(root)
+
+    def test_write_profile(self):
+        with TemporaryDirectory() as output_dir:
+            # act
+            paths = write_profile(self.profiler, output_dir, top=5)
+
+            # assert
+            self.assertEqual(paths, [path.join(output_dir, file_name)
+                                     for file_name in (PROFILE_FILE, COLLAPSED_STACKS_FILE, HOTSPOTS_FILE)])
+            self.assertIn('root', pstats.Stats(paths[0]).sort_stats('cumulative').fcn_list[0][2])
+
+            with open(paths[1]) as collapsed_stacks_file:
+                lines = collapsed_stacks_file.read().splitlines()
+            self.assertTrue(lines)
+            for line in lines:
+                self.assertRegex(line, r'^\S.* \d+$')
+
+            with open(paths[2]) as hotspots_file:
+                hotspots = hotspots_file.read()
+            self.assertIn('Top 5 functions by cumulative time', hotspots)
+            self.assertIn('Top 5 functions by own time', hotspots)
+
+    def test_collapsed_stacks_split_time_between_callers(self):
+        # act
+        stacks = collapsed_stacks(pstats.Stats(self.profiler))
+
+        # assert
+        leaf_stacks = {tuple(re.sub(r' \(.*?\)', '', frame) for frame in stack.split(';')): time
+                       for stack, time in stacks.items() if stack.split(';')[-1].startswith('leaf ')}
+        self.assertIn(('root', 'branch', 'leaf'), leaf_stacks)
+        self.assertIn(('root', 'leaf'), leaf_stacks)
+        # branch calls leaf twice as often as root does, with the same size
+        self.assertEqual(leaf_stacks[('root', 'branch', 'leaf')], 2 * leaf_stacks[('root', 'leaf')])
+
+    def test_frame_name(self):
+        # act & assert
+        self.assertEqual(_frame_name(('/src/primer/primer3.py', 12, 'get_primers')), 'get_primers (primer3.py:12)')
+        self.assertEqual(_frame_name(('~', 0, "<built-in method builtins.sum>")), '<built-in method builtins.sum>')
+        self.assertEqual(_frame_name(('/src/a;b.py', 1, 'f')), 'f (a,b.py:1)')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import pickle
+import shutil
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from pysam import FastaFile
+
+from utils.reference_genome import ReferenceGenome
+
+
+class TestReferenceGenome(TestCase):
+    def setUp(self):
+        self.tmpdir = TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+        self.fasta_path = path.join(self.tmpdir.name, 'reference.fa')
+        shutil.copy('./tests/integration/fixtures/fasta_example.fa', self.fasta_path)
+
+    def create_fasta(self, contents: str) -> str:
+        fasta_path = path.join(self.tmpdir.name, 'custom.fa')
+        with open(fasta_path, 'w') as fasta_file:
+            fasta_file.write(contents)
+        return fasta_path
+
+    def test_creates_missing_index(self):
+        # act
+        reference = ReferenceGenome(self.fasta_path)
+
+        # assert
+        self.assertTrue(path.exists(f'{self.fasta_path}.fai'))
+        self.assertEqual(reference.references, ['chr1'])
+        self.assertEqual(reference.get_reference_length('chr1'), 1800)
+
+    def test_fetch_matches_pysam(self):
+        # arrange
+        intervals = [(0, 10), (45, 55), (49, 50), (50, 100), (123, 1799), (1790, 1800)]
+
+        # act
+        with ReferenceGenome(self.fasta_path) as reference, FastaFile(self.fasta_path) as fasta:
+            # assert
+            for start, end in intervals:
+                self.assertEqual(reference.fetch('chr1', start, end), fasta.fetch('chr1', start, end))
+
+    def test_fetch_is_clipped_to_chromosome(self):
+        # arrange
+        reference = ReferenceGenome(self.create_fasta('>1\nACGT\nACGT\nAC\n'))
+
+        # act & assert
+        self.assertEqual(reference.fetch('1', -5, 3), 'ACG')
+        self.assertEqual(reference.fetch('1', 6, 50), 'GTAC')
+        self.assertEqual(reference.fetch('1', 20, 30), '')
+
+    def test_fetch_resolves_chr_prefix(self):
+        # arrange
+        reference = ReferenceGenome(self.create_fasta('>1\nACGT\n>chr2\nTTGG\n'))
+
+        # act & assert
+        self.assertEqual(reference.fetch('chr1', 0, 2), 'AC')
+        self.assertEqual(reference.fetch('2', 2, 4), 'GG')
+
+    def test_fetch_unknown_chromosome_raises(self):
+        # arrange
+        reference = ReferenceGenome(self.fasta_path)
+
+        # act & assert
+        with self.assertRaises(ValueError):
+            reference.fetch('chrX', 0, 10)
+
+    def test_pickled_reference_is_mapped_again(self):
+        # arrange
+        reference = ReferenceGenome(self.fasta_path)
+        expected = reference.fetch('chr1', 100, 200)
+
+        # act
+        unpickled = pickle.loads(pickle.dumps(reference))
+
+        # assert
+        self.assertEqual(unpickled.fetch('chr1', 100, 200), expected)
+        reference.close()
+        unpickled.close()
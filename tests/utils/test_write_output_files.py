@@ -12,6 +12,7 @@ from freezegun import freeze_time
 from src.utils.write_output_files import write_scoring_output, write_targeton_csv
 from src.utils import write_output_files
 from primer.slice_data import SliceData
+from slicer.native_slicer import Slice
 
 
 class TestWriteOutputFiles(TestCase):
@@ -135,6 +136,25 @@ class TestWriteOutputFiles(TestCase):
         self.assertEqual(test_data, expected_read_data)
 
 
+    @patch('builtins.print')
+    @freeze_time('2023-01-31')
+    def test_write_native_slicer_output_from_generator(self, mock_print):
+        # arrange
+        slices = (Slice('chr1', start, start + 4, f'exon1_{i}', '.', '-', 'ACGT')
+                  for i, start in enumerate([10, 15], start=1))
+        expected_dir = 'test_dir/td_20230131000000000000'
+
+        # act
+        result = write_output_files.write_native_slicer_output('test_dir', slices)
+
+        # assert
+        self.assertEqual(result.dir, expected_dir)
+        with open(result.bed) as bed_file:
+            self.assertEqual(bed_file.read(), 'chr1\t10\t14\texon1_1\t.\t-\nchr1\t15\t19\texon1_2\t.\t-\n')
+        with open(result.fasta) as fasta_file:
+            self.assertEqual(fasta_file.read(),
+                             '>exon1_1::chr1:10-14(-)\nACGT\n>exon1_2::chr1:15-19(-)\nACGT\n')
+
 
 if __name__ == '__main__':
     unittest.main()